@@ -1,7 +1,30 @@
+_geometry_version = 0  # Bumped on every geometry change of any Location or Path
+
+
+def _next_version():
+    global _geometry_version
+    _geometry_version += 1
+    return _geometry_version
+
+
+def geometry_version():
+    """Global change counter: if it has not moved since last time, no geometry changed anywhere."""
+    return _geometry_version
+
+
+def touch_geometry():
+    """Mark a change that no Location/Path sees by itself (e.g. removing a path from a list)."""
+    return _next_version()
+
+
 class Location:
     def __init__(self, x_, y_):
         self.x = x_
         self.y = y_
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in ("x", "y"):
+            object.__setattr__(self, "version", _next_version())
     def __iter__(self):
         yield self.x
         yield self.y
@@ -9,12 +32,18 @@ class Location:
         return isinstance(other, Location) and self.x == other.x and self.y == other.y
 
 class Path:
+    GEOMETRY_ATTRS = ("path_pt1", "path_pt2", "control_pts", "locked")
+
     def __init__(self, path_pt1_: Location | None, path_pt2_: Location | None, ctrl_pts=None, locked=False):
         self.path_pt1 = path_pt1_
         self.path_pt2 = path_pt2_
         self.control_pts = ctrl_pts if ctrl_pts is not None else []
         self.locked = locked
         self.score = 0
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in Path.GEOMETRY_ATTRS:
+            object.__setattr__(self, "version", _next_version())
     def __eq__(self, other):
         return (
             isinstance(other, Path)
@@ -30,5 +59,16 @@ class Path:
         self.path_pt2 = pos_
     def addCtrlPt(self, pos_: Location):
         self.control_pts.append(pos_)
+        self.version = _next_version()
+    def removeCtrlPt(self, pos_: Location):
+        self.control_pts.remove(pos_)
+        self.version = _next_version()
     def lock(self):
-        self.locked = True
\ No newline at end of file
+        self.locked = True
+    def geometryVersion(self):
+        """Largest version of the path or any of its points, grows whenever the curve changes."""
+        version = self.version
+        for p in [self.path_pt1, self.path_pt2] + self.control_pts:
+            if p is not None and p.version > version:
+                version = p.version
+        return version
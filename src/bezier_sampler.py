@@ -0,0 +1,169 @@
+from functools import lru_cache
+from math import comb
+
+import numpy as np
+
+
+#|  --- BERNSTEIN BASIS ---  |#
+@lru_cache(maxsize=128)
+def bernstein_basis(degree: int, steps: int) -> np.ndarray:
+    """
+    Returns a read-only (steps + 1, degree + 1) matrix B with B[s, k] = C(n, k) t^k (1 - t)^(n - k), t = s / steps.
+    Cached per (degree, steps), so sampling a curve is a single matrix product.
+    """
+    t = np.arange(steps + 1, dtype=np.float64) / steps
+    k = np.arange(degree + 1)
+    coeffs = np.array([comb(degree, i) for i in k], dtype=np.float64)
+    basis = coeffs * t[:, None] ** k * (1.0 - t[:, None]) ** (degree - k)
+    basis.setflags(write=False)
+    return basis
+
+
+def bernstein_weights(degree: int, t: float) -> np.ndarray:
+    """Basis row for a single t (not cached)."""
+    k = np.arange(degree + 1)
+    coeffs = np.array([comb(degree, i) for i in k], dtype=np.float64)
+    return coeffs * t ** k * (1.0 - t) ** (degree - k)
+
+
+def bernstein_matrix(degree: int, ts) -> np.ndarray:
+    """(len(ts), degree + 1) basis rows for arbitrary parameters (not cached)."""
+    t = np.asarray(ts, dtype=np.float64)[:, None]
+    k = np.arange(degree + 1)
+    coeffs = np.array([comb(degree, i) for i in k], dtype=np.float64)
+    return coeffs * t ** k * (1.0 - t) ** (degree - k)
+
+
+#|  --- SAMPLING ---  |#
+def control_array(points) -> np.ndarray:
+    """Stack Locations (or (x, y) pairs) into a (k, 2) float64 array."""
+    return np.array([tuple(p) for p in points], dtype=np.float64).reshape(-1, 2)
+
+
+def path_control_array(path) -> np.ndarray:
+    """[pt1] + control_pts + [pt2] of a Path as a (k, 2) float64 array."""
+    return control_array([path.path_pt1] + path.control_pts + [path.path_pt2])
+
+
+def sample_bezier(points, steps: int):
+    """
+    Evaluate a Bezier curve at t = 0, 1/steps, ..., 1 in one matrix product.
+
+    Returns:
+        xs, ys: float64 arrays of length steps + 1
+    """
+    pts = points if isinstance(points, np.ndarray) else control_array(points)
+    curve = bernstein_basis(len(pts) - 1, steps) @ pts
+    return curve[:, 0], curve[:, 1]
+
+
+def sample_bezier_pixels(points, steps: int):
+    """Same as sample_bezier, rounded to integer pixel coordinates (round half to even, like round())."""
+    xs, ys = sample_bezier(points, steps)
+    return np.rint(xs).astype(np.int64), np.rint(ys).astype(np.int64)
+
+
+#|  --- ARC LENGTH ---  |#
+ARC_PANELS = 4  # Composite Gauss-Legendre: panels over [0, 1] ...
+ARC_NODES = 8   # ... and nodes per panel
+
+
+@lru_cache(maxsize=32)
+def arc_length_rule(degree: int):
+    """
+    Quadrature rule for the arc length of degree-n curves: read-only (m, degree) Bernstein rows of the
+    derivative (degree n - 1) at the nodes, and the (m,) node weights.
+    """
+    x, w = np.polynomial.legendre.leggauss(ARC_NODES)
+    edges = np.linspace(0.0, 1.0, ARC_PANELS + 1)
+    half = np.diff(edges)[:, None] / 2
+    t = (edges[:-1, None] + half * (x + 1)).ravel()
+    basis = bernstein_matrix(degree - 1, t)
+    weights = (half * w).ravel()
+    basis.setflags(write=False)
+    weights.setflags(write=False)
+    return basis, weights
+
+
+def arc_lengths(pts) -> np.ndarray:
+    """Arc lengths of (n, k, 2) same-degree curves: Gauss-Legendre quadrature of |B'(t)| over [0, 1]."""
+    degree = pts.shape[1] - 1
+    if degree == 0:
+        return np.zeros(len(pts))
+    basis, weights = arc_length_rule(degree)
+    velocity = basis @ (degree * np.diff(pts, axis=1))  # (n, m, 2)
+    return np.linalg.norm(velocity, axis=2) @ weights
+
+
+#|  --- ADAPTIVE SUBDIVISION ---  |#
+MAX_SUBDIVISION_DEPTH = 16
+
+
+def _split_half(pts):
+    """de Casteljau split of (m, k, 2) curves at t = 0.5 into left and right halves."""
+    k = pts.shape[1]
+    left = np.empty_like(pts)
+    right = np.empty_like(pts)
+    lvl = pts
+    for j in range(k):
+        left[:, j] = lvl[:, 0]
+        right[:, k - 1 - j] = lvl[:, -1]
+        lvl = (lvl[:, :-1] + lvl[:, 1:]) * 0.5
+    return left, right
+
+
+def _flatness(pts):
+    """
+    Largest distance of the inner control points of (m, k, 2) curves from their chord segment.
+    By the convex hull property the curve stays within this distance of the chord.
+    """
+    if pts.shape[1] <= 2:
+        return np.zeros(len(pts))
+    p0 = pts[:, :1]
+    chord = pts[:, -1:] - p0
+    rel = pts[:, 1:-1] - p0
+    chord_len2 = np.sum(chord * chord, axis=2)
+    t = np.clip(np.sum(rel * chord, axis=2) / np.where(chord_len2 > 0, chord_len2, 1), 0, 1)
+    off = rel - t[:, :, None] * chord
+    return np.sqrt(np.max(np.sum(off * off, axis=2), axis=1))
+
+
+def flatten_bezier(points, tolerance=0.1) -> np.ndarray:
+    """
+    Adaptive polyline of a Bezier curve: pieces are split in half until their control polygon is within
+    tolerance pixels of the chord, so flat stretches get few vertices and tight bends get many.
+    All pieces of one depth are tested and split together.
+
+    Returns:
+        (m, 2) float64 polyline from pt1 to pt2, in curve order
+    """
+    pts = points if isinstance(points, np.ndarray) else control_array(points)
+    pieces = pts[None].astype(np.float64)
+    starts = np.zeros(1)  # t where each piece begins, used to restore curve order
+    span = 1.0
+    done_starts = []
+    done_points = []
+    for depth in range(MAX_SUBDIVISION_DEPTH + 1):
+        flat = _flatness(pieces) <= tolerance if depth < MAX_SUBDIVISION_DEPTH else np.ones(len(pieces), dtype=bool)
+        done_starts.append(starts[flat])
+        done_points.append(pieces[flat, 0])
+        if flat.all():
+            break
+        left, right = _split_half(pieces[~flat])
+        span *= 0.5
+        pieces = np.concatenate([left, right])
+        starts = np.concatenate([starts[~flat], starts[~flat] + span])
+    order = np.argsort(np.concatenate(done_starts), kind="stable")
+    return np.vstack([np.concatenate(done_points)[order], pts[-1:]])
+
+
+@lru_cache(maxsize=1024)
+def _flatten_cached(key, tolerance):
+    polyline = flatten_bezier(np.array(key, dtype=np.float64).reshape(-1, 2), tolerance)
+    polyline.setflags(write=False)
+    return polyline
+
+
+def flatten_bezier_cached(points, tolerance=0.1) -> np.ndarray:
+    """flatten_bezier cached per control point geometry (read-only result)."""
+    return _flatten_cached(tuple(c for p in points for c in p), tolerance)
@@ -0,0 +1,33 @@
+#|  --- CONFIG ---  |#
+IMAGE_FILE = "src/CrashSite.png"
+PATH_SAVE_FILE = "src/path_save.py"
+BEST_PATH_FILE = "src/best_path.py"
+PATH_STORE_FILE = "src/path_library.pstore"  # Routes saved with Ctrl+S, see path_files.py (PATH STORE)
+SNAPSHOT_LOG_FILE = "src/.graph_snapshots.log"  # Graph recording (Ctrl+D), see snapshot_log.py
+TERRAIN_CACHE_DIR = "src/.terrain_cache"
+REBUILD_TERRAIN_CACHE = False  # Force reclassification (also: run with --rebuild-terrain)
+
+CLIMB_SPEED = 300       # Seconds per foot
+PX_PER_FOOT = 8.27531973
+MOVE_MULT = 0.64        # Normal speed on clear ground (mph)
+DEBRIS_SPEED = 0.06     # Speed on debris (mph)
+ROBOT_WIDTH = 0.0       # Robot width (ft); terrain is dilated by half of it, see terrain.footprint_terrain
+SCORING_MODE = "legacy"  # "legacy", "dda" or "adaptive", see scoring.SCORING_MODES
+FLATNESS_TOLERANCE = 0.1  # Max curve deviation (px) of adaptive polylines, for "adaptive" scoring and DRAW_ADAPTIVE
+DRAW_ADAPTIVE = False     # Draw curves from adaptive polylines instead of 200 fixed samples
+GRAPH_WORKERS = None      # Processes scoring recorded snapshots in render_graph (None: all cores)
+FIT_MAX_ERROR = 2.0       # Max distance (px) of a planned route from the Bezier chain fitted to it
+FIT_MAX_DEGREE = 5        # Highest degree (control points + 1) of a fitted segment
+PLAN_COARSE_TO_FINE = True  # Plan routes (P key) through the terrain pyramid, see pyramid.py
+RECOVERY_POINTS = {"A": (820, 88), "B": (929, 659)}  # Goals with a cached cost-to-go field
+SHOW_BEST_TIME = True     # Show the optimal time from the cursor to each recovery point
+STARTUP_TARGET = 0.5      # Max seconds from start to the first frame (warm terrain cache), see tests/test_startup.py
+
+ground_colors = {"CLEAR": 0.0, "ORANGE": 1, "PURPLE": 2.5, "BLUE": 4, "GRAY": 9999}
+
+COLOR_MAP = {
+    (250, 110, 51): "ORANGE",
+    (142, 59, 230): "PURPLE",
+    (43, 186, 247): "BLUE",
+    (63, 63, 63): "GRAY"
+}
@@ -0,0 +1,161 @@
+import numpy as np
+
+import config
+from bezier_classes import Path, Location
+from bezier_sampler import bernstein_matrix, control_array
+from scoring import CostModel, feasible_curves, score_curves
+from terrain import CLEAR_CLASS
+
+
+#|  --- INFO ---  |#
+'''
+Least-squares Bezier fitting of dense polylines (e.g. planner.plan_route pixel routes) into a short
+chain of Path, ready for score_all_paths, draw_bezier and save_paths, or as optimizer seeds.
+
+Each piece of the polyline is fitted with the lowest degree (2 .. max degree) that keeps every point
+within the max error; when no degree fits, the piece is split at its worst point and both halves are
+fitted again. A fit is one lstsq solve over all points of the piece, with the inner control points
+as unknowns and the endpoints pinned, so consecutive curves share their endpoints.
+
+Planned routes hug walls and terrain edges, where a 2 px deviation can cut through GRAY or add a
+300 s climb. fit_route therefore also rejects (and splits) fits that score much worse than the
+part of the route they replace.
+'''
+
+
+#|  --- CONFIG ---  |#
+REPARAM_ITERATIONS = 4  # Newton refinements of the point parameters per fit
+COST_SLACK = 0.1        # A fitted segment may score this fraction above the route part it replaces
+
+
+#|  --- FITTING ---  |#
+def chord_parameters(points):
+    """Parameters in [0, 1] proportional to cumulative chord length along (m, 2) points."""
+    lengths = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    s = np.concatenate(([0.0], np.cumsum(lengths)))
+    return s / s[-1] if s[-1] > 0 else np.linspace(0.0, 1.0, len(points))
+
+
+def fit_bezier(points, degree, iterations=REPARAM_ITERATIONS):
+    """
+    Least-squares Bezier of the given degree through (m, 2) points, with the endpoints pinned to the
+    first and last point. Parameters start at chord length and get Newton steps toward each point's
+    closest curve point between solves.
+
+    Returns:
+        (degree + 1, 2) control points, (m,) distance of each point to the curve at its parameter
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    t = chord_parameters(pts)
+    for i in range(iterations + 1):
+        basis = bernstein_matrix(degree, t)
+        rhs = pts - np.outer(basis[:, 0], pts[0]) - np.outer(basis[:, -1], pts[-1])
+        inner = np.linalg.lstsq(basis[:, 1:-1], rhs, rcond=None)[0]
+        ctrl = np.vstack([pts[0], inner, pts[-1]])
+        diff = basis @ ctrl - pts
+        if i == iterations:
+            break
+        # Newton step on (C(t) - p) . C'(t) = 0 for every point at once
+        d1_ctrl = degree * np.diff(ctrl, axis=0)
+        d1 = bernstein_matrix(degree - 1, t) @ d1_ctrl
+        d2 = bernstein_matrix(degree - 2, t) @ ((degree - 1) * np.diff(d1_ctrl, axis=0))
+        num = np.sum(diff * d1, axis=1)
+        den = np.sum(d1 * d1, axis=1) + np.sum(diff * d2, axis=1)
+        step = np.divide(num, den, out=np.zeros_like(num), where=np.abs(den) > 1e-12)
+        t = np.clip(t - step, 0.0, 1.0)
+        t[0], t[-1] = 0.0, 1.0
+    return ctrl, np.linalg.norm(diff, axis=1)
+
+
+def _distinct_points(points):
+    """(m, 2) float array without consecutive repeats (they carry no shape and break chord parameters)."""
+    pts = np.asarray(points if isinstance(points, np.ndarray) else control_array(points), dtype=np.float64)
+    if len(pts) > 1:
+        pts = pts[np.concatenate(([True], np.any(np.diff(pts, axis=0) != 0, axis=1)))]
+    return pts
+
+
+def fit_polyline(polyline, max_error=config.FIT_MAX_ERROR, max_degree=config.FIT_MAX_DEGREE, accept=None):
+    """
+    Split a dense polyline ((m, 2) array, Locations or (x, y) pairs) into a chain of Bezier curves
+    of degree 2 .. max_degree, each within max_error px of the polyline points it covers.
+    accept(a, b, ctrl), if given, can veto the fit of points a..b (indices after dropping repeats).
+
+    Returns:
+        list of (k, 2) control point arrays in polyline order, consecutive curves sharing endpoints
+    """
+    pts = _distinct_points(polyline)
+    if len(pts) < 2:
+        raise ValueError("polyline needs two distinct points")
+
+    curves = []
+    pieces = [(0, len(pts) - 1)]
+    while pieces:
+        a, b = pieces.pop()
+        if b - a < 2:  # two points: straight quadratic
+            curves.append((a, np.vstack([pts[a], (pts[a] + pts[b]) / 2, pts[b]])))
+            continue
+        # degree <= b - a keeps at least as many inner points as unknown control points
+        for degree in range(2, min(max_degree, b - a) + 1):
+            ctrl, err = fit_bezier(pts[a:b + 1], degree)
+            if err.max() <= max_error and (accept is None or accept(a, b, ctrl)):
+                curves.append((a, ctrl))
+                break
+        else:
+            split = a + 1 + int(np.argmax(err[1:-1]))
+            pieces.extend([(split, b), (a, split)])
+    curves.sort(key=lambda c: c[0])
+    return [ctrl for _, ctrl in curves]
+
+
+#|  --- PATHS ---  |#
+def curves_to_paths(curves):
+    """
+    Chain of Path for fitted curves, coordinates rounded to 2 decimals like saved routes.
+    Every segment but the last is locked, as in a hand-built chain.
+    """
+    paths = []
+    for i, ctrl in enumerate(curves):
+        pt1, *inner, pt2 = [Location(round(float(x), 2), round(float(y), 2)) for x, y in ctrl]
+        paths.append(Path(pt1, pt2, inner, i < len(curves) - 1))
+    return paths
+
+
+def route_times(route, model: CostModel):
+    """
+    Cumulative time (s) along an 8-connected pixel route under the planner's cost model, plus the climb
+    onto each point from CLEAR (what a curve starting there is charged, as every curve starts on CLEAR).
+    """
+    px = np.asarray(route, dtype=np.int64)
+    tiles = model.classes[px[:, 1], px[:, 0]]
+    heights = model.class_heights[tiles]
+    step = np.linalg.norm(np.diff(px, axis=0), axis=1) / (model.px_per_foot * model.class_speeds[tiles[1:]])
+    climb = model.climb_speed * np.maximum(0, np.diff(heights))
+    elapsed = np.concatenate(([0.0], np.cumsum(step + climb)))
+    return elapsed, model.climb_speed * np.maximum(0, heights - model.class_heights[CLEAR_CLASS])
+
+
+def fit_route(route, model: CostModel = None, mode=config.SCORING_MODE, max_error=config.FIT_MAX_ERROR,
+              max_degree=config.FIT_MAX_DEGREE, slack=COST_SLACK):
+    """
+    Fit a pixel route (list of (x, y), e.g. from planner.plan_route) and return it as a chain of Path.
+    Given a CostModel, a segment is only kept if it scores (in this mode) within slack of the route part
+    it replaces, which rejects fits that clip GRAY or add climbs.
+    """
+    route = _distinct_points(route)
+    accept = None
+    if model is not None:
+        elapsed, start_climb = route_times(route, model)
+        lower = np.zeros(2)
+        upper = np.array([model.width, model.height]) - 1.0
+
+        def accept(a, b, ctrl):
+            # Control points on the map keep the whole curve on the map (convex hull)
+            if np.any(ctrl < lower) or np.any(ctrl > upper):
+                return False
+            if not feasible_curves([ctrl], model)[0]:  # clips GRAY, no need to score it
+                return False
+            planned = elapsed[b] - elapsed[a] + start_climb[a]
+            return score_curves([ctrl], model, mode=mode)[0] <= planned * (1 + slack)
+
+    return curves_to_paths(fit_polyline(route, max_error, max_degree, accept))
@@ -0,0 +1,189 @@
+import argparse
+from itertools import islice, tee
+
+import numpy as np
+
+import config
+from parallel_scoring import iter_curve_list_scores
+from scoring import rasterize_samples, sample_curves
+from snapshot_log import read_snapshots, snapshot_curves
+
+
+#|  --- INFO ---  |#
+'''
+Score heatmap of recorded snapshots (render_graph in manual_path).
+
+Every snapshot's curves are rasterized in vectorized batches (the legacy stepping between rounded samples)
+and splatted into float buffers with the snapshot's total score: the best score per pixel, and the sum and
+count for the average. The buffers only grow, so after new snapshots were recorded only those are scored
+and splatted. Lines are thickened to LINE_RADIUS when the buffers are read, not per splatted pixel.
+Colors: the faster the route through a pixel, the lighter.
+
+Headless PNG export:  python src/heatmap.py --output heatmap.png
+'''
+
+
+#|  --- CONFIG ---  |#
+CURVE_STEPS = 200      # Samples per curve, as in draw_bezier
+LINE_RADIUS = 1        # Drawn line radius (px) around every curve pixel
+SPLAT_BATCH = 256      # Snapshots rasterized per vectorized pass
+PLAUSIBLE_SCORES = (5, 10000)  # Route totals outside this range (unfinished or crossing GRAY) are not drawn
+HEATMAP_MODES = ("best", "average")
+
+
+#|  --- HEATMAP ---  |#
+def _disc_offsets(radius):
+    r = int(radius)
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    keep = dx ** 2 + dy ** 2 <= radius ** 2
+    return dx[keep], dy[keep]
+
+
+class ScoreHeatmap:
+    """
+    Accumulation buffers over a width x height map:
+        best:  lowest snapshot score through each pixel (inf where none)
+        total, hits: sum and number of snapshot scores through each pixel
+    count is the number of snapshots added so far (drawn or not), lo / hi the range of drawn scores.
+    """
+    def __init__(self, width, height, radius=LINE_RADIUS, curve_steps=CURVE_STEPS):
+        self.width = width
+        self.height = height
+        self.curve_steps = curve_steps
+        self.radius = radius
+        self.best = np.full(width * height, np.inf)
+        self.total = np.zeros(width * height)
+        self.hits = np.zeros(width * height)
+        self.count = 0
+        self.lo = np.inf
+        self.hi = -np.inf
+
+    def add(self, curve_lists, scores):
+        """
+        Splat a batch of snapshots: curve_lists holds each snapshot's control polygons (None for paths that
+        cannot be scored, see snapshot_curves), scores their totals. Snapshots scoring inf are only counted.
+        """
+        self.count += len(curve_lists)
+        curves, owners = [], []
+        for curve_list, score in zip(curve_lists, scores):
+            if np.isfinite(score):
+                drawn = [c for c in curve_list if c is not None]
+                curves.extend(drawn)
+                owners.extend([score] * len(drawn))
+                self.lo = min(self.lo, score)
+                self.hi = max(self.hi, score)
+        if not curves:
+            return
+        xs, ys = sample_curves(curves, self.curve_steps)
+        px, py, _, curve, _ = rasterize_samples(xs, ys, self.width, self.height)
+        # rasterize_samples leaves out each curve's first sample
+        px = np.concatenate([xs[:, 0], px])
+        py = np.concatenate([ys[:, 0], py])
+        curve = np.concatenate([np.arange(len(curves)), curve])
+        inside = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+
+        # Each curve counts once per pixel, however often it passes
+        key = np.sort(curve[inside] * (self.width * self.height) + py[inside] * self.width + px[inside])
+        key = key[np.concatenate([[True], key[1:] != key[:-1]])]
+        curve, pixel = np.divmod(key, self.width * self.height)
+        pixel_scores = np.asarray(owners)[curve]
+        np.minimum.at(self.best, pixel, pixel_scores)
+        self.total += np.bincount(pixel, weights=pixel_scores, minlength=len(self.total))
+        self.hits += np.bincount(pixel, minlength=len(self.hits))
+
+    def _spread(self, values, reduce, fill):
+        """reduce (np.minimum or np.add) of values over a disc of self.radius around every pixel."""
+        r = int(self.radius)
+        padded = np.full((self.height + 2 * r, self.width + 2 * r), fill)
+        padded[r:r + self.height, r:r + self.width] = values.reshape(self.height, self.width)
+        out = np.full((self.height, self.width), fill)
+        for dx, dy in zip(*_disc_offsets(self.radius)):
+            reduce(out, padded[r + dy:r + dy + self.height, r + dx:r + dx + self.width], out=out)
+        return out
+
+    def scores(self, mode="best"):
+        """(height, width) per-pixel scores over lines LINE_RADIUS thick, inf where no snapshot passes."""
+        if mode not in HEATMAP_MODES:
+            raise ValueError(f"Unknown heatmap mode {mode!r}, expected one of {HEATMAP_MODES}")
+        if mode == "best":
+            return self._spread(self.best, np.minimum, np.inf)
+        hits = self._spread(self.hits, np.add, 0.0)
+        values = np.full(hits.shape, np.inf)
+        np.divide(self._spread(self.total, np.add, 0.0), hits, out=values, where=hits > 0)
+        return values
+
+    def to_rgba(self, mode="best"):
+        """(height, width, 4) uint8 image: green, lighter and more opaque for faster routes, clear elsewhere."""
+        values = self.scores(mode)
+        hit = np.isfinite(values)
+        lightness = np.zeros(values.shape)
+        if self.hi > self.lo:
+            lightness[hit] = (self.hi - values[hit]) / (self.hi - self.lo)
+        else:
+            lightness[hit] = 0.5
+        rgba = np.zeros(values.shape + (4,), dtype=np.uint8)
+        rgba[..., 1] = np.rint(255 * lightness)
+        rgba[..., 3] = np.where(hit, np.rint(96 + 159 * lightness), 0)
+        return rgba
+
+    def save_png(self, file_name, mode="best", background=None):
+        """Write the heatmap as a PNG, composited over the background image file if given (no display needed)."""
+        from PIL import Image
+        image = Image.fromarray(self.to_rgba(mode), "RGBA")
+        if background is not None:
+            image = Image.alpha_composite(Image.open(background).convert("RGBA"), image)
+        image.save(file_name)
+
+
+#|  --- SNAPSHOT LOGS ---  |#
+def splat_log(heatmap: ScoreHeatmap, log_file, workers=None, mode=config.SCORING_MODE, model=None):
+    """
+    Score (across a process pool) and splat the snapshots of log_file that heatmap has not seen yet.
+    Snapshots are streamed, so memory stays bounded however long the log is. A few new snapshots (one
+    scoring chunk) are scored in this process, with model if given, see iter_curve_list_scores.
+
+    Returns:
+        best total score among the new snapshots and that snapshot as (counts, locked, coords),
+        or (inf, None) when none of them is plausible
+    """
+    new = islice(read_snapshots(log_file), heatmap.count, None)
+    to_score, to_splat = tee(new)
+    curve_lists = (snapshot_curves(counts, coords) for counts, _, coords in to_score)
+    best_score, best_snapshot = np.inf, None
+    batch, batch_scores = [], []
+    for snapshot, path_scores in zip(to_splat, iter_curve_list_scores(curve_lists, workers, mode=mode, model=model)):
+        total = sum(path_scores)
+        if not PLAUSIBLE_SCORES[0] < total < PLAUSIBLE_SCORES[1]:
+            total = np.inf
+        elif total < best_score:
+            best_score, best_snapshot = total, snapshot
+        batch.append(snapshot_curves(snapshot[0], snapshot[2]))
+        batch_scores.append(total)
+        if len(batch) == SPLAT_BATCH:
+            heatmap.add(batch, batch_scores)
+            batch, batch_scores = [], []
+    heatmap.add(batch, batch_scores)
+    return best_score, best_snapshot
+
+
+#|  --- MAIN ---  |#
+def main():
+    parser = argparse.ArgumentParser(description="Render the score heatmap of a snapshot log to a PNG.")
+    parser.add_argument("--log", default=config.SNAPSHOT_LOG_FILE, help="snapshot log (see snapshot_log.py)")
+    parser.add_argument("--output", default="heatmap.png", help="PNG file to write")
+    parser.add_argument("--mode", choices=HEATMAP_MODES, default="best", help="per-pixel best or average score")
+    parser.add_argument("--workers", type=int, default=config.GRAPH_WORKERS, help="scoring processes")
+    parser.add_argument("--no-background", action="store_true", help="leave out the terrain image")
+    args = parser.parse_args()
+
+    from PIL import Image
+    with Image.open(config.IMAGE_FILE) as image:
+        width, height = image.size
+    heatmap = ScoreHeatmap(width, height)
+    best_score, _ = splat_log(heatmap, args.log, args.workers)
+    heatmap.save_png(args.output, args.mode, None if args.no_background else config.IMAGE_FILE)
+    print(f"{heatmap.count} snapshots, best {best_score:.2f}s, written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
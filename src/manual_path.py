@@ -1,11 +1,24 @@
+import time
+_start_time = time.perf_counter()  # for the time to first frame, see main
+import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from PIL import Image
 from math import sqrt
-import pygame
-from path_save import saved_paths
-from bezier_classes import Path, Location
-import copy
+from bezier_classes import Path, Location, geometry_version, touch_geometry
+from bezier_sampler import bernstein_weights, control_array
+from scoring import SCORING_MODES, CostModel, lower_bound_times, score_control_points, score_curves
+from terrain import CLEAR_CLASS, build_class_table, footprint_terrain, load_terrain
+from config import (
+    IMAGE_FILE, PATH_SAVE_FILE, PATH_STORE_FILE, BEST_PATH_FILE, SNAPSHOT_LOG_FILE, TERRAIN_CACHE_DIR, REBUILD_TERRAIN_CACHE,
+    CLIMB_SPEED, PX_PER_FOOT, MOVE_MULT, DEBRIS_SPEED, ROBOT_WIDTH, SCORING_MODE, FLATNESS_TOLERANCE, DRAW_ADAPTIVE,
+    GRAPH_WORKERS, PLAN_COARSE_TO_FINE, RECOVERY_POINTS, SHOW_BEST_TIME, STARTUP_TARGET, ground_colors, COLOR_MAP,
+)
+from snapshot_log import SnapshotLog, snapshot_paths
+from score_worker import ScoreWorker
+# numpy, scoring and terrain load the terrain for the first frame, snapshot_log and score_worker run every frame;
+# path_files, planner, pyramid, curve_fit and heatmap are imported by the key handlers that use them
 
 
 #|  --- INFO ---  |#
@@ -26,41 +39,39 @@ Purple terrain has an RGB identfier of:   (142, 59, 230)
 Blue terrain has an RGB identifier of:    (43, 186, 247)
 Gray terrain has an RGB identifier of:    (63, 63, 63)
 
-Given that no robot width was specified, no robot width is taken into account
+The robot width is config.ROBOT_WIDTH (0 when none is specified): every pixel takes the highest
+terrain under a robot centred on it, so scoring, drawing and planning all see the dilated grid
 '''
 
 
 #|  --- CONFIG ---  |#
-IMAGE_FILE = "src/CrashSite.png"
-PATH_SAVE_FILE = "src/path_save.py"
-BEST_PATH_FILE = "src/best_path.py"
+# Settings shared with the headless tools live in config.py
 
-CLIMB_SPEED = 300       # Seconds per foot
-PX_PER_FOOT = 8.27531973
-MOVE_MULT = 0.64        # Normal speed on clear ground (mph)
-DEBRIS_SPEED = 0.06     # Speed on debris (mph)
-
-ground_colors = {"CLEAR": 0.0, "ORANGE": 1, "PURPLE": 2.5, "BLUE": 4, "GRAY": 9999}
-
-COLOR_MAP = {
-    (250, 110, 51): "ORANGE",
-    (142, 59, 230): "PURPLE",
-    (43, 186, 247): "BLUE",
-    (63, 63, 63): "GRAY"
-}
 
 paths = [Path(None, None)]
 running = True
 remember_graph = False
 calculate_graph = False
-prev_paths = []
-terrain = []
+graph_log = SnapshotLog(SNAPSHOT_LOG_FILE)  # snapshots recorded for the graph, streamed back by render_graph
+graph_heatmap = None  # heatmap.ScoreHeatmap of the snapshots drawn so far, extended by render_graph
+graph_best = (float("inf"), None)  # best recorded route total and its paths
+terrain_data = None  # terrain.Terrain with the class grid and cost arrays
+cost_model = None    # scoring.CostModel built from terrain_data
+planner_grid = None  # planner.PlannerGrid, built on first use
+terrain_pyramid = None  # pyramid.TerrainPyramid over planner_grid, built on first use
+goal_fields = {}     # RECOVERY_POINTS name -> cost-to-go field, set after the first frame (load_goal_fields)
+terrain = np.zeros((0, 0), dtype=np.uint8)  # (height, width) grid of terrain class indices
+terrain_classes = build_class_table(COLOR_MAP)
+class_heights = [ground_colors[name] for name in terrain_classes]
+GRAY_CLASS = terrain_classes.index("GRAY")
 width = 1024
 height = 800
 surface = 0
 score = 0
-screen = pygame.display.set_mode((width, height))
-pygame.display.set_caption("Path Visualizer")
+score_worker = None  # score_worker.ScoreWorker behind the score label, started by main
+pygame = None  # imported by init_display, so importing this module opens no window
+screen = None  # the display surface, created once by init_display
+path_layer = None  # path_render.PathLayer the editor's paths are drawn through, see draw_bezier
 
 ctrl_pt_size = 5
 dragging_point = None
@@ -73,6 +84,10 @@ def distance(p1, p2):
     return sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
 
 
+def format_time(seconds):
+    return f"{int(seconds)//3600:02}:{(int(seconds)%3600)//60:02}:{int(seconds)%60:02}"
+
+
 def map_value(x, in_min, in_max, out_min, out_max):
     """Maps a value x from one range to another."""
     if in_max - in_min == 0:  # avoid divide by zero
@@ -104,41 +119,62 @@ def closest_color(rgb, color_map, max_dist=5):
     return best_match if min_dist <= max_dist ** 2 else "CLEAR"
 
 
-def load_image_as_terrain(image_file):
-    img = Image.open(image_file).convert("RGB")
-    w, h = img.size
-    arr = np.array(img, dtype=np.uint8)
-    flat_pixels = arr.reshape(-1, 3)
-    terrain = [closest_color(tuple(rgb), COLOR_MAP) for rgb in flat_pixels]
-    surface_ = pygame.image.load(image_file)
-    return terrain, w, h, surface_
+def load_image_as_terrain(image_file, rebuild=False):
+    """
+    Returns:
+        terrain_: terrain.Terrain (class grid, class table and cost arrays) dilated for ROBOT_WIDTH, cached on disk
+    """
+    terrain_ = load_terrain(image_file, COLOR_MAP, ground_colors, MOVE_MULT, DEBRIS_SPEED,
+                            cache_dir=TERRAIN_CACHE_DIR, rebuild=rebuild)
+    return footprint_terrain(terrain_, ROBOT_WIDTH * PX_PER_FOOT / 2)
+
+
+def load_terrain_data(rebuild=False):
+    """Terrain and cost model. Needs no pygame, so main runs it while the window opens."""
+    global terrain, terrain_data, terrain_classes, cost_model
+    terrain_data = load_image_as_terrain(IMAGE_FILE, rebuild)
+    terrain, terrain_classes = terrain_data.classes, terrain_data.class_names
+    cost_model = CostModel(terrain_data, PX_PER_FOOT, CLIMB_SPEED)
+
+
+def init_display():
+    """
+    Import pygame and open the window (once), sized to the terrain image.
+
+    Returns:
+        the font for the hover labels
+    """
+    global pygame, screen, surface, width, height
+    import pygame as pygame_module
+    pygame = pygame_module
+    pygame.display.init()
+    pygame.font.init()
+    image = pygame.image.load(IMAGE_FILE)
+    width, height = image.get_size()
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption("Path Visualizer")
+    surface = image.convert()  # display pixel format, so every frame's blit is a plain copy
+    return pygame.font.SysFont(None, 24)
 
 
 #|  --- BEZIER FUNCTIONS ---  |#
 def get_bezier_loc(level_, t_) -> Location:
-    lvl = level_
-    while len(lvl) > 1:
-        next_level = []
-        for j in range(len(lvl) - 1):
-            x0, y0 = lvl[j]
-            x1, y1 = lvl[j+1]
-            x = x0 + (x1 - x0) * t_
-            y = y0 + (y1 - y0) * t_
-            next_level.append(Location(x, y))
-        lvl = next_level
-    return Location(int(round(lvl[0].x)), int(round(lvl[0].y)))
+    """Single point of the curve. Use sample_bezier_pixels to sample many t values at once."""
+    pts = control_array(level_)
+    x, y = bernstein_weights(len(pts) - 1, t_) @ pts
+    return Location(int(round(x)), int(round(y)))
 
 
 def get_pixel_status(prev_tile, current_tile):
     """
-    Returns the color of the current tile
+    Returns the color of the current tile (tiles are terrain class indices)
     """
 
-    if current_tile == "GRAY":
+    if current_tile == GRAY_CLASS:
         status = "IMPASSIBLE"
-    elif ground_colors[current_tile] - ground_colors[prev_tile] > 0:
+    elif class_heights[current_tile] - class_heights[prev_tile] > 0:
         status = "CLIMB"
-    elif current_tile == "CLEAR":
+    elif current_tile == CLEAR_CLASS:
         status = "CLEAR"
     else:
         status = "TERRAIN"
@@ -155,16 +191,17 @@ def get_pixel_score(prev_tile, current_tile, feet_dist):
         climb_time: climbing penalty in seconds
         status: one of 'CLEAR', 'TERRAIN', 'CLIMB', 'IMPASSIBLE'
     """
-    speed = MOVE_MULT if current_tile == "CLEAR" else DEBRIS_SPEED
-    climb_time = max(0, CLIMB_SPEED * (ground_colors[current_tile] - ground_colors[prev_tile]))
+    speed = MOVE_MULT if current_tile == CLEAR_CLASS else DEBRIS_SPEED
+    climb_time = max(0, CLIMB_SPEED * (class_heights[current_tile] - class_heights[prev_tile]))
     move_time = feet_dist / speed
 
     return move_time, climb_time, get_pixel_status(prev_tile, current_tile)
 
 
-def path_score(path: Path, curve_steps=500) -> float:
+def path_score(path: Path, curve_steps=500, mode=None, bound=None) -> float:
     """
     Score a path in seconds and optionally draw a highlight overlay on a surface.
+    With a bound, returns inf as soon as the path cannot finish within it (or crosses GRAY).
     """
     ctrl_pts = path.control_pts
     pt1 = path.path_pt1
@@ -173,48 +210,57 @@ def path_score(path: Path, curve_steps=500) -> float:
     if not (pt1 and pt2) or len(ctrl_pts) == 0:
         return 0
 
-    full_path = [pt1] + ctrl_pts + [pt2]
-    total_time = 0
-    prev_px, prev_py = None, None
-    prev_tile = "CLEAR"
-    tile = "CLEAR"
-
-    for s in range(curve_steps + 1):
-        t = s / curve_steps
-        loc = get_bezier_loc(full_path, t)
-        px, py = loc
-
-        if prev_px is not None and prev_py is not None:
-            dx, dy = px - prev_px, py - prev_py
-            steps = max(abs(dx), abs(dy))
+    return score_control_points([pt1] + ctrl_pts + [pt2], cost_model, curve_steps, mode or SCORING_MODE,
+                                FLATNESS_TOLERANCE, bound)
 
-            for i in range(1, steps + 1):
-                x = int(round(prev_px + dx * i / steps))
-                y = int(round(prev_py + dy * i / steps))
-                if not (0 <= x < width and 0 <= y < height):
-                    continue
 
-                tile = terrain[x + y * width]
-                pixel_dist = sqrt((x - prev_px) ** 2 + (y - prev_py) ** 2) / PX_PER_FOOT
+def score_all_paths(path_list, curve_steps=500, mode=None, bound=None):
+    """
+    Score every path in one vectorized pass, storing each path's time in path.score.
+    With a bound on the total, each path is abandoned once it cannot fit in the bound minus the other
+    paths' straight-line lower bounds; the total is then inf.
+    """
+    scorable = [p for p in path_list if p.path_pt1 and p.path_pt2 and len(p.control_pts) > 0]
+    curves = [[p.path_pt1] + p.control_pts + [p.path_pt2] for p in scorable]
+    path_bounds = None
+    if bound is not None and scorable:
+        ends = np.array([[tuple(c[0]), tuple(c[-1])] for c in curves], dtype=np.float64)
+        lower = lower_bound_times(ends[:, 0, 0], ends[:, 0, 1], ends[:, 1, 0], ends[:, 1, 1], cost_model)
+        path_bounds = bound - (lower.sum() - lower)
+    scores = score_curves(curves, cost_model, curve_steps, mode=mode or SCORING_MODE, flatness=FLATNESS_TOLERANCE,
+                          bound=path_bounds)
+    for p in path_list:
+        p.score = 0
+    for p, s in zip(scorable, scores.tolist()):
+        p.score = s
+    total_time = 0
+    for p in path_list:
+        total_time += p.score
+    return total_time
 
-                move_time, climb_time, status = get_pixel_score(prev_tile, tile, pixel_dist)
-                total_time += move_time + climb_time
 
-            prev_tile = tile
-            prev_px, prev_py = px, py
-        else:
-            prev_px, prev_py = px, py
+def request_score(path_list):
+    """
+    Hand path_list to score_worker if any geometry changed since the last request. Never waits for scoring.
 
-    return total_time
+    Returns:
+        the newest score_worker.ScoreResult, None before the first one
+    """
+    version = geometry_version()
+    if version != score_worker.submitted:
+        curves = [[p.path_pt1] + p.control_pts + [p.path_pt2] if p.path_pt1 and p.path_pt2 and p.control_pts
+                  else None for p in path_list]
+        score_worker.submit(version, curves)
+    return score_worker.result
 
 
-def score_all_paths(path_list, curve_steps=500):
-    global terrain, width, height
-    total_time = 0
-    for p in path_list:
-        p.score = path_score(p)
-        total_time += p.score
-    return total_time
+def compare_scoring_modes(path_list, curve_steps=500):
+    """Print the route total and scoring time of every scoring mode."""
+    for mode in SCORING_MODES:
+        start = time.perf_counter()
+        total = score_all_paths(path_list, curve_steps, mode)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{mode:>7}: {total:10.2f}s  ({elapsed:.2f}ms)")
 
 
 def _clamp(v, lo, hi):
@@ -238,141 +284,31 @@ def _normalize_color_tuple(col):
     return tuple(col_list[:3])
 
 
-def draw_bezier(path_list, path_color=(0, 200, 0, 255), line_size=3, draw_controllers=True, show_terrain=False):
+def draw_bezier(path_list, path_color=(0, 200, 0, 255), line_size=3, draw_controllers=True, show_terrain=False,
+                layer=None):
     """
-    Draw Bezier curves and control points with defensive checks:
-     - coerce coords to ints
-     - clamp coordinates to surface bounds
-     - normalize color tuple to valid ints 0..255
-     - skip drawing when coords outside surface or terrain index invalid
+    Draw Bezier curves and control points through a retained path_render.PathLayer (the editor's own by
+    default): only paths whose geometry or style changed are redrawn, and only their rectangles are blitted.
     """
-    global ctrl_pt_size, screen, width, height
-
-    # Defensive: normalize incoming path_color
-    path_color = _normalize_color_tuple(path_color)
-
-    # Create a temporary surface with per-pixel alpha
-    temp_surf = pygame.Surface((screen.get_width(), screen.get_height()), pygame.SRCALPHA)
-
-    main_points_color = _normalize_color_tuple((100, 100, 100, 255))
-    control_line_color = _normalize_color_tuple((160, 160, 160, 255))
-    control_point_color = _normalize_color_tuple((150, 150, 150, 255))
-
-    for path in path_list:
-        prev_tile = "CLEAR"
-        pt1 = path.path_pt1
-        pt2 = path.path_pt2
-        ctrl_pts = path.control_pts
-
-        if not (pt1 is None or pt2 is None):
-            # Draw control points and lines (coerce coords)
-            if draw_controllers:
-                try:
-                    pygame.draw.circle(temp_surf, main_points_color, (int(pt1.x), int(pt1.y)), ctrl_pt_size)
-                    pygame.draw.circle(temp_surf, main_points_color, (int(pt2.x), int(pt2.y)), ctrl_pt_size)
-                except Exception:
-                    # defensive fallback in case pt1/pt2 are tuples instead of Location
-                    try:
-                        pygame.draw.circle(temp_surf, main_points_color, (int(pt1[0]), int(pt1[1])), ctrl_pt_size)
-                        pygame.draw.circle(temp_surf, main_points_color, (int(pt2[0]), int(pt2[1])), ctrl_pt_size)
-                    except Exception:
-                        pass
-
-                if ctrl_pts:
-                    # draw connector lines safely
-                    cp0 = ctrl_pts[0]
-                    try:
-                        start0 = (int(cp0.x), int(cp0.y))
-                    except Exception:
-                        start0 = (int(cp0[0]), int(cp0[1]))
-                    try:
-                        pygame.draw.line(temp_surf, control_line_color, (int(pt1.x), int(pt1.y)), start0, line_size)
-                    except Exception:
-                        pass
-
-                    cplast = ctrl_pts[-1]
-                    try:
-                        end_last = (int(cplast.x), int(cplast.y))
-                    except Exception:
-                        end_last = (int(cplast[0]), int(cplast[1]))
-                    try:
-                        pygame.draw.line(temp_surf, control_line_color, (int(pt2.x), int(pt2.y)), end_last, line_size)
-                    except Exception:
-                        pass
-
-                    prev_p = ctrl_pts[0]
-                    for p in ctrl_pts[1:]:
-                        try:
-                            pygame.draw.line(temp_surf, control_line_color, (int(prev_p.x), int(prev_p.y)), (int(p.x), int(p.y)), line_size)
-                        except Exception:
-                            try:
-                                pygame.draw.line(temp_surf, control_line_color, (int(prev_p[0]), int(prev_p[1])), (int(p[0]), int(p[1])), line_size)
-                            except Exception:
-                                pass
-                        prev_p = p
-
-                    for p in ctrl_pts:
-                        try:
-                            pygame.draw.circle(temp_surf, control_point_color, (int(p.x), int(p.y)), ctrl_pt_size)
-                        except Exception:
-                            try:
-                                pygame.draw.circle(temp_surf, control_point_color, (int(p[0]), int(p[1])), ctrl_pt_size)
-                            except Exception:
-                                pass
-
-            # Draw Bezier curve
-            full_path = [pt1] + ctrl_pts + [pt2]
-            steps = 200
-            tile = "CLEAR"
-            for s in range(steps + 1):
-                t = s / steps
-                draw_pos = get_bezier_loc(full_path, t)
-                # coerce to ints safely
-                # try:
-                dx = int(round(draw_pos.x))
-                dy = int(round(draw_pos.y))
-                # except Exception:
-                #     # fallback if draw_pos is a tuple (x,y)
-                #     try:
-                #         dx = int(round(draw_pos[0]))
-                #         dy = int(round(draw_pos[1]))
-                #     except Exception:
-                #         continue  # skip this point if we can't coerce coordinates
-
-                # bounds check: skip drawing points outside the screen
-                if dx < 0 or dy < 0 or dx >= screen.get_width() or dy >= screen.get_height():
-                    continue
-
-                if show_terrain:
-                    # safe terrain lookup
-                    idx = dx + (dy * width)
-                    if idx < 0 or idx >= len(terrain):
-                        color_key = "CLEAR"
-                    else:
-                        tile = terrain[idx]
-                        color_key = get_pixel_status(prev_tile, tile)
-                        prev_tile = tile
-
-                    # pick color mapping safely
-                    draw_col = (0, 0, 0)
-                    if color_key == "TERRAIN":
-                        base_color = get_key(tile, COLOR_MAP) if get_key(tile, COLOR_MAP) is not None else (0, 0, 0)
-                        if base_color:
-                            draw_col = (base_color[0] // 2, base_color[1] // 2, base_color[2] // 2)
-                    elif color_key == "CLIMB":
-                        draw_col = (255, 0, 0)
-                    elif color_key == "IMPASSIBLE":
-                        draw_col = (0, 0, 0)
-                    else:
-                        draw_col = (0, 200, 0)
-
-                    draw_col = _normalize_color_tuple(draw_col)
-                    pygame.draw.circle(temp_surf, draw_col, (dx, dy), line_size)
-                else:
-                    pygame.draw.circle(temp_surf, path_color, (dx, dy), line_size)
-
-    # Blit the temp surface onto the main screen
-    screen.blit(temp_surf, (0, 0))
+    global path_layer
+    if layer is None:
+        if path_layer is None:
+            path_layer = new_path_layer()
+        layer = path_layer
+    layer.draw(screen, path_list, path_color=_normalize_color_tuple(path_color), line_size=line_size,
+               draw_controllers=draw_controllers, show_terrain=show_terrain, adaptive=DRAW_ADAPTIVE)
+
+
+def new_path_layer():
+    """An empty path_render.PathLayer over the screen, coloring curves by the loaded terrain."""
+    from path_render import PathLayer
+    terrain_colors = []
+    for name in terrain_classes:
+        base_color = get_key(name, COLOR_MAP) or (0, 0, 0)
+        terrain_colors.append((base_color[0] // 2, base_color[1] // 2, base_color[2] // 2))
+    heights = [ground_colors[name] for name in terrain_classes]
+    return PathLayer(screen.get_size(), terrain, heights, terrain_colors, terrain_classes.index("GRAY"),
+                     ctrl_pt_size, FLATNESS_TOLERANCE)
 
 
 def add_path_point(pos: Location | None, click: str):
@@ -418,72 +354,109 @@ def remove_path_pts(pos: Location | None):
             if p and distance(p, pos) <= ctrl_pt_size + 3:
                 if p == pt1 or p == pt2:
                     paths.remove(path)
+                    touch_geometry()
                     return
-                path.control_pts.remove(p)
+                path.removeCtrlPt(p)
                 return
 
 
 #|  --- SAVE PATH FUNCTIONS ---  |#
-def format_path_save(paths_) -> str:
-    output = "["
-    for path in paths_:
-        ctrl_pts_text = "["
-        if len(path.control_pts) > 0:
-            for pt in path.control_pts:
-                if path.control_pts.index(pt) != len(path.control_pts) - 1:
-                    ctrl_pts_text += f"Location{tuple(pt)}, "
-                else:
-                    ctrl_pts_text += f"Location{tuple(pt)}]"
-        else:
-            ctrl_pts_text = "[]"
-        if path.path_pt1 and path.path_pt2:
-            try:
-                if paths_.index(path) != len(paths_) - 1:
-                    output += f"Path(Location{tuple(path.path_pt1)}, Location{tuple(path.path_pt2)}, {ctrl_pts_text}, {path.locked}), " # type: ignore
-                else:
-                    output += f"Path(Location{tuple(path.path_pt1)}, Location{tuple(path.path_pt2)}, {ctrl_pts_text}, {path.locked})]" # type: ignore
-            except TypeError:
-                pass
-        else:
-            output = "[Path(None, None)]"
-    return output
-
-
 def save_paths():
+    """Append the current route to the path store (PATH_STORE_FILE)."""
     global paths
+    from path_files import append_path_store
     try:
-        with open(PATH_SAVE_FILE, "w") as file:
-            file.write(f"from bezier_classes import Path, Location\nsaved_paths = {format_path_save(paths)}")
+        append_path_store(PATH_STORE_FILE, [paths])
         print("Paths saved.")
     except Exception as e:
         print("Failed to save paths:", e)
 
 
 def load_paths():
+    """Load the last route of the path store, or PATH_SAVE_FILE before anything was saved to the store."""
     global paths
+    from path_files import read_route
     try:
-        import importlib.util
-        spec = importlib.util.spec_from_file_location("path_save", PATH_SAVE_FILE)
-        if spec:
-            path_save = importlib.util.module_from_spec(spec)
-            if spec.loader:
-                spec.loader.exec_module(path_save)
-            paths = path_save.saved_paths
-            print("Paths loaded.")
-        else:
-            print("\"saved_paths\"  could not be found")
+        paths = read_route(PATH_STORE_FILE if os.path.exists(PATH_STORE_FILE) else PATH_SAVE_FILE)
+        print("Paths loaded.")
     except Exception as e:
         print("Failed to load paths:", e)
 
 
 def reset_paths():
-    global paths, prev_paths
+    global paths, graph_heatmap, graph_best
     # Reset runtime paths to a single empty path
-    prev_paths = []
+    graph_log.clear()
+    graph_heatmap = None
+    graph_best = (float("inf"), None)
     paths = [Path(None, None)]
     print("Paths reset (runtime only).")
 
 
+def get_planner_grid():
+    global planner_grid
+    if planner_grid is None:
+        from planner import PlannerGrid
+        planner_grid = PlannerGrid(cost_model)
+    return planner_grid
+
+
+def get_terrain_pyramid():
+    global terrain_pyramid
+    if terrain_pyramid is None:
+        from pyramid import TerrainPyramid
+        terrain_pyramid = TerrainPyramid(cost_model, base_grid=get_planner_grid())
+    return terrain_pyramid
+
+
+def load_goal_fields(rebuild=False):
+    """
+    Cost-to-go fields for every recovery point (computed once, then read from the terrain cache).
+    main runs this on a background thread after the first frame: cold, it takes seconds per point.
+    goal_fields is replaced once all are ready, so the HUD never sees it half filled.
+    """
+    global goal_fields
+    from planner import load_cost_to_go
+    start_time = time.perf_counter()
+    fields = {}
+    for name, goal in RECOVERY_POINTS.items():
+        fields[name] = load_cost_to_go(planner_grid or cost_model, goal, rebuild)  # no grid needed when cached
+    goal_fields = fields
+    print(f"Cost-to-go fields ready in {time.perf_counter() - start_time:.2f}s")
+
+
+def best_times(pos):
+    """Optimal time from pos to each recovery point, as 'A 00:03:30' labels (empty off the map)."""
+    x, y = pos
+    if not (0 <= x < width and 0 <= y < height):
+        return []
+    return [f"{name} {format_time(field[y, x])}" if np.isfinite(field[y, x]) else f"{name} --:--:--"
+            for name, field in goal_fields.items()]
+
+
+def plan_paths():
+    """Replace the paths with a planned route from the first point to the last one, fitted as Bezier segments."""
+    global paths
+    from curve_fit import fit_route
+    from planner import plan_route
+    from pyramid import plan_route_coarse_to_fine
+    points = [p for path in paths for p in (path.path_pt1, path.path_pt2) if p]
+    if len(points) < 2:
+        print("Place a start and an end point to plan a route.")
+        return
+    start_time = time.perf_counter()
+    if PLAN_COARSE_TO_FINE:
+        route, route_time, expanded = plan_route_coarse_to_fine(get_terrain_pyramid(), points[0], points[-1])
+    else:
+        route, route_time, expanded = plan_route(get_planner_grid(), points[0], points[-1])
+    if route is None:
+        print("No route between the first and last point.")
+        return
+    paths = fit_route(route, cost_model, SCORING_MODE)
+    print(f"Planned route: {route_time:.2f}s over {len(route)}px ({expanded} nodes), "
+          f"{len(paths)} segments in {time.perf_counter() - start_time:.2f}s")
+
+
 #|  --- USER INTERACTION ---  |#
 def check_events():
     global dragging_point, paths, score, running, hover_point, remember_graph, calculate_graph
@@ -532,63 +505,66 @@ def check_events():
                     calculate_graph = not calculate_graph
             else:
                 if key == pygame.K_SPACE:
+                    compare_scoring_modes(paths)
                     score = score_all_paths(paths)
+                elif key == pygame.K_p and not (remember_graph or calculate_graph):
+                    plan_paths()
 
 
 #|  --- GRAPH FUNCTIONS ---  |#
 def store_graph():
-    global prev_paths, paths
-    snapshot = copy.deepcopy(paths)
-    if not prev_paths or snapshot != prev_paths[-1]:
-        prev_paths.append(snapshot)
-        print(f"Stored graph snapshot #{len(prev_paths)}")
+    if graph_log.record(paths):
+        print(f"Stored graph snapshot #{graph_log.count}")
 
 
-# saved_paths = [Path(Location(32, 769), Location(199, 485), [Location(161, 485)], True), Path(Location(199, 485), Location(420, 483), [Location(356, 490)], True), Path(Location(420, 482), Location(582, 349), [Location(486, 423), Location(550, 366)], True), Path(Location(582, 349), Location(764, 416), [Location(758, 282), Location(680, 368)], True), Path(Location(763, 416), Location(820, 89), [Location(879, 325), Location(717, 232), Location(842, 211), Location(953, 370), Location(784, 188)], True), Path(Location(818, 87), Location(1005, 338), [Location(804, 265)], True), Path(Location(1005, 339), Location(879, 630), [Location(902, 512), Location(862, 578)], True), Path(Location(879, 630), Location(929, 660), [Location(904, 644)], False)]
 def render_graph():
-    global prev_paths
-    # --- Find score bounds ---
-    max_score = 0
-    min_score = 10000
-    best_path = []
-
-    for path_ in prev_paths:
-        cur_score = score_all_paths(path_)
-        if 5 < cur_score < 10000:
-            if cur_score < min_score:
-                best_path = path_
-            max_score = max(max_score, cur_score)
-            min_score = min(min_score, cur_score)
-    best_path_idx = prev_paths.index(best_path)
-    for path_ in prev_paths:
-        for point in path_:
-            pt_idx = path_.index(point)
-            prev_paths[best_path_idx][pt_idx]
-    with open(BEST_PATH_FILE, "w") as file:
+    """
+    Score the recorded snapshots not drawn yet, splat them into the score heatmap (see heatmap.py),
+    draw it with one blit and the best route on top, and save the best route.
+    """
+    global graph_heatmap, graph_best
+    from heatmap import ScoreHeatmap, splat_log  # imports multiprocessing for the scoring pool
+    from path_files import write_path_file
+    if graph_log.count == 0:  # the file may still hold a previous session's snapshots
+        print("No graph snapshots recorded.")
+        return
+    graph_log.flush()
+    if graph_heatmap is None:
+        graph_heatmap = ScoreHeatmap(width, height)
+    # Snapshots are scored across a process pool (GRAPH_WORKERS), or here when only a few are new
+    best_score, best_snapshot = splat_log(graph_heatmap, SNAPSHOT_LOG_FILE, GRAPH_WORKERS, SCORING_MODE,
+                                         cost_model)
+    if best_snapshot is not None and best_score < graph_best[0]:
+        graph_best = (best_score, snapshot_paths(*best_snapshot))
         print("SAVING BEST PATH")
-        file.write(f"from bezier_classes import Path, Location\nsaved_paths = {format_path_save(best_path)}")
-    # --- Draw paths with normalized color ---
-    for path_ in prev_paths:
-        total_score = sum(path.score for path in path_)
-        if min_score != max_score:
-            green_val = int(map_value(total_score, min_score, max_score, 0, 255))
-        else:
-            green_val = 128  # fallback if all scores are the same
-        display_color = (0, green_val, 0, green_val)
-        draw_bezier(path_, display_color, 1, False)
+        write_path_file(BEST_PATH_FILE, graph_best[1])
+    if graph_best[1] is None:
+        print("No scorable snapshots recorded.")
+
+    rgba = graph_heatmap.to_rgba()
+    heat = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.surfarray.pixels3d(heat)[:] = rgba[..., :3].transpose(1, 0, 2)
+    pygame.surfarray.pixels_alpha(heat)[:] = rgba[..., 3].T
+    screen.blit(heat, (0, 0))
+    if graph_best[1] is not None:
+        draw_bezier(graph_best[1], (255, 255, 0, 255), 2, False, layer=new_path_layer())
 
 
 #|  --- MAIN ---  |#
 def main():
-    global dragging_point, paths, terrain, width, height, surface, screen, score
-    terrain, width, height, surface = load_image_as_terrain(IMAGE_FILE)
-    pygame.init()
-    pygame.font.init()
-
-    screen = pygame.display.set_mode((width, height))
-    pygame.display.set_caption("Path Visualizer")
+    global dragging_point, paths, score, score_worker
+    rebuild = REBUILD_TERRAIN_CACHE or "--rebuild-terrain" in sys.argv
+    benchmark = "--startup-benchmark" in sys.argv  # exit after the first frame, see tests/test_startup.py
+    # Terrain loads (mostly NumPy and file I/O) while pygame imports and the window opens
+    with ThreadPoolExecutor(1) as loader:
+        terrain_loaded = loader.submit(load_terrain_data, rebuild)
+        font_obj = init_display()
+        terrain_loaded.result()
+    score_worker = ScoreWorker(cost_model)
+    graph_log.clear()  # snapshots of a previous session are not part of this one's graph
     clock = pygame.time.Clock()
-    font_obj = pygame.font.SysFont(None, 24)
+    first_frame = True
+    shown_result = None
 
     hover_point = pygame.mouse.get_pos()
     score = 0
@@ -596,17 +572,24 @@ def main():
     while running:
         check_events()
         screen.blit(surface, (0, 0))
-        score = score_all_paths(paths)
+        result = request_score(paths)
+        if result is not shown_result and result is not None:
+            shown_result, score = result, result.total
+            pygame.display.set_caption(f"Path Visualizer  (scored in {result.compute * 1000:.0f}ms, "
+                                       f"{result.latency * 1000:.0f}ms after the change)")
         hover_point = pygame.mouse.get_pos()
 
-        # Display score next to cursor
+        # Display the last known score next to cursor, marked while a newer one is computing
         if hover_point and score is not None:
-            formatted_time = f"{int(score)//3600:02}:{(int(score)%3600)//60:02}:{int(score)%60:02}"
-            text_surf = font_obj.render(f"{formatted_time}", True, (0, 0, 0))
-            text_bg = pygame.Surface((text_surf.get_width() + 6, text_surf.get_height() + 4))
-            text_bg.fill((255, 255, 255))
-            text_bg.blit(text_surf, (3, 2))
-            screen.blit(text_bg, (hover_point[0] + 10, hover_point[1] + 10))
+            score_label = format_time(score) + ("  (computing...)" if score_worker.pending else
+                                                "  (scoring failed)" if shown_result and shown_result.error else "")
+            labels = [score_label] + (["Best " + "  ".join(best_times(hover_point))] if goal_fields else [])
+            for row, label in enumerate(labels):
+                text_surf = font_obj.render(label, True, (0, 0, 0))
+                text_bg = pygame.Surface((text_surf.get_width() + 6, text_surf.get_height() + 4))
+                text_bg.fill((255, 255, 255))
+                text_bg.blit(text_surf, (3, 2))
+                screen.blit(text_bg, (hover_point[0] + 10, hover_point[1] + 10 + row * (text_bg.get_height() + 2)))
         if remember_graph:
             store_graph()
             draw_bezier(paths, line_size=2, show_terrain=True)
@@ -621,8 +604,18 @@ def main():
             draw_bezier(paths, line_size=2, show_terrain=True)
         
         pygame.display.flip()
+        if first_frame:
+            first_frame = False
+            startup = time.perf_counter() - _start_time
+            print(f"First frame after {startup:.3f}s (target {STARTUP_TARGET}s)")
+            if benchmark:
+                break
+            if SHOW_BEST_TIME:
+                threading.Thread(target=load_goal_fields, args=(rebuild,), daemon=True).start()
         clock.tick(60)
 
+    graph_log.close()
+    score_worker.close()
     pygame.quit()
     sys.exit()
 
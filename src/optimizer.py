@@ -0,0 +1,236 @@
+import argparse
+import os
+import time
+from math import log, sqrt
+
+import numpy as np
+
+import config
+from bezier_classes import Path, Location
+from parallel_scoring import init_worker, scoring_pool, worker_model
+from path_files import read_route, write_path_file
+from scoring import CostModel, load_cost_model, score_curves
+
+
+#|  --- INFO ---  |#
+'''
+Headless control-point optimizer for a saved route.
+
+Every segment's endpoints stay fixed, so the route total is the sum of independent segment scores
+and each segment is optimized on its own. Each segment gets RESTARTS independent CMA-ES runs
+(the first starts from the saved control points, the others from jittered copies); whole
+populations are scored in one batch through score_curves, and the runs are spread over a process pool.
+
+Only the best half of a generation moves CMA-ES, so each generation is scored against a bound: the
+worst score the previous generation selected. Candidates over it are abandoned early, score inf and
+rank last. If fewer than half a generation beats the bound, the pruned candidates are scored in full,
+so selection is the same as without the bound.
+
+Run from the repository root:  python src/optimizer.py --budget 4000 --workers 4
+'''
+
+
+#|  --- CONFIG ---  |#
+BUDGET = 4000       # Score evaluations per segment (shared by its restarts)
+RESTARTS = 4
+POPULATION = 32     # Candidates per CMA-ES generation (one score_curves batch)
+SIGMA = 20.0        # Initial step size (px)
+
+
+#|  --- CMA-ES ---  |#
+def cma_es(objective, x0, sigma0, budget, rng, population=POPULATION, lower=None, upper=None, bounded=False):
+    """
+    Minimize objective with a (mu/mu_w, lambda) CMA-ES. objective takes an (n, dim) batch and returns n scores.
+    Candidates are clipped to [lower, upper] before scoring.
+    bounded: objective also takes bound=, the worst score still selected (None for no bound), and may
+    return inf for candidates above it (see INFO).
+
+    Returns:
+        best_x, best_f, evaluations used
+    """
+    x0 = np.asarray(x0, dtype=np.float64)
+    n = len(x0)
+    lam = max(population, 4 + int(3 * log(n)))
+    mu = lam // 2
+    weights = log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+    weights /= weights.sum()
+    mueff = 1 / np.sum(weights ** 2)
+
+    cc = (4 + mueff / n) / (n + 4 + 2 * mueff / n)
+    cs = (mueff + 2) / (n + mueff + 5)
+    c1 = 2 / ((n + 1.3) ** 2 + mueff)
+    cmu = min(1 - c1, 2 * (mueff - 2 + 1 / mueff) / ((n + 2) ** 2 + mueff))
+    damps = 1 + 2 * max(0, sqrt((mueff - 1) / (n + 1)) - 1) + cs
+    chi_n = sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+    mean = np.clip(x0, lower, upper) if lower is not None else x0.copy()
+    sigma = sigma0
+    cov = np.eye(n)
+    pc = np.zeros(n)
+    ps = np.zeros(n)
+    best_x = mean.copy()
+    best_f = float(objective(mean[None])[0])
+    evals = 1
+    generation = 0
+    bound = None
+
+    while evals + lam <= budget:
+        generation += 1
+        eigvals, basis = np.linalg.eigh(cov)
+        scale = np.sqrt(np.maximum(eigvals, 1e-20))
+        y = rng.standard_normal((lam, n)) @ (basis * scale).T
+        x = mean + sigma * y
+        if lower is not None:
+            x = np.clip(x, lower, upper)
+            y = (x - mean) / sigma
+        if bounded:
+            f = objective(x, bound=bound)
+            pruned = np.flatnonzero(np.isinf(f))
+            if bound is not None and lam - len(pruned) < mu:  # too few survivors to select from
+                f[pruned] = objective(x[pruned], bound=None)
+                evals += len(pruned)
+        else:
+            f = objective(x)
+        evals += lam
+
+        order = np.argsort(f)
+        if bounded:
+            bound = float(f[order[mu - 1]])
+        if f[order[0]] < best_f:
+            best_f = float(f[order[0]])
+            best_x = x[order[0]].copy()
+
+        y_sel = y[order[:mu]]
+        y_w = weights @ y_sel
+        mean = mean + sigma * y_w
+
+        inv_sqrt = (basis / scale) @ basis.T
+        ps = (1 - cs) * ps + sqrt(cs * (2 - cs) * mueff) * (inv_sqrt @ y_w)
+        hsig = np.linalg.norm(ps) / sqrt(1 - (1 - cs) ** (2 * generation)) / chi_n < 1.4 + 2 / (n + 1)
+        pc = (1 - cc) * pc + hsig * sqrt(cc * (2 - cc) * mueff) * y_w
+        cov = ((1 - c1 - cmu) * cov
+               + c1 * (np.outer(pc, pc) + (1 - hsig) * cc * (2 - cc) * cov)
+               + cmu * (y_sel.T * weights) @ y_sel)
+        sigma *= np.exp((cs / damps) * (np.linalg.norm(ps) / chi_n - 1))
+        if sigma < 1e-3:  # converged to well below a pixel
+            break
+
+    return best_x, best_f, evals
+
+
+#|  --- SEGMENT OPTIMIZER ---  |#
+def optimize_segment(points, model: CostModel, budget=BUDGET, sigma0=SIGMA, seed=0, start_jitter=0.0,
+                     population=POPULATION, mode=config.SCORING_MODE, curve_steps=500):
+    """
+    Optimize the inner control points of one segment, keeping points[0] and points[-1] fixed.
+    Control points are kept on the map, which (convex hull) keeps the whole curve on the map.
+
+    Returns:
+        (k, 2) best control points, best score
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    n_inner = len(pts) - 2
+    lower = np.tile([0.0, 0.0], n_inner)
+    upper = np.tile([model.width - 1.0, model.height - 1.0], n_inner)
+
+    def objective(x, bound=None):
+        candidates = np.repeat(pts[None], len(x), axis=0)
+        candidates[:, 1:-1] = x.reshape(len(x), n_inner, 2)
+        return score_curves(candidates, model, curve_steps, mode=mode, flatness=config.FLATNESS_TOLERANCE,
+                            bound=bound)
+
+    x0 = pts[1:-1].ravel()
+    if start_jitter > 0:
+        x0 = x0 + rng.normal(0, start_jitter, x0.shape)
+    best_x, best_f, _ = cma_es(objective, x0, sigma0, budget, rng, population, lower, upper, bounded=True)
+    best = pts.copy()
+    best[1:-1] = best_x.reshape(n_inner, 2)
+    return best, best_f
+
+
+def _run_task(task):
+    segment, points, kwargs = task
+    best, best_f = optimize_segment(points, worker_model(), **kwargs)
+    return segment, best, best_f
+
+
+def optimize_route(route, budget=BUDGET, restarts=RESTARTS, workers=None, sigma0=SIGMA, population=POPULATION,
+                   mode=config.SCORING_MODE, curve_steps=500, seed=0, image_file=None):
+    """
+    Optimize the control points of every segment of route (a list of Path), endpoints fixed.
+
+    Returns:
+        new list of Path with the best control points found, and its total score
+    """
+    tasks = []
+    for i, path in enumerate(route):
+        if not (path.path_pt1 and path.path_pt2) or len(path.control_pts) == 0:
+            continue
+        points = [tuple(path.path_pt1)] + [tuple(p) for p in path.control_pts] + [tuple(path.path_pt2)]
+        for r in range(restarts):
+            kwargs = dict(budget=budget // restarts, sigma0=sigma0, seed=seed + 1000 * i + r,
+                          start_jitter=0.0 if r == 0 else 2 * sigma0, population=population,
+                          mode=mode, curve_steps=curve_steps)
+            tasks.append((i, points, kwargs))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with scoring_pool(workers, image_file) as pool:
+            results = list(pool.map(_run_task, tasks))
+    else:
+        init_worker(image_file)
+        results = [_run_task(task) for task in tasks]
+
+    best = {}
+    for segment, points, score in results:
+        if segment not in best or score < best[segment][1]:
+            best[segment] = (points, score)
+
+    new_route = []
+    for i, path in enumerate(route):
+        if i in best:
+            ctrl_pts = [Location(round(float(x), 2), round(float(y), 2)) for x, y in best[i][0][1:-1]]
+        else:
+            ctrl_pts = list(path.control_pts)
+        new_route.append(Path(path.path_pt1, path.path_pt2, ctrl_pts, path.locked))
+
+    # Rescore the saved (rounded) coordinates rather than trusting the workers' best values
+    curves = [[p.path_pt1] + p.control_pts + [p.path_pt2] for i, p in enumerate(new_route) if i in best]
+    model = load_cost_model(image_file)
+    total = float(score_curves(curves, model, curve_steps, mode=mode, flatness=config.FLATNESS_TOLERANCE).sum())
+    return new_route, total
+
+
+#|  --- MAIN ---  |#
+def main():
+    parser = argparse.ArgumentParser(description="Optimize the control points of a saved route.")
+    default_input = config.PATH_STORE_FILE if os.path.exists(config.PATH_STORE_FILE) else config.PATH_SAVE_FILE
+    parser.add_argument("--input", default=default_input, help="path file or path store (last route) to optimize")
+    parser.add_argument("--output", default=config.BEST_PATH_FILE, help="path file to write the winner to")
+    parser.add_argument("--budget", type=int, default=BUDGET, help="score evaluations per segment")
+    parser.add_argument("--restarts", type=int, default=RESTARTS)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--mode", default=config.SCORING_MODE, help="scoring mode, see scoring.SCORING_MODES")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    route = read_route(args.input)
+    model = load_cost_model()
+    curves = [[p.path_pt1] + p.control_pts + [p.path_pt2] for p in route if p.path_pt1 and p.path_pt2 and p.control_pts]
+    before = score_curves(curves, model, mode=args.mode).sum()
+
+    start = time.perf_counter()
+    new_route, total = optimize_route(route, args.budget, args.restarts, args.workers, mode=args.mode, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Route score: {before:.2f}s -> {total:.2f}s ({elapsed:.1f}s)")
+    if total < before:
+        write_path_file(args.output, new_route)
+        print(f"Best path saved to {args.output}")
+    else:
+        print("No improvement, nothing saved.")
+
+
+if __name__ == "__main__":
+    main()
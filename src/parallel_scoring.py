@@ -0,0 +1,98 @@
+import multiprocessing
+import os
+from collections import deque
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from scoring import load_cost_model, score_curves
+
+
+#|  --- CONFIG ---  |#
+CHUNK_SIZE = 64  # Snapshots per task sent to a worker
+POOL_START_METHOD = "forkserver"  # Not fork: the GUI has threads running (score worker, snapshot log writer)
+
+
+#|  --- WORKERS ---  |#
+_worker_model = None
+
+
+def init_worker(image_file=None):
+    """Process pool initializer: every worker maps the cached terrain read-only instead of receiving a copy."""
+    global _worker_model
+    _worker_model = load_cost_model(image_file)
+
+
+def worker_model():
+    return _worker_model
+
+
+def scoring_pool(workers, image_file=None) -> ProcessPoolExecutor:
+    """
+    Process pool whose workers each load the cost model (see init_worker). Workers are not forked from
+    the caller, whose other threads may hold locks a forked child would never see released.
+    """
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(POOL_START_METHOD),
+                               initializer=init_worker, initargs=(image_file,))
+
+
+def snapshot_curves(snapshot):
+    """Control polygons of a list of Path as plain coordinate lists (cheap to pickle), None for unscorable paths."""
+    curves = []
+    for path in snapshot:
+        if path.path_pt1 and path.path_pt2 and len(path.control_pts) > 0:
+            curves.append([tuple(path.path_pt1)] + [tuple(p) for p in path.control_pts] + [tuple(path.path_pt2)])
+        else:
+            curves.append(None)
+    return curves
+
+
+def _score_chunk(task, model=None):
+    """
+    Score a chunk of snapshots with one batched score_curves call (with model, or the worker's), returns one
+    score list per snapshot.
+    """
+    chunk, mode, curve_steps, flatness = task
+    flat = [c for curves in chunk for c in curves if c is not None]
+    scores = iter(score_curves(flat, model or _worker_model, curve_steps, mode=mode, flatness=flatness).tolist())
+    return [[next(scores) if c is not None else 0 for c in curves] for curves in chunk]
+
+
+#|  --- SNAPSHOT SCORING ---  |#
+def _chunks(items, chunk_size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_curve_list_scores(curve_lists, workers=None, chunk_size=CHUNK_SIZE, mode=config.SCORING_MODE, curve_steps=500,
+                           flatness=config.FLATNESS_TOLERANCE, image_file=None, model=None):
+    """
+    Score a stream of snapshots given as lists of control polygons (None for unscorable paths, see snapshot_curves)
+    across a process pool, yielding one list of per-path scores per snapshot, in order.
+    At most two chunks per worker are in flight, so memory stays bounded however long the stream is.
+    A stream that fits in one chunk is scored in this process (with model, if given) without starting a pool.
+    """
+    chunks = _chunks(curve_lists, chunk_size)
+    head = list(islice(chunks, 2))
+    tasks = ((chunk, mode, curve_steps, flatness) for chunk in chain(head, chunks))
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(head) > 1:
+        with scoring_pool(workers, image_file) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(_score_chunk, task))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    else:
+        if model is None and _worker_model is None:
+            init_worker(image_file)
+        for task in tasks:
+            yield from _score_chunk(task, model)
@@ -0,0 +1,255 @@
+import argparse
+import importlib.util
+import os
+import struct
+
+import numpy as np
+
+from bezier_classes import Path, Location
+
+
+#|  --- PATH FILES ---  |#
+# A path file is a Python module "from bezier_classes import Path, Location\nsaved_paths = [...]"
+# (see path_save.py and best_path.py)
+
+
+def format_path_save(paths_) -> str:
+    output = "["
+    for i, path in enumerate(paths_):
+        ctrl_pts_text = "["
+        if len(path.control_pts) > 0:
+            for j, pt in enumerate(path.control_pts):
+                if j != len(path.control_pts) - 1:
+                    ctrl_pts_text += f"Location{tuple(pt)}, "
+                else:
+                    ctrl_pts_text += f"Location{tuple(pt)}]"
+        else:
+            ctrl_pts_text = "[]"
+        if path.path_pt1 and path.path_pt2:
+            try:
+                if i != len(paths_) - 1:
+                    output += f"Path(Location{tuple(path.path_pt1)}, Location{tuple(path.path_pt2)}, {ctrl_pts_text}, {path.locked}), " # type: ignore
+                else:
+                    output += f"Path(Location{tuple(path.path_pt1)}, Location{tuple(path.path_pt2)}, {ctrl_pts_text}, {path.locked})]" # type: ignore
+            except TypeError:
+                pass
+        else:
+            output = "[Path(None, None)]"
+    return output
+
+
+def write_path_file(file_name, paths_):
+    with open(file_name, "w") as file:
+        file.write(f"from bezier_classes import Path, Location\nsaved_paths = {format_path_save(paths_)}")
+
+
+def read_path_file(file_name) -> list:
+    spec = importlib.util.spec_from_file_location("path_save", file_name)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"\"saved_paths\" could not be found in {file_name}")
+    path_save = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(path_save)
+    return path_save.saved_paths
+
+
+#|  --- PATH STORE ---  |#
+# A path store is a binary library of routes (lists of Path), memory-mapped on load:
+#     header:  magic, version
+#     blocks:  n_routes, n_paths, n_points (uint64), then
+#              route_offsets int64[n_routes + 1]  paths of route r are path_offsets[route_offsets[r]:...]
+#              path_offsets  int64[n_paths + 1]   points of path p are coords[path_offsets[p]:path_offsets[p + 1]]
+#              locked        uint8[n_paths]
+#              coords        float32[n_points, 2] pt1, control points, pt2 of every path
+#     every array starts 8-byte aligned. Appending adds a block, so saving never rewrites the library;
+#     a block left incomplete by an interrupted append is skipped on read and cut off by the next append.
+# Incomplete paths (no pt1 or pt2) are not stored, as in format_path_save.
+PATH_STORE_MAGIC = b"PATHSTOR"
+PATH_STORE_VERSION = 1
+_FILE_HEADER = struct.Struct("<8sI4x")
+_BLOCK_HEADER = struct.Struct("<QQQ")
+
+
+def _padded(n_bytes):
+    return -(-n_bytes // 8) * 8
+
+
+def _block_bytes(routes) -> bytes:
+    route_counts, point_counts, locked, coords = [], [], [], []
+    for route in routes:
+        complete = [p for p in route if p.path_pt1 and p.path_pt2]
+        route_counts.append(len(complete))
+        for path in complete:
+            points = [tuple(path.path_pt1)] + [tuple(pt) for pt in path.control_pts] + [tuple(path.path_pt2)]
+            point_counts.append(len(points))
+            locked.append(bool(path.locked))
+            coords.extend(points)
+    route_offsets = np.concatenate([[0], np.cumsum(route_counts, dtype=np.int64)])
+    path_offsets = np.concatenate([[0], np.cumsum(point_counts, dtype=np.int64)])
+    parts = [_BLOCK_HEADER.pack(len(route_counts), len(point_counts), len(coords)),
+             route_offsets.astype("<i8").tobytes(), path_offsets.astype("<i8").tobytes()]
+    for array in (np.array(locked, dtype=np.uint8), np.array(coords, dtype="<f4").reshape(-1, 2)):
+        data = array.tobytes()
+        parts.append(data + bytes(_padded(len(data)) - len(data)))
+    return b"".join(parts)
+
+
+def write_path_store(file_name, routes):
+    """Write routes (a list of lists of Path) as a new path store, atomically replacing file_name."""
+    tmp_file = f"{file_name}.tmp"
+    with open(tmp_file, "wb") as file:
+        file.write(_FILE_HEADER.pack(PATH_STORE_MAGIC, PATH_STORE_VERSION))
+        file.write(_block_bytes(routes))
+    os.replace(tmp_file, file_name)
+
+
+def append_path_store(file_name, routes):
+    """Add routes at the end of a path store (created if missing) without rewriting it."""
+    if not os.path.exists(file_name):
+        write_path_store(file_name, routes)
+        return
+    with open(file_name, "r+b") as file:
+        _check_header(file.read(_FILE_HEADER.size), file_name)
+        # Drop a block cut short by an interrupted append, which would otherwise swallow the new one
+        end = _complete_length(file)
+        file.truncate(end)
+        file.seek(end)
+        file.write(_block_bytes(routes))
+
+
+def _block_sizes(n_routes, n_paths, n_points):
+    """Bytes of route_offsets, path_offsets, locked and coords in a block."""
+    return 8 * (n_routes + 1), 8 * (n_paths + 1), _padded(n_paths), _padded(8 * n_points)
+
+
+def _complete_length(file) -> int:
+    """Bytes of the path store file up to the end of its last complete block, walking the block headers."""
+    size = file.seek(0, os.SEEK_END)
+    pos = _FILE_HEADER.size
+    while pos + _BLOCK_HEADER.size <= size:
+        file.seek(pos)
+        counts = _BLOCK_HEADER.unpack(file.read(_BLOCK_HEADER.size))
+        block_end = pos + _BLOCK_HEADER.size + sum(_block_sizes(*counts))
+        if block_end > size:
+            break
+        pos = block_end
+    return pos
+
+
+def _check_header(data, file_name):
+    if len(data) < _FILE_HEADER.size:
+        raise ValueError(f"{file_name} is not a path store")
+    magic, version = _FILE_HEADER.unpack_from(data)
+    if magic != PATH_STORE_MAGIC:
+        raise ValueError(f"{file_name} is not a path store")
+    if version != PATH_STORE_VERSION:
+        raise ValueError(f"{file_name} has path store version {version}, expected {PATH_STORE_VERSION}")
+
+
+class PathStore:
+    """
+    A path store read as flat arrays (see the layout above), memory-mapped read-only when it has one block.
+    Scoring can take route_curves straight from the arrays; route_paths builds Path objects for one route.
+    """
+    def __init__(self, route_offsets, path_offsets, locked, coords):
+        self.route_offsets = route_offsets
+        self.path_offsets = path_offsets
+        self.locked = locked
+        self.coords = coords
+
+    def __len__(self):
+        return len(self.route_offsets) - 1
+
+    def route_curves(self, route):
+        """
+        Control polygons of one route as a padded (n_paths, k, 2) float64 array and (n_paths,) point counts,
+        the batch form score_curves takes.
+        """
+        first, last = self.route_offsets[route], self.route_offsets[route + 1]
+        starts = np.asarray(self.path_offsets[first:last])
+        counts = np.asarray(self.path_offsets[first + 1:last + 1]) - starts
+        curves = np.zeros((len(counts), counts.max(initial=0), 2))
+        # Pad with each curve's last point, so the padding stays on the map
+        index = starts[:, None] + np.minimum(np.arange(curves.shape[1]), counts[:, None] - 1)
+        if len(counts):
+            curves[:] = self.coords[index]
+        return curves, counts
+
+    def route_paths(self, route) -> list:
+        """One route as a list of Path (integral coordinates come back as int)."""
+        first, last = self.route_offsets[route], self.route_offsets[route + 1]
+        paths = []
+        for p in range(first, last):
+            points = [Location(*(int(v) if v.is_integer() else round(v, 2) for v in pt))
+                      for pt in self.coords[self.path_offsets[p]:self.path_offsets[p + 1]].tolist()]
+            paths.append(Path(points[0], points[-1], points[1:-1], bool(self.locked[p])))
+        return paths or [Path(None, None)]
+
+
+def read_path_store(file_name) -> PathStore:
+    """Map a path store. A block cut short by an interrupted append is ignored."""
+    data = np.memmap(file_name, dtype=np.uint8, mode="r")
+    _check_header(data[:_FILE_HEADER.size].tobytes(), file_name)
+    blocks = []
+    pos = _FILE_HEADER.size
+    while pos + _BLOCK_HEADER.size <= len(data):
+        n_routes, n_paths, n_points = _BLOCK_HEADER.unpack_from(data, pos)
+        pos += _BLOCK_HEADER.size
+        sizes = _block_sizes(n_routes, n_paths, n_points)
+        if pos + sum(sizes) > len(data):
+            break
+        route_offsets = np.frombuffer(data, "<i8", n_routes + 1, pos)
+        path_offsets = np.frombuffer(data, "<i8", n_paths + 1, pos + sizes[0])
+        locked = np.frombuffer(data, np.uint8, n_paths, pos + sizes[0] + sizes[1])
+        coords = np.frombuffer(data, "<f4", 2 * n_points, pos + sum(sizes[:3])).reshape(-1, 2)
+        blocks.append((route_offsets, path_offsets, locked, coords))
+        pos += sum(sizes)
+    if len(blocks) == 1:
+        return PathStore(*blocks[0])
+    if not blocks:
+        empty = np.zeros(1, dtype=np.int64)
+        return PathStore(empty, empty, np.zeros(0, dtype=np.uint8), np.zeros((0, 2), dtype=np.float32))
+    # Several blocks: shift each block's offsets past the previous ones
+    route_offsets, path_offsets = [np.zeros(1, np.int64)], [np.zeros(1, np.int64)]
+    for routes, paths, _, _ in blocks:
+        route_offsets.append(routes[1:] + route_offsets[-1][-1])
+        path_offsets.append(paths[1:] + path_offsets[-1][-1])
+    return PathStore(np.concatenate(route_offsets), np.concatenate(path_offsets),
+                     np.concatenate([b[2] for b in blocks]), np.concatenate([b[3] for b in blocks]))
+
+
+def is_path_store(file_name) -> bool:
+    with open(file_name, "rb") as file:
+        return file.read(len(PATH_STORE_MAGIC)) == PATH_STORE_MAGIC
+
+
+def read_route(file_name, route=-1) -> list:
+    """One route (default: the last one) of a path store, or the paths of a path file."""
+    if is_path_store(file_name):
+        store = read_path_store(file_name)
+        return store.route_paths(range(len(store))[route]) if len(store) else [Path(None, None)]
+    return read_path_file(file_name)
+
+
+#|  --- MAIN ---  |#
+def main():
+    parser = argparse.ArgumentParser(description="Convert between path files and path stores.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="append path files to a path store, one route each")
+    import_parser.add_argument("store")
+    import_parser.add_argument("files", nargs="+")
+    export_parser = commands.add_parser("export", help="write one route of a path store as a path file")
+    export_parser.add_argument("store")
+    export_parser.add_argument("file")
+    export_parser.add_argument("--route", type=int, default=-1, help="route index (default: the last one)")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        append_path_store(args.store, [read_path_file(f) for f in args.files])
+        print(f"{args.store}: {len(read_path_store(args.store))} routes")
+    else:
+        write_path_file(args.file, read_route(args.store, args.route))
+        print(f"Route {args.route} written to {args.file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import numpy as np
+import pygame
+
+from bezier_sampler import flatten_bezier_cached, sample_bezier_pixels
+from terrain import CLEAR_CLASS
+
+
+#|  --- INFO ---  |#
+'''
+Retained-mode drawing of paths (draw_bezier in manual_path).
+
+A PathLayer keeps one transparent surface the size of the screen with every path drawn on it. Each path's
+drawing (polyline runs of one status color, control polygon) is cached under its geometry version, so a
+frame only rebuilds the paths that changed, clears and redraws only the rectangles they covered before and
+cover now, and copies only the rectangles holding paths onto the screen. Curves are drawn as a few
+pygame.draw.lines calls per path (one per run of equal color) instead of a circle per sample.
+'''
+
+
+#|  --- CONFIG ---  |#
+CURVE_STEPS = 200  # Samples per curve (unless adaptive)
+CLEAR_COLOR = (0, 200, 0)
+CLIMB_COLOR = (255, 0, 0)
+IMPASSIBLE_COLOR = (0, 0, 0)
+MAIN_POINT_COLOR = (100, 100, 100, 255)
+CONTROL_LINE_COLOR = (160, 160, 160, 255)
+CONTROL_POINT_COLOR = (150, 150, 150, 255)
+MAX_DIRTY_RECTS = 16  # Beyond this many, one rectangle around all of them is redrawn
+
+
+#|  --- STATUS COLORS ---  |#
+def status_colors(xs, ys, classes, class_heights, terrain_colors, gray_class):
+    """
+    (n, 3) uint8 draw color of every sample, as get_pixel_status in manual_path: black on GRAY, red where the
+    class height rises from the previous sample, green on CLEAR, the terrain_colors of the class elsewhere.
+    Samples off the class grid take the nearest cell.
+    """
+    tiles = classes[np.clip(ys, 0, classes.shape[0] - 1), np.clip(xs, 0, classes.shape[1] - 1)]
+    prev = np.concatenate([[CLEAR_CLASS], tiles[:-1]])
+    heights = np.asarray(class_heights, dtype=np.float64)
+    colors = np.asarray(terrain_colors, dtype=np.uint8)[tiles]
+    colors[tiles == CLEAR_CLASS] = CLEAR_COLOR
+    colors[heights[tiles] - heights[prev] > 0] = CLIMB_COLOR
+    colors[tiles == gray_class] = IMPASSIBLE_COLOR
+    return colors
+
+
+def _merge_rects(rects):
+    """Disjoint rectangles covering rects, overlapping ones joined."""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        hit = rect.collidelist(merged)
+        while hit != -1:
+            rect.union_ip(merged.pop(hit))
+            hit = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+#|  --- PATH DRAWINGS ---  |#
+class PathDrawing:
+    """Cached drawing of one path: polyline runs of one color, control polygon and the rectangle it covers."""
+    def __init__(self, path, key, line_size, path_color, draw_controllers, show_terrain, adaptive, layer):
+        self.path = path  # kept so the id() it is cached under stays valid
+        self.key = key
+        self.line_size = line_size
+        self.runs = []
+        self.controllers = None
+        self.rect = None
+
+        pt1, pt2 = path.path_pt1, path.path_pt2
+        if pt1 is None or pt2 is None:
+            return
+        full_path = [pt1] + path.control_pts + [pt2]
+        if adaptive:
+            # Few vertices on flat stretches, every vertex is rounded off below
+            polyline = flatten_bezier_cached(full_path, layer.flatness)
+            xs, ys = np.rint(polyline[:, 0]).astype(np.int64), np.rint(polyline[:, 1]).astype(np.int64)
+        else:
+            xs, ys = sample_bezier_pixels(full_path, CURVE_STEPS)
+        keep = np.concatenate([[True], (xs[1:] != xs[:-1]) | (ys[1:] != ys[:-1])])
+        xs, ys = xs[keep], ys[keep]
+        self.round_joins = adaptive
+
+        if show_terrain:
+            colors = status_colors(xs, ys, layer.classes, layer.class_heights, layer.terrain_colors,
+                                   layer.gray_class)
+            starts = np.flatnonzero((colors[1:] != colors[:-1]).any(axis=1)) + 1
+        else:
+            colors = np.array([path_color])
+            starts = np.zeros(0, dtype=np.int64)
+        points = np.stack([xs, ys], axis=1).tolist()
+        # The segment into each sample takes that sample's color, so runs share their first point with the last run
+        bounds = [0] + starts.tolist() + [len(points)]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            self.runs.append((tuple(colors[start].tolist()), points[max(start - 1, 0):end]))
+
+        pad = line_size + 1
+        if draw_controllers:
+            self.controllers = [tuple(map(int, p)) for p in full_path]
+            pad = max(pad, layer.ctrl_pt_size + 1, line_size // 2 + 1)
+            xs = np.concatenate([xs, [x for x, _ in self.controllers]])
+            ys = np.concatenate([ys, [y for _, y in self.controllers]])
+        x0, y0 = int(xs.min()) - pad, int(ys.min()) - pad
+        self.rect = pygame.Rect(x0, y0, int(xs.max()) + pad - x0 + 1, int(ys.max()) + pad - y0 + 1)
+
+    def draw(self, surface, ctrl_pt_size):
+        if self.controllers:
+            pt1, *ctrl_pts, pt2 = self.controllers
+            pygame.draw.circle(surface, MAIN_POINT_COLOR, pt1, ctrl_pt_size)
+            pygame.draw.circle(surface, MAIN_POINT_COLOR, pt2, ctrl_pt_size)
+            if ctrl_pts:
+                pygame.draw.lines(surface, CONTROL_LINE_COLOR, False, self.controllers, self.line_size)
+                for p in ctrl_pts:
+                    pygame.draw.circle(surface, CONTROL_POINT_COLOR, p, ctrl_pt_size)
+
+        width = 2 * self.line_size
+        for color, points in self.runs:
+            if len(points) > 1:
+                if width > 1:
+                    pygame.draw.lines(surface, color, False, points, width)
+                else:
+                    pygame.draw.aalines(surface, color, False, points)
+            ends = points if self.round_joins else (points[0], points[-1])
+            for p in ends:
+                pygame.draw.circle(surface, color, p, self.line_size)
+
+
+#|  --- LAYER ---  |#
+class PathLayer:
+    """
+    Transparent surface of size with the paths of the last draw() on it.
+    classes, class_heights, terrain_colors (per class RGB on terrain) and gray_class color the curves when
+    show_terrain is set.
+    """
+    def __init__(self, size, classes, class_heights, terrain_colors, gray_class, ctrl_pt_size=5, flatness=0.1):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self._scratch = pygame.Surface(size, pygame.SRCALPHA)  # dirty rectangles are redrawn here first
+        self.classes = classes
+        self.class_heights = class_heights
+        self.terrain_colors = terrain_colors
+        self.gray_class = gray_class
+        self.ctrl_pt_size = ctrl_pt_size
+        self.flatness = flatness
+        self.drawings = []   # PathDrawing of every path, in draw order
+        self.by_id = {}      # id(path) -> its PathDrawing
+        self.screen_rects = []  # disjoint rectangles of the surface holding paths
+        self.redrawn = 0     # paths rebuilt by the last draw(), for benchmarks
+
+    def update(self, path_list, path_color=CLEAR_COLOR, line_size=3, draw_controllers=True, show_terrain=False,
+               adaptive=False):
+        """Rebuild the drawings of changed paths and redraw the rectangles they cover(ed) on the surface."""
+        style = (tuple(path_color), line_size, draw_controllers, show_terrain, adaptive)
+        drawings, dirty = [], []
+        for path in path_list:
+            key = (path.geometryVersion(), style)
+            drawing = self.by_id.get(id(path))
+            if drawing is None or drawing.key != key:
+                drawing = PathDrawing(path, key, line_size, path_color, draw_controllers, show_terrain, adaptive,
+                                      self)
+                dirty.append(drawing.rect)
+            drawings.append(drawing)
+        self.redrawn = len(dirty)
+        kept = set(map(id, drawings))
+        dirty += [d.rect for d in self.drawings if id(d) not in kept]  # changed or removed paths
+        self.drawings = drawings
+        self.by_id = {id(d.path): d for d in drawings}
+
+        dirty = [r for r in dirty if r is not None]
+        if not dirty:
+            return
+        if len(dirty) > MAX_DIRTY_RECTS:
+            dirty = [dirty[0].unionall(dirty[1:])]
+        bounds = self.surface.get_rect()
+        for rect in _merge_rects(dirty):
+            rect = rect.clip(bounds)
+            if not rect:
+                continue
+            # pygame rasterizes clipped lines differently, so the paths crossing rect are drawn whole on the
+            # scratch surface and only rect is copied
+            crossing = [d for d in drawings if d.rect is not None and d.rect.colliderect(rect)]
+            self._scratch.fill((0, 0, 0, 0), rect.unionall([d.rect for d in crossing]))
+            for drawing in crossing:
+                drawing.draw(self._scratch, self.ctrl_pt_size)
+            self.surface.fill((0, 0, 0, 0), rect)
+            self.surface.blit(self._scratch, rect.topleft, rect, pygame.BLEND_RGBA_ADD)  # exact copy onto zeros
+        self.screen_rects = _merge_rects(r for r in (d.rect.clip(bounds) for d in drawings if d.rect) if r)
+
+    def draw(self, screen, path_list, **style):
+        """update() and copy the rectangles holding paths onto screen."""
+        self.update(path_list, **style)
+        for rect in self.screen_rects:
+            screen.blit(self.surface, rect.topleft, rect)
@@ -0,0 +1,280 @@
+import hashlib
+import heapq
+import json
+from array import array
+from math import sqrt
+
+import numpy as np
+
+from bezier_classes import Location
+from scoring import CostModel
+from terrain import load_derived
+
+
+#|  --- INFO ---  |#
+'''
+Grid planner over the classified terrain, using the same cost model as get_pixel_score:
+    move time  = step length (ft) / speed of the cell stepped into (MOVE_MULT on CLEAR, DEBRIS_SPEED otherwise)
+    climb time = CLIMB_SPEED * max(0, height(to) - height(from))
+GRAY is impassable. Moves are 8-connected (diagonal steps are sqrt(2) px long). A diagonal step may
+not cut a GRAY corner and is charged the climb of the worse of the two ways around its corner, so a
+curve fitted through the route is not charged for corners the route slipped past.
+
+The open set is a binary heap (heapq) of (f, flat index) pairs over a padded flat grid, with all
+per-cell data held in flat arrays, so no per-node objects are created.
+'''
+
+
+#|  --- GRID ---  |#
+SQRT2 = sqrt(2)
+PLANNER_VERSION = 1  # Bump when the move costs change, so cached cost-to-go fields are rebuilt
+
+
+def cell_arrays(model: CostModel):
+    """
+    Per-pixel search inputs of a cost model, each (height, width):
+    passable (not GRAY), seconds per pixel of travel into the cell, ground height in feet.
+    """
+    classes = np.asarray(model.classes)
+    names = model.terrain.class_names
+    passable = classes != (names.index("GRAY") if "GRAY" in names else -1)
+    px_cost = 1.0 / (model.px_per_foot * model.class_speeds[classes])
+    return passable, px_cost, model.class_heights[classes]
+
+
+def cache_tag(model: CostModel):
+    """Short hash of the cost model inputs not covered by the terrain cache key."""
+    params = [PLANNER_VERSION, model.px_per_foot, model.climb_speed, model.class_speeds.tolist(),
+              model.class_heights.tolist()]
+    return hashlib.sha256(json.dumps(params).encode()).hexdigest()[:12]
+
+
+class PlannerGrid:
+    """
+    Flat, padded copy of the terrain for search: a one cell impassable border removes bounds checks,
+    and neighbours of flat index i are i + offset for the eight offsets below.
+    cells overrides the (passable, px_cost, heights) arrays of cell_arrays(model), e.g. for coarse levels.
+    """
+    def __init__(self, model: CostModel, cells=None):
+        self.model = model
+        passable, px_cost, heights = cells if cells is not None else cell_arrays(model)
+        self.height, self.width = passable.shape
+        self.stride = self.width + 2
+
+        padded = np.zeros((self.height + 2, self.stride), dtype=bool)
+        padded[1:-1, 1:-1] = passable
+        self.passable = padded.ravel()
+
+        # Seconds per pixel of travel into each cell, and each cell's height (0 on the border)
+        cost = np.zeros((self.height + 2, self.stride))
+        cost[1:-1, 1:-1] = px_cost
+        self.px_cost = cost.ravel()
+        padded_heights = np.zeros((self.height + 2, self.stride))
+        padded_heights[1:-1, 1:-1] = heights
+        self.heights = padded_heights.ravel()
+        # Cheapest possible seconds per pixel, for an admissible heuristic
+        self.min_px_cost = float(px_cost[passable].min()) if passable.any() else 0.0
+
+        # Time of each of the eight moves out of every cell (inf where blocked), interleaved so the moves
+        # out of cell i are edge_cost[8 * i:8 * i + 8]. A diagonal passes the corner it shares with both
+        # side cells, which the curve scorers can count as touching either of them, so it may not cut a
+        # GRAY corner and is charged the climb of the worse way around.
+        s = self.stride
+        self.moves = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1))
+        self.offsets = tuple(dy * s + dx for dx, dy in self.moves)
+        edges = []
+        for (dx, dy), offset in zip(self.moves, self.offsets):
+            h_to = self._shifted(self.heights, offset)
+            open_ = self._shifted(self.passable, offset)
+            if dx and dy:
+                move = SQRT2 * self._shifted(self.px_cost, offset)
+                around = []
+                for side in (dx, dy * s):
+                    h_side = self._shifted(self.heights, side)
+                    around.append(self._climb(self.heights, h_side) + self._climb(h_side, h_to))
+                    open_ &= self._shifted(self.passable, side)
+                edge = move + np.maximum(*around)
+            else:
+                edge = self._shifted(self.px_cost, offset) + self._climb(self.heights, h_to)
+            edges.append(np.where(open_, edge, np.inf))
+        self.edge_cost = array("d", np.stack(edges, axis=1).tobytes())
+        self.blocked = bytes((~self.passable).astype(np.uint8))
+
+    @staticmethod
+    def _shifted(values, offset):
+        """values[i + offset] for every i (values wrap around at the ends, which only affects the border)."""
+        return np.roll(values, -offset)
+
+    def _climb(self, h_from, h_to):
+        return self.model.climb_speed * np.maximum(0.0, h_to - h_from)
+
+    def heuristic(self, goal_index):
+        """Octile distance to the goal at the cheapest speed, for every cell (admissible: climbs only add time)."""
+        gx, gy = self.location(goal_index)
+        ys, xs = np.divmod(np.arange(len(self.px_cost)), self.stride)
+        dx = np.abs(xs - 1 - gx)
+        dy = np.abs(ys - 1 - gy)
+        return (self.min_px_cost * (np.maximum(dx, dy) + (SQRT2 - 1) * np.minimum(dx, dy))).tolist()
+
+    def cache_tag(self):
+        return cache_tag(self.model)
+
+    def index(self, x, y):
+        return (int(y) + 1) * self.stride + int(x) + 1
+
+    def location(self, i):
+        y, x = divmod(i, self.stride)
+        return x - 1, y - 1
+
+
+#|  --- SEARCH ---  |#
+def plan_route(model_or_grid, start, goal, use_heuristic=True, allowed=None):
+    """
+    Optimal 8-connected pixel route from start to goal (Locations or (x, y)).
+    A* with the octile distance at clear-ground speed as heuristic (admissible, climbs only add time);
+    use_heuristic=False runs plain Dijkstra. allowed, a (height, width) bool mask, restricts the search
+    to a corridor.
+
+    Returns:
+        list of (x, y) pixels from start to goal, total time in seconds, nodes expanded
+        (None, inf, expanded) when the goal cannot be reached
+    """
+    grid = model_or_grid if isinstance(model_or_grid, PlannerGrid) else PlannerGrid(model_or_grid)
+    sx, sy = start
+    gx, gy = goal
+    if not (0 <= sx < grid.width and 0 <= sy < grid.height and 0 <= gx < grid.width and 0 <= gy < grid.height):
+        raise ValueError("start and goal must be on the map")
+    src = grid.index(sx, sy)
+    dst = grid.index(gx, gy)
+
+    edge_cost = grid.edge_cost
+    offsets = grid.offsets
+    h = grid.heuristic(dst) if use_heuristic else None
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    dist = [float("inf")] * len(grid.blocked)
+    parent = [-1] * len(grid.blocked)
+    closed = bytearray(grid.blocked)  # impassable cells start out closed
+    if allowed is not None:
+        outside = np.ones((grid.height + 2, grid.stride), dtype=bool)
+        outside[1:-1, 1:-1] = ~np.asarray(allowed, dtype=bool)
+        closed = bytearray(np.frombuffer(grid.blocked, dtype=np.uint8) | outside.ravel())
+    dist[src] = 0.0
+    open_heap = [(0.0, src)]
+    expanded = 0
+
+    while open_heap:
+        _, i = heappop(open_heap)
+        if closed[i]:
+            continue
+        closed[i] = 1
+        expanded += 1
+        if i == dst:
+            break
+        d_i = dist[i]
+        k = 8 * i
+        for offset in offsets:
+            j = i + offset
+            d_j = d_i + edge_cost[k]
+            k += 1
+            if d_j < dist[j] and not closed[j]:
+                dist[j] = d_j
+                parent[j] = i
+                heappush(open_heap, (d_j + h[j] if h is not None else d_j, j))
+
+    if dist[dst] == float("inf"):
+        return None, float("inf"), expanded
+    route = [dst]
+    while route[-1] != src:
+        route.append(parent[route[-1]])
+    route.reverse()
+    return [grid.location(i) for i in route], dist[dst], expanded
+
+
+#|  --- COST-TO-GO ---  |#
+def cost_to_go(model_or_grid, goal):
+    """
+    Optimal time (s) from every pixel to goal: one reverse Dijkstra over the planner's move costs.
+
+    Returns:
+        (height, width) float32 array, inf where the goal cannot be reached
+    """
+    grid = model_or_grid if isinstance(model_or_grid, PlannerGrid) else PlannerGrid(model_or_grid)
+    gx, gy = goal
+    if not (0 <= gx < grid.width and 0 <= gy < grid.height):
+        raise ValueError("goal must be on the map")
+    dst = grid.index(gx, gy)
+
+    edge_cost = grid.edge_cost
+    reverse_moves = tuple((offset, d) for d, offset in enumerate(grid.offsets))
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    dist = [float("inf")] * len(grid.blocked)
+    closed = bytearray(grid.blocked)
+    if not closed[dst]:
+        dist[dst] = 0.0
+    open_heap = [(0.0, dst)] if not closed[dst] else []
+
+    while open_heap:
+        d_j, j = heappop(open_heap)
+        if closed[j]:
+            continue
+        closed[j] = 1
+        # Cell i reaches j with move d when j = i + offsets[d]
+        for offset, d in reverse_moves:
+            i = j - offset
+            d_i = d_j + edge_cost[8 * i + d]
+            if d_i < dist[i] and not closed[i]:
+                dist[i] = d_i
+                heappush(open_heap, (d_i, i))
+
+    field = np.array(dist, dtype=np.float32).reshape(grid.height + 2, grid.stride)
+    return np.ascontiguousarray(field[1:-1, 1:-1])
+
+
+def load_cost_to_go(model_or_grid, goal, rebuild=False):
+    """
+    cost_to_go(model_or_grid, goal), cached next to the terrain entry (memory-mapped read-only).
+    Given a CostModel, the PlannerGrid is only built when the field is not cached.
+    """
+    model = model_or_grid.model if isinstance(model_or_grid, PlannerGrid) else model_or_grid
+    gx, gy = (int(v) for v in goal)
+    name = f"togo-{gx}-{gy}-{cache_tag(model)}"
+    return load_derived(model.terrain, name, lambda: cost_to_go(model_or_grid, (gx, gy)), rebuild,
+                        replaces=f"togo-{gx}-{gy}-")  # fields of this goal for other model parameters
+
+
+def descend(grid: PlannerGrid, field, start):
+    """
+    Best route from start to the field's goal, following the cost-to-go field downhill:
+    each step takes the move minimizing move time + remaining time. O(route length).
+
+    Returns:
+        list of (x, y) pixels from start to the goal, or None when the goal cannot be reached
+    """
+    x, y = (int(v) for v in start)
+    if not (0 <= x < grid.width and 0 <= y < grid.height) or not np.isfinite(field[y, x]):
+        return None
+    edge_cost = grid.edge_cost
+    route = [(x, y)]
+    for _ in range(grid.width * grid.height):
+        if field[y, x] == 0:
+            return route
+        k = 8 * grid.index(x, y)
+        best, best_move = float("inf"), None
+        for d, (dx, dy) in enumerate(grid.moves):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < grid.width and 0 <= ny < grid.height:
+                remaining = edge_cost[k + d] + float(field[ny, nx])
+                if remaining < best:
+                    best, best_move = remaining, (nx, ny)
+        x, y = best_move
+        route.append(best_move)
+    return None
+
+
+def route_locations(route):
+    """Pixel route as a list of Location."""
+    return [Location(x, y) for x, y in route]
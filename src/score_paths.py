@@ -0,0 +1,95 @@
+import argparse
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+import config
+from parallel_scoring import snapshot_curves
+from path_files import is_path_store, read_path_file, read_path_store
+from scoring import SCORING_MODES, load_cost_model, score_curves
+
+
+#|  --- INFO ---  |#
+'''
+Headless batch scoring of saved routes: the same cost model as manual_path, without pygame.
+
+Every path file is scored in one score_curves batch and its per-segment and total times are written
+to stdout as soon as it is done, either as JSON lines (one object per file) or as CSV rows
+(one per segment plus a "total" row per file). Segments without control points score 0, as in manual_path.
+A path store is scored route by route straight from its arrays, reported as <file>#<route>.
+
+Run from the repository root:  python src/score_paths.py src/path_save.py src/best_path.py --format csv
+'''
+
+
+#|  --- SCORING ---  |#
+def score_path_file(file_name, model, mode=config.SCORING_MODE, curve_steps=500):
+    """
+    Returns:
+        list of per-segment times in seconds (0 for segments that cannot be scored), total time
+    """
+    curves = snapshot_curves(read_path_file(file_name))
+    scorable = [c for c in curves if c is not None]
+    scores = iter(score_curves(scorable, model, curve_steps, mode=mode, flatness=config.FLATNESS_TOLERANCE).tolist())
+    segments = [next(scores) if c is not None else 0 for c in curves]
+    return segments, sum(segments)
+
+
+def score_path_store(file_name, model, mode=config.SCORING_MODE, curve_steps=500):
+    """Yields (route name, per-segment times, total time) for every route of a path store."""
+    store = read_path_store(file_name)
+    for route in range(len(store)):
+        curves, counts = store.route_curves(route)
+        scores = np.zeros(len(counts))
+        scorable = counts > 2  # segments without control points score 0
+        scores[scorable] = score_curves(curves[scorable], model, curve_steps, counts[scorable], mode=mode,
+                                        flatness=config.FLATNESS_TOLERANCE)
+        yield f"{file_name}#{route}", scores.tolist(), float(scores.sum())
+
+
+def write_json(file_name, segments, total, out):
+    out.write(json.dumps({"file": file_name, "segments": segments, "total": total}) + "\n")
+
+
+def write_csv(file_name, segments, total, writer):
+    for i, score in enumerate(segments):
+        writer.writerow([file_name, i, score])
+    writer.writerow([file_name, "total", total])
+
+
+#|  --- MAIN ---  |#
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score saved routes without opening a window.")
+    parser.add_argument("files", nargs="*", default=[config.PATH_SAVE_FILE], help="path files to score")
+    parser.add_argument("--format", choices=("json", "csv"), default="json", help="output format")
+    parser.add_argument("--mode", choices=SCORING_MODES, default=config.SCORING_MODE, help="scoring mode")
+    parser.add_argument("--image", default=config.IMAGE_FILE, help="terrain image")
+    parser.add_argument("--robot-width", type=float, default=config.ROBOT_WIDTH, help="robot width (ft)")
+    parser.add_argument("--curve-steps", type=int, default=500)
+    parser.add_argument("--rebuild-terrain", action="store_true", help="ignore the terrain cache")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    model = load_cost_model(args.image, args.rebuild_terrain, args.robot_width)
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    if args.format == "csv":
+        writer.writerow(["file", "segment", "score"])
+    for file_name in args.files:
+        if is_path_store(file_name):
+            results = score_path_store(file_name, model, args.mode, args.curve_steps)
+        else:
+            results = [(file_name, *score_path_file(file_name, model, args.mode, args.curve_steps))]
+        for name, segments, total in results:
+            if args.format == "csv":
+                write_csv(name, segments, total, writer)
+            else:
+                write_json(name, segments, total, sys.stdout)
+        sys.stdout.flush()
+    print(f"Scored {len(args.files)} file(s) in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import threading
+import time
+import traceback
+
+import config
+from scoring import CostModel, score_curves
+
+
+#|  --- INFO ---  |#
+'''
+Background scoring of the edited route (the score label in manual_path).
+
+The UI thread submits the route's control polygons whenever its geometry changes and reads the newest
+result every frame; neither call waits for scoring. Requests are latest-wins: a request not taken yet is
+replaced by a newer one, so while a point is dragged the worker skips straight to the current geometry.
+Paths whose control polygon is unchanged since the previous request keep their score.
+
+Scoring runs on a thread: score_curves spends its time in NumPy, which releases the GIL, and a thread
+shares the cost model instead of loading it again.
+'''
+
+
+#|  --- RESULTS ---  |#
+class ScoreResult:
+    """
+    Scores of one request:
+        key: the key it was submitted with, scores: per path (0 for paths without control points),
+        total: their sum, compute: seconds spent scoring, latency: seconds from submit() to publishing
+        error: the exception scoring raised (scores are then the previous result's), None on success
+    """
+    def __init__(self, key, scores, compute, latency, error=None):
+        self.key = key
+        self.scores = scores
+        self.total = sum(scores)
+        self.compute = compute
+        self.latency = latency
+        self.error = error
+
+
+#|  --- WORKER ---  |#
+class ScoreWorker:
+    """Thread scoring the newest submitted route with model, started on the first submit()."""
+    def __init__(self, model: CostModel, curve_steps=500, mode=config.SCORING_MODE,
+                 flatness=config.FLATNESS_TOLERANCE):
+        self.model = model
+        self.curve_steps = curve_steps
+        self.mode = mode
+        self.flatness = flatness
+        self.result = None     # newest ScoreResult, replaced (never mutated) by the worker
+        self.submitted = None  # key of the newest request
+        self.dropped = 0       # requests replaced before the worker took them
+        self._request = None   # (key, curves, submit time) waiting for the worker
+        self._cached = {}      # control polygon -> score, from the previous request
+        self._wake = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def submit(self, key, curves):
+        """
+        Queue curves (a control point sequence per path, None for paths without control points) under key,
+        replacing any request the worker has not taken yet. Never waits for scoring.
+        """
+        with self._wake:
+            if self._request is not None:
+                self.dropped += 1
+            self._request = (key, [tuple(map(tuple, c)) if c is not None else None for c in curves],
+                             time.perf_counter())
+            self.submitted = key
+            self._wake.notify()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    @property
+    def pending(self) -> bool:
+        """True while the newest request has no result yet."""
+        result = self.result
+        return self.submitted is not None and (result is None or result.key != self.submitted)
+
+    def wait(self, timeout=None) -> bool:
+        """Block until the newest request has a result (for scripts and tests, not the UI thread)."""
+        end = None if timeout is None else time.perf_counter() + timeout
+        while self.pending:
+            if end is not None and time.perf_counter() > end:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def _run(self):
+        while True:
+            with self._wake:
+                while self._request is None and not self._closed:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                key, curves, submitted = self._request
+                self._request = None
+            start = time.perf_counter()
+            try:
+                scores, error = self._score(curves), None
+            except Exception as e:
+                # Publish the failure under this key so pending clears, and keep serving requests
+                traceback.print_exc()
+                scores, error = (self.result.scores if self.result is not None else []), e
+                self._cached = {}
+            now = time.perf_counter()
+            self.result = ScoreResult(key, scores, now - start, now - submitted, error)
+
+    def _score(self, curves):
+        missing = list({c for c in curves if c is not None and c not in self._cached})
+        if missing:
+            new = score_curves(missing, self.model, self.curve_steps, mode=self.mode, flatness=self.flatness)
+            self._cached.update(zip(missing, new.tolist()))
+        scores = [self._cached[c] if c is not None else 0 for c in curves]
+        self._cached = {c: s for c, s in zip(curves, scores) if c is not None}
+        return scores
+
+    def close(self):
+        with self._wake:
+            self._closed = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
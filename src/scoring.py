@@ -0,0 +1,469 @@
+import numpy as np
+
+import config
+from bezier_sampler import arc_lengths, bernstein_basis, control_array, flatten_bezier_cached
+from terrain import (CLEAR_CLASS, Terrain, distance_transform, footprint_terrain, load_derived, load_terrain,
+                     region_counts, summed_area_tables)
+
+
+BATCH_SIZE = 256  # Curves rasterized per vectorized pass in score_curves
+SCORING_MODES = ("legacy", "dda", "adaptive")
+# legacy:   rounded samples, pixels stepped between them and charged their distance from the previous sample
+# dda:      exact grid traversal of the sampled polyline, each crossed cell charged its in-cell length once
+# adaptive: exact grid traversal of an adaptively subdivided polyline (flat within config.FLATNESS_TOLERANCE px)
+# In the exact traversal modes a curve whose control polygon bounding box is all CLEAR is charged its arc
+# length at clear speed without rasterizing (see clear_fast_path). legacy keeps the original per-pixel charges.
+BOUND_BLOCKS = 8  # Sample blocks per curve when scoring against a bound; pruned curves skip the later blocks
+FEASIBILITY_STEPS = 64  # Samples per curve for the GRAY feasibility check
+
+
+#|  --- COST MODEL ---  |#
+class CostModel:
+    """
+    Everything path scoring needs: the terrain grid, its per-class tables and the scoring constants.
+    Built once per terrain and shared by every scoring call.
+    """
+    def __init__(self, terrain: Terrain, px_per_foot, climb_speed):
+        self.terrain = terrain
+        self.classes = np.asarray(terrain.classes)  # plain ndarray view, memmap indexing is slower
+        self.width = terrain.width
+        self.height = terrain.height
+        self.px_per_foot = px_per_foot
+        self.climb_speed = climb_speed
+        self.class_heights = terrain.class_heights
+        self.class_speeds = terrain.class_speeds
+        names = terrain.class_names
+        self.gray_class = names.index("GRAY") if "GRAY" in names else -1
+        self.min_px_time = 1.0 / (px_per_foot * self.class_speeds.max())  # seconds per pixel at the fastest speed
+        self.clear_px_time = 1.0 / (px_per_foot * self.class_speeds[CLEAR_CLASS])
+        # Per-class summed-area tables, cached with the terrain
+        self.class_sat = np.asarray(load_derived(terrain, "sat", lambda: summed_area_tables(self.classes, len(names))))
+        # Distance (px) from every pixel to the nearest GRAY pixel, cached with the terrain
+        self.gray_distance = np.asarray(load_derived(terrain, "graydist",
+                                                     lambda: distance_transform(self.classes == self.gray_class)))
+
+
+def load_cost_model(image_file=None, rebuild=False, robot_width=None) -> CostModel:
+    """
+    CostModel for image_file (default config.IMAGE_FILE) with the config constants, via the terrain cache.
+    The terrain is dilated for a robot robot_width ft wide (default config.ROBOT_WIDTH).
+    """
+    terrain = load_terrain(image_file or config.IMAGE_FILE, config.COLOR_MAP, config.ground_colors, config.MOVE_MULT,
+                           config.DEBRIS_SPEED, cache_dir=config.TERRAIN_CACHE_DIR, rebuild=rebuild)
+    robot_width = config.ROBOT_WIDTH if robot_width is None else robot_width
+    terrain = footprint_terrain(terrain, robot_width * config.PX_PER_FOOT / 2)
+    return CostModel(terrain, config.PX_PER_FOOT, config.CLIMB_SPEED)
+
+
+#|  --- RASTERIZING ---  |#
+def rasterize_samples(xs, ys, width, height):
+    """
+    Pixels visited between consecutive integer curve samples, using the same stepping as the original path_score:
+    max(|dx|, |dy|) evenly spaced, rounded points per sample pair, excluding the pair's start sample.
+
+    xs, ys are (n_curves, n_samples) arrays (a single 1-D curve is also accepted).
+
+    Returns (only in-bounds pixels, in visiting order):
+        px, py:      pixel coordinates
+        seg:         global index of the sample pair each pixel belongs to
+        curve:       index of the curve each pixel belongs to
+        dist:        distance from the pair's start sample to the pixel, in pixels
+    """
+    xs = np.atleast_2d(np.asarray(xs, dtype=np.int64))
+    ys = np.atleast_2d(np.asarray(ys, dtype=np.int64))
+    n_pairs = xs.shape[1] - 1
+    dx = np.diff(xs, axis=1).ravel()
+    dy = np.diff(ys, axis=1).ravel()
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+
+    seg = np.repeat(np.arange(len(steps)), steps)
+    offsets = np.cumsum(steps) - steps
+    i = np.arange(len(seg)) - offsets[seg] + 1
+
+    # Same operation order as prev_px + dx * i / steps, so rounding matches exactly
+    x0 = xs[:, :-1].ravel()[seg]
+    y0 = ys[:, :-1].ravel()[seg]
+    px = np.rint(x0 + dx[seg] * i / steps[seg]).astype(np.int64)
+    py = np.rint(y0 + dy[seg] * i / steps[seg]).astype(np.int64)
+
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    px, py, seg, x0, y0 = px[inside], py[inside], seg[inside], x0[inside], y0[inside]
+    dist = np.sqrt((px - x0) ** 2 + (py - y0) ** 2)
+    return px, py, seg, seg // max(n_pairs, 1), dist
+
+
+def traverse_polylines(xs, ys, width, height):
+    """
+    Exact grid traversal (Amanatides-Woo style) of polylines through the pixel grid.
+    Pixel (x, y) covers [x - 0.5, x + 0.5) x [y - 0.5, y + 0.5), matching round() in the legacy mode.
+
+    Every polyline segment is cut at each pixel boundary it crosses. Consecutive pieces in the same cell
+    are merged, so each crossed cell is visited once per pass and charged its true in-cell length.
+
+    Returns (only in-bounds cells, in visiting order):
+        cells:   flat cell indices (x + y * width)
+        curve:   index of the polyline each cell run belongs to
+        length:  length of the polyline inside the cell, in pixels
+    """
+    xs = np.atleast_2d(np.asarray(xs, dtype=np.float64))
+    ys = np.atleast_2d(np.asarray(ys, dtype=np.float64))
+    n_curves, n_samples = xs.shape
+    seg_curve = np.repeat(np.arange(n_curves), n_samples - 1)
+    return _traverse_segments(xs[:, :-1].ravel(), ys[:, :-1].ravel(), np.diff(xs, axis=1).ravel(),
+                              np.diff(ys, axis=1).ravel(), seg_curve, width, height)
+
+
+def traverse_polyline_list(polylines, width, height):
+    """traverse_polylines for a sequence of (m_i, 2) polylines with different vertex counts."""
+    if len(polylines) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+    starts = np.concatenate([p[:-1] for p in polylines])
+    deltas = np.concatenate([np.diff(p, axis=0) for p in polylines])
+    seg_curve = np.repeat(np.arange(len(polylines)), [len(p) - 1 for p in polylines])
+    return _traverse_segments(starts[:, 0], starts[:, 1], deltas[:, 0], deltas[:, 1], seg_curve, width, height)
+
+
+def _traverse_segments(x0, y0, dx, dy, seg_curve, width, height):
+    """Shared core of traverse_polylines: segments from (x0, y0) by (dx, dy), owned by curve seg_curve."""
+    x0 = x0 + 0.5  # shift so pixel k covers [k, k + 1)
+    y0 = y0 + 0.5
+    n_segs = len(dx)
+
+    # Parameter t of every vertical and horizontal grid line each segment crosses
+    def crossings(p0, dp):
+        c0 = np.floor(p0)
+        c1 = np.floor(p0 + dp)
+        count = np.abs(c1 - c0).astype(np.int64)
+        seg = np.repeat(np.arange(n_segs), count)
+        j = np.arange(len(seg)) - (np.cumsum(count) - count)[seg]
+        lines = np.where(dp[seg] > 0, c0[seg] + 1 + j, c0[seg] - j)
+        return seg, (lines - p0[seg]) / dp[seg]
+
+    seg_x, t_x = crossings(x0, dx)
+    seg_y, t_y = crossings(y0, dy)
+    seg = np.concatenate([np.arange(n_segs), seg_x, seg_y])
+    t = np.concatenate([np.zeros(n_segs), t_x, t_y])
+    order = np.lexsort((t, seg))
+    seg, t = seg[order], t[order]
+
+    # Each piece runs from its t to the next t of the same segment (or 1)
+    t_end = np.ones_like(t)
+    same_seg = seg[1:] == seg[:-1]
+    t_end[:-1][same_seg] = t[1:][same_seg]
+    piece = t_end > t
+    seg, t, t_end = seg[piece], t[piece], t_end[piece]
+
+    t_mid = (t + t_end) * 0.5
+    cx = np.floor(x0[seg] + dx[seg] * t_mid).astype(np.int64)
+    cy = np.floor(y0[seg] + dy[seg] * t_mid).astype(np.int64)
+    length = (t_end - t) * np.hypot(dx[seg], dy[seg])
+    curve = seg_curve[seg]
+
+    inside = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+    cells, curve, length = (cx + cy * width)[inside], curve[inside], length[inside]
+    if len(cells) == 0:
+        return cells, curve, length
+
+    # Merge consecutive pieces in the same cell of the same curve
+    run_start = np.ones(len(cells), dtype=bool)
+    run_start[1:] = (cells[1:] != cells[:-1]) | (curve[1:] != curve[:-1])
+    run = np.cumsum(run_start) - 1
+    return cells[run_start], curve[run_start], np.bincount(run, weights=length)
+
+
+#|  --- SCORING ---  |#
+def score_pixel_runs(tiles, seg, curve, dist, n_curves, model: CostModel, start_tiles=None) -> np.ndarray:
+    """
+    Total time per curve for runs of visited pixels (see rasterize_samples).
+
+    Climb is measured against the tile the previous sample pair ended on, not the previous pixel,
+    which is how the original per-pixel loop carried prev_tile. Every curve starts on CLEAR,
+    or on start_tiles[curve] when continuing a curve scored in parts.
+    """
+    if len(tiles) == 0:
+        return np.zeros(n_curves)
+    idx = np.arange(len(seg))
+    pair_start = np.ones(len(seg), dtype=bool)
+    pair_start[1:] = seg[1:] != seg[:-1]
+    start_idx = np.maximum.accumulate(np.where(pair_start, idx, 0))
+    before = np.maximum(start_idx - 1, 0)
+    carried = (start_idx > 0) & (curve[before] == curve)
+    prev_tiles = np.where(carried, tiles[before], CLEAR_CLASS if start_tiles is None else start_tiles[curve])
+
+    move_time = (dist / model.px_per_foot) / model.class_speeds[tiles]
+    climb_time = np.maximum(0, model.climb_speed * (model.class_heights[tiles] - model.class_heights[prev_tiles]))
+    # bincount adds each curve's pixels in order, so totals match the sequential loop bit for bit
+    return np.bincount(curve, weights=move_time + climb_time, minlength=n_curves)
+
+
+def score_sample_grid(xs, ys, model: CostModel) -> np.ndarray:
+    """Total time per curve for (n_curves, n_samples) integer samples."""
+    xs = np.atleast_2d(xs)
+    px, py, seg, curve, dist = rasterize_samples(xs, ys, model.width, model.height)
+    return score_pixel_runs(model.classes[py, px], seg, curve, dist, xs.shape[0], model)
+
+
+def score_cell_runs(cells, curve, length, n_curves, model: CostModel, start_tiles=None) -> np.ndarray:
+    """
+    Total time per curve for exact cell runs (see traverse_polylines).
+    Each run is charged its length at the cell's speed, plus a climb from the previous cell of the same curve.
+    Every curve starts on CLEAR, or on start_tiles[curve] when continuing a curve scored in parts.
+    """
+    if len(cells) == 0:
+        return np.zeros(n_curves)
+    tiles = model.classes.ravel()[cells]
+    if start_tiles is None:
+        prev_tiles = np.full(len(tiles), CLEAR_CLASS, dtype=tiles.dtype)
+    else:
+        prev_tiles = start_tiles[curve].astype(tiles.dtype)
+    carried = curve[1:] == curve[:-1]
+    prev_tiles[1:][carried] = tiles[:-1][carried]
+
+    move_time = (length / model.px_per_foot) / model.class_speeds[tiles]
+    climb_time = np.maximum(0, model.climb_speed * (model.class_heights[tiles] - model.class_heights[prev_tiles]))
+    return np.bincount(curve, weights=move_time + climb_time, minlength=n_curves)
+
+
+def last_tiles(tiles, curve, start_tiles):
+    """Tile each curve ends on (start_tiles[curve] for curves that visited no in-bounds tile)."""
+    ends = np.ones(len(curve), dtype=bool)
+    ends[:-1] = curve[1:] != curve[:-1]
+    out = start_tiles.copy()
+    out[curve[ends]] = tiles[ends]
+    return out
+
+
+def lower_bound_times(xs, ys, end_xs, end_ys, model: CostModel) -> np.ndarray:
+    """Admissible time from (xs, ys) to (end_xs, end_ys): straight-line distance at the fastest speed."""
+    return np.hypot(end_xs - xs, end_ys - ys) * model.min_px_time
+
+
+def score_samples_bounded(xs, ys, model: CostModel, bound, exact=False) -> np.ndarray:
+    """
+    score_sample_grid (exact=False) or score_polyline_grid (exact=True) with branch and bound.
+
+    The samples are scored in BOUND_BLOCKS blocks. After each block a curve whose time so far plus
+    lower_bound_times to its end exceeds bound (scalar or per curve), or that touched GRAY, is dropped.
+    Off-map stretches are free, so curves that leave the map get no remaining-time bound.
+    Dropped curves score inf; the others get their full time (equal to the unbounded score up to
+    float rounding, since the blocks are summed separately).
+    """
+    xs, ys = np.atleast_2d(xs), np.atleast_2d(ys)
+    n, n_samples = xs.shape
+    bound = np.broadcast_to(np.asarray(bound, dtype=np.float64), (n,))
+    totals = np.zeros(n)
+    prev = np.full(n, CLEAR_CLASS, dtype=model.classes.dtype)
+    alive = np.arange(n)
+    on_map = np.all((xs >= 0) & (xs <= model.width - 1) & (ys >= 0) & (ys <= model.height - 1), axis=1)
+    edges = np.unique(np.linspace(0, n_samples - 1, BOUND_BLOCKS + 1).round().astype(np.int64))
+    for a, b in zip(edges[:-1], edges[1:]):
+        bx, by = xs[alive, a:b + 1], ys[alive, a:b + 1]
+        if exact:
+            cells, curve, length = traverse_polylines(bx, by, model.width, model.height)
+            tiles = model.classes.ravel()[cells]
+            totals[alive] += score_cell_runs(cells, curve, length, len(alive), model, prev[alive])
+        else:
+            px, py, seg, curve, dist = rasterize_samples(bx, by, model.width, model.height)
+            tiles = model.classes[py, px]
+            totals[alive] += score_pixel_runs(tiles, seg, curve, dist, len(alive), model, prev[alive])
+        prev[alive] = last_tiles(tiles, curve, prev[alive])
+        gray = np.bincount(curve[tiles == model.gray_class], minlength=len(alive)) > 0
+        remaining = lower_bound_times(xs[alive, b], ys[alive, b], xs[alive, -1], ys[alive, -1], model) * on_map[alive]
+        pruned = gray | (totals[alive] + remaining > bound[alive])
+        totals[alive[pruned]] = np.inf
+        alive = alive[~pruned]
+        if len(alive) == 0:
+            break
+    return totals
+
+
+def score_polyline_grid(xs, ys, model: CostModel) -> np.ndarray:
+    """Total time per curve for (n_curves, n_samples) float samples, using exact grid traversal."""
+    xs = np.atleast_2d(xs)
+    cells, curve, length = traverse_polylines(xs, ys, model.width, model.height)
+    return score_cell_runs(cells, curve, length, xs.shape[0], model)
+
+
+def score_polyline_list(polylines, model: CostModel) -> np.ndarray:
+    """Total time per polyline for (m_i, 2) polylines of any lengths, using exact grid traversal."""
+    cells, curve, length = traverse_polyline_list(polylines, model.width, model.height)
+    return score_cell_runs(cells, curve, length, len(polylines), model)
+
+
+def _sample_group(pts, curve_steps):
+    """(n, k, 2) control points of same-degree curves -> (n, curve_steps + 1) float xs, ys."""
+    samples = bernstein_basis(pts.shape[1] - 1, curve_steps) @ pts  # broadcasts to (n, steps + 1, 2)
+    return samples[:, :, 0], samples[:, :, 1]
+
+
+def curve_groups(curves, counts=None):
+    """
+    Split curves (see sample_curves) into groups with the same number of control points.
+
+    Returns:
+        list of (member indices, (m, k, 2) float64 control points)
+    """
+    if isinstance(curves, np.ndarray) and curves.ndim == 3 and counts is None:
+        return [(np.arange(len(curves)), curves.astype(np.float64, copy=False))]
+    if counts is not None:
+        counts = np.asarray(counts)
+        groups = []
+        for k in np.unique(counts).tolist():
+            members = np.flatnonzero(counts == k)
+            groups.append((members, np.asarray(curves[members, :k], dtype=np.float64)))
+        return groups
+    groups = {}
+    for i, pts in enumerate(curves):
+        groups.setdefault(len(pts), []).append(i)
+    return [(np.array(members), np.array([curves[i] for i in members], dtype=np.float64).reshape(len(members), k, 2))
+            for k, members in groups.items()]
+
+
+def sample_curves(curves, curve_steps=500, counts=None, rounded=True):
+    """
+    Integer samples of many curves at once. Curves with the same number of control points share one matrix product.
+
+    curves is either
+        - an (n, k, 2) array of control polygons (with counts: a padded array, curve i uses its first counts[i] points)
+        - a sequence of (k_i, 2) control polygons of any lengths
+
+    Returns:
+        xs, ys: (n_curves, curve_steps + 1) arrays, int64 pixels if rounded else float64
+    """
+    if isinstance(curves, np.ndarray) and curves.ndim == 3 and counts is None:
+        xs, ys = _sample_group(curves.astype(np.float64, copy=False), curve_steps)
+    else:
+        xs = np.empty((len(curves), curve_steps + 1), dtype=np.float64)
+        ys = np.empty_like(xs)
+        for members, pts in curve_groups(curves, counts):
+            xs[members], ys[members] = _sample_group(pts, curve_steps)
+    if rounded:
+        return np.rint(xs).astype(np.int64), np.rint(ys).astype(np.int64)
+    return xs, ys
+
+
+def clear_fast_path(curves, model: CostModel, counts=None):
+    """
+    Curves that cannot touch anything but CLEAR: the bounding box of the control polygon (which contains
+    the curve) lies on the map and has no non-CLEAR pixel, by a summed-area table lookup. Their time is
+    their arc length at clear speed.
+
+    Returns:
+        (n,) bool mask of such curves, (n,) their times (0 elsewhere)
+    """
+    fast = np.zeros(len(curves), dtype=bool)
+    times = np.zeros(len(curves))
+    for members, pts in curve_groups(curves, counts):
+        # Pixel k covers [k - 0.5, k + 0.5)
+        lo = np.floor(pts.min(axis=1) + 0.5).astype(np.int64)
+        hi = np.floor(pts.max(axis=1) + 0.5).astype(np.int64)
+        on_map = (lo >= 0).all(axis=1) & (hi[:, 0] < model.width) & (hi[:, 1] < model.height)
+        lo, hi = lo[on_map], hi[on_map]
+        area = (hi[:, 0] - lo[:, 0] + 1) * (hi[:, 1] - lo[:, 1] + 1)
+        clear = region_counts(model.class_sat[CLEAR_CLASS], lo[:, 0], lo[:, 1], hi[:, 0], hi[:, 1])
+        inside = np.flatnonzero(on_map)[clear == area]
+        fast[members[inside]] = True
+        times[members[inside]] = arc_lengths(pts[inside]) * model.clear_px_time
+    return fast, times
+
+
+def gray_clearance(curves, model: CostModel, curve_steps=FEASIBILITY_STEPS, counts=None, rounded=False):
+    """
+    Smallest distance (px) from the pixel of any on-map sample of each curve to the nearest GRAY pixel,
+    by lookup in model.gray_distance (inf for curves with no sample on the map).
+    Samples fall in pixel floor(x + 0.5), or np.rint(x) when rounded, as in the legacy mode.
+    """
+    xs, ys = sample_curves(curves, curve_steps, counts, rounded=rounded)
+    if not rounded:
+        xs = np.floor(xs + 0.5).astype(np.int64)
+        ys = np.floor(ys + 0.5).astype(np.int64)
+    on_map = (xs >= 0) & (xs < model.width) & (ys >= 0) & (ys < model.height)
+    dist = np.full(xs.shape, np.inf, dtype=np.float32)
+    dist[on_map] = model.gray_distance[ys[on_map], xs[on_map]]
+    return dist.min(axis=1)
+
+
+def feasible_curves(curves, model: CostModel, margin=0.0, curve_steps=FEASIBILITY_STEPS, counts=None, rounded=False):
+    """
+    False for curves with a sample within margin px of GRAY, without scoring them. With margin 0 this only
+    rejects curves that touch GRAY. Points between samples are not checked, so a True is not a guarantee.
+
+    Returns:
+        (n,) bool array
+    """
+    if len(curves) == 0:
+        return np.zeros(0, dtype=bool)
+    return gray_clearance(curves, model, curve_steps, counts, rounded) > margin
+
+
+def _take(curves, idx):
+    return curves[idx] if isinstance(curves, np.ndarray) else [curves[i] for i in idx]
+
+
+def score_curves(curves, model: CostModel, curve_steps=500, counts=None, batch_size=BATCH_SIZE, mode="legacy",
+                 flatness=config.FLATNESS_TOLERANCE, bound=None) -> np.ndarray:
+    """
+    Batch scoring: score many Bezier curves against the shared terrain in vectorized passes.
+
+    curves: (n, k, 2) array of control polygons [pt1, ...controls, pt2], optionally padded with counts
+            (see sample_curves), or a sequence of control point lists/arrays of any lengths.
+    batch_size curves are rasterized at a time, which bounds memory for very large batches.
+    mode is one of SCORING_MODES. The adaptive mode ignores curve_steps and subdivides to within flatness pixels,
+    caching each curve's polyline by its control points. dda and adaptive score all-CLEAR curves by arc length.
+    bound (scalar or (n,)): only times up to bound matter. Curves that exceed it, or cross GRAY, are
+    abandoned early (see score_samples_bounded) and score inf; in dda and adaptive, curves feasible_curves
+    rejects are not scored at all. The adaptive mode only applies the bound to the finished scores.
+
+    Returns:
+        (n,) float64 array of times in seconds
+    """
+    if mode not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode {mode!r}, expected one of {SCORING_MODES}")
+    n = len(curves)
+    if not isinstance(curves, np.ndarray):
+        curves = [c if isinstance(c, np.ndarray) else control_array(c) for c in curves]
+    if counts is not None:
+        counts = np.asarray(counts)
+    scores = np.zeros(n)
+    if bound is not None:
+        bound = np.broadcast_to(np.asarray(bound, dtype=np.float64), (n,))
+
+    slow = np.arange(n)
+    if mode != "legacy" and n > 0:
+        fast, scores[:] = clear_fast_path(curves, model, counts)
+        slow = np.flatnonzero(~fast)
+    if bound is not None and mode != "legacy" and len(slow) > 0:
+        # Legacy samples are rounded and stepped between, so its pixels need not include the prefilter's
+        chunk_counts = None if counts is None else counts[slow]
+        feasible = feasible_curves(_take(curves, slow), model, counts=chunk_counts)
+        scores[slow[~feasible]] = np.inf
+        slow = slow[feasible]
+    for start in range(0, len(slow), batch_size):
+        chunk = slow[start:start + batch_size]
+        chunk_curves = _take(curves, chunk)
+        chunk_counts = None if counts is None else counts[chunk]
+        if bound is not None and mode != "adaptive":
+            xs, ys = sample_curves(chunk_curves, curve_steps, chunk_counts, rounded=mode == "legacy")
+            scores[chunk] = score_samples_bounded(xs, ys, model, bound[chunk], exact=mode == "dda")
+        elif mode == "adaptive":
+            if chunk_counts is not None:
+                polygons = [pts[:k] for pts, k in zip(chunk_curves, chunk_counts)]
+            else:
+                polygons = chunk_curves
+            scores[chunk] = score_polyline_list([flatten_bezier_cached(p.tolist(), flatness) for p in polygons], model)
+        elif mode == "dda":
+            xs, ys = sample_curves(chunk_curves, curve_steps, chunk_counts, rounded=False)
+            scores[chunk] = score_polyline_grid(xs, ys, model)
+        else:
+            xs, ys = sample_curves(chunk_curves, curve_steps, chunk_counts)
+            scores[chunk] = score_sample_grid(xs, ys, model)
+    if bound is not None:
+        scores[scores > bound] = np.inf
+    return scores
+
+
+def score_control_points(points, model: CostModel, curve_steps=500, mode="legacy", flatness=config.FLATNESS_TOLERANCE,
+                         bound=None) -> float:
+    """Total time of the Bezier curve with control points [pt1, ...controls, pt2] (inf if it exceeds bound)."""
+    return float(score_curves([points], model, curve_steps, mode=mode, flatness=flatness, bound=bound)[0])
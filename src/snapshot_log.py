@@ -0,0 +1,193 @@
+import os
+import queue
+import struct
+import threading
+
+import numpy as np
+
+from bezier_classes import Path, Location, geometry_version
+
+
+#|  --- INFO ---  |#
+'''
+Append-only on-disk log of recorded route snapshots (graph recording in manual_path).
+
+A snapshot is the complete paths of a route (pt1, control points, pt2) with their lock flags:
+    counts: points per path, locked: lock flag per path, coords: (n_points, 2) float32
+The log file is a header followed by records, each one
+    length (uint32, of kind + payload), kind (1 byte), payload
+    KEYFRAME: n_paths (uint32), counts (uint32[n_paths]), locked (uint8[n_paths]), coords (float32[n_points, 2])
+    DELTA:    n_moved (uint32), indices (uint32[n_moved]), coords (float32[n_moved, 2]), the points that moved
+              since the previous snapshot, which has the same counts and locks
+A record cut short by a crash ends the log. Records are encoded and written by a background thread, and
+read back one snapshot at a time, so neither recording nor reading keeps the whole history in memory.
+'''
+
+
+#|  --- FORMAT ---  |#
+LOG_MAGIC = b"SNAPSLOG"
+LOG_VERSION = 1
+KEYFRAME = b"K"
+DELTA = b"D"
+QUEUE_SIZE = 1024  # Snapshots waiting for the writer thread; record() blocks beyond this
+_HEADER = struct.Struct("<8sI")
+_RECORD = struct.Struct("<Ic")
+
+
+def paths_snapshot(paths):
+    """(counts, locked, flat coordinate list) of the complete paths in paths (Path or Location objects)."""
+    counts, locked, flat = [], [], []
+    for path in paths:
+        if not (path.path_pt1 and path.path_pt2):
+            continue
+        points = [path.path_pt1] + path.control_pts + [path.path_pt2]
+        counts.append(len(points))
+        locked.append(bool(path.locked))
+        for x, y in points:
+            flat.append(x)
+            flat.append(y)
+    return tuple(counts), tuple(locked), flat
+
+
+def snapshot_paths(counts, locked, coords) -> list:
+    """A snapshot as a list of Path (integral coordinates come back as int)."""
+    values = np.asarray(coords, dtype=np.float64).ravel().tolist()
+    values = [int(v) if v.is_integer() else round(v, 2) for v in values]
+    points = [Location(values[i], values[i + 1]) for i in range(0, len(values), 2)]
+    paths, start = [], 0
+    for count, lock in zip(counts, locked):
+        paths.append(Path(points[start], points[start + count - 1], points[start + 1:start + count - 1], lock))
+        start += count
+    return paths
+
+
+def snapshot_curves(counts, coords) -> list:
+    """Control polygons of a snapshot as (k, 2) arrays, None for paths without control points."""
+    ends = np.cumsum(counts)
+    return [coords[end - count:end] if count > 2 else None for count, end in zip(counts, ends.tolist())]
+
+
+def _keyframe(counts, locked, coords) -> bytes:
+    return b"".join((struct.pack("<I", len(counts)), np.array(counts, dtype="<u4").tobytes(),
+                     np.array(locked, dtype=np.uint8).tobytes(), coords.astype("<f4").tobytes()))
+
+
+def _delta(moved, coords) -> bytes:
+    return b"".join((struct.pack("<I", len(moved)), moved.astype("<u4").tobytes(),
+                     coords[moved].astype("<f4").tobytes()))
+
+
+#|  --- WRITER ---  |#
+class SnapshotLog:
+    """
+    Records snapshots of a list of Path to file_name (truncated when the first snapshot is recorded).
+    record() is O(1) while no geometry changed anywhere (bezier_classes.geometry_version); otherwise it
+    only copies the coordinates, and the writer thread delta-encodes and writes them.
+    """
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.count = 0  # snapshots recorded
+        self._version = None
+        self._last = None
+        self._queue = None
+        self._thread = None
+
+    def record(self, paths) -> bool:
+        """Queue a snapshot of paths if it differs from the last one. Returns True when one was queued."""
+        version = geometry_version()
+        if version == self._version:
+            return False
+        self._version = version
+        snapshot = paths_snapshot(paths)
+        if snapshot == self._last:
+            return False
+        self._last = snapshot
+        if self._thread is None:
+            self._start()
+        self._queue.put(snapshot)
+        self.count += 1
+        return True
+
+    def _start(self):
+        self._queue = queue.Queue(QUEUE_SIZE)
+        file = open(self.file_name, "wb")
+        file.write(_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+        self._thread = threading.Thread(target=self._write_loop, args=(file,), daemon=True)
+        self._thread.start()
+
+    def _write_loop(self, file):
+        prev_counts = prev_locked = prev_coords = None
+        with file:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    self._queue.task_done()
+                    return
+                if item == "flush":
+                    file.flush()
+                    self._queue.task_done()
+                    continue
+                counts, locked, flat = item
+                coords = np.array(flat, dtype=np.float32).reshape(-1, 2)
+                if counts == prev_counts and locked == prev_locked:
+                    kind, payload = DELTA, _delta(np.flatnonzero((coords != prev_coords).any(axis=1)), coords)
+                else:
+                    kind, payload = KEYFRAME, _keyframe(counts, locked, coords)
+                file.write(_RECORD.pack(len(payload) + 1, kind) + payload)
+                prev_counts, prev_locked, prev_coords = counts, locked, coords
+                self._queue.task_done()
+
+    def flush(self):
+        """Wait until every recorded snapshot is in the file."""
+        if self._thread is not None:
+            self._queue.put("flush")
+            self._queue.join()
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def clear(self):
+        """Forget every snapshot and delete the file, so reading it back yields none."""
+        self.close()
+        if os.path.exists(self.file_name):
+            os.remove(self.file_name)
+        self.count = 0
+        self._version = None
+        self._last = None
+
+
+#|  --- READER ---  |#
+def read_snapshots(file_name):
+    """Yields the logged snapshots in order as (counts, locked, coords), one at a time."""
+    if not os.path.exists(file_name):
+        return
+    with open(file_name, "rb") as file:
+        header = file.read(_HEADER.size)
+        if len(header) < _HEADER.size or _HEADER.unpack(header)[0] != LOG_MAGIC:
+            raise ValueError(f"{file_name} is not a snapshot log")
+        version = _HEADER.unpack(header)[1]
+        if version != LOG_VERSION:
+            raise ValueError(f"{file_name} has snapshot log version {version}, expected {LOG_VERSION}")
+        counts = locked = coords = None
+        while True:
+            record = file.read(_RECORD.size)
+            if len(record) < _RECORD.size:
+                return
+            length, kind = _RECORD.unpack(record)
+            payload = file.read(length - 1)
+            if len(payload) < length - 1:
+                return  # cut short by a crash
+            n = struct.unpack_from("<I", payload)[0]
+            if kind == KEYFRAME:
+                counts = tuple(np.frombuffer(payload, "<u4", n, 4).tolist())
+                locked = tuple(bool(v) for v in np.frombuffer(payload, np.uint8, n, 4 + 4 * n))
+                coords = np.frombuffer(payload, "<f4", offset=4 + 5 * n).reshape(-1, 2).copy()
+            elif kind == DELTA and coords is not None:
+                moved = np.frombuffer(payload, "<u4", n, 4)
+                coords[moved] = np.frombuffer(payload, "<f4", 2 * n, 4 + 4 * n).reshape(-1, 2)
+            else:
+                raise ValueError(f"{file_name}: unexpected record {kind!r}")
+            yield counts, locked, coords.copy()
@@ -0,0 +1,279 @@
+import copy
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+#|  --- CLASS TABLE ---  |#
+CLEAR_CLASS = 0  # Index of "CLEAR" in every class table
+CACHE_VERSION = 2  # Bump when the cached array layout changes
+CACHE_ARRAYS = ("classes",)
+
+
+def build_class_table(color_map: dict) -> tuple:
+    """
+    Returns the terrain class names in class-index order.
+    Index 0 is always "CLEAR", the rest follow the order of color_map.
+    """
+    class_names = ["CLEAR"]
+    for terrain_type in color_map.values():
+        if terrain_type not in class_names:
+            class_names.append(terrain_type)
+    return tuple(class_names)
+
+
+#|  --- CLASSIFICATION ---  |#
+def classify_pixels(pixels: np.ndarray, color_map: dict, max_dist=5):
+    """
+    Classify an (h, w, 3) RGB array in one pass.
+    Same rule as closest_color: nearest color_map entry if it is within max_dist in RGB, else CLEAR.
+
+    Returns:
+        classes: (h, w) uint8 array of class indices
+        class_names: tuple of class names (see build_class_table)
+    """
+    class_names = build_class_table(color_map)
+    if len(class_names) > 256:
+        raise ValueError("Too many terrain types for a uint8 class grid")
+
+    palette = np.array(list(color_map.keys()), dtype=np.int32)                         # (k, 3)
+    palette_classes = np.array([class_names.index(t) for t in color_map.values()], dtype=np.uint8)
+
+    h, w = pixels.shape[:2]
+    flat = pixels.reshape(-1, 3).astype(np.int32)
+    best_dist = np.full(flat.shape[0], np.iinfo(np.int32).max, dtype=np.int32)
+    best_idx = np.zeros(flat.shape[0], dtype=np.uint8)
+
+    # One pass per palette entry keeps memory at O(pixels) instead of O(pixels * k)
+    for i, color in enumerate(palette):
+        diff = flat - color
+        dist = np.einsum("ij,ij->i", diff, diff)
+        closer = dist < best_dist  # strict, so ties keep the first entry like closest_color
+        best_dist[closer] = dist[closer]
+        best_idx[closer] = i
+
+    classes = palette_classes[best_idx]
+    classes[best_dist > max_dist ** 2] = CLEAR_CLASS
+    return classes.reshape(h, w), class_names
+
+
+def classify_image(image_file, color_map: dict, max_dist=5):
+    """Load an image file and classify it (see classify_pixels)."""
+    from PIL import Image  # only needed on a terrain cache miss
+    img = Image.open(image_file).convert("RGB")
+    return classify_pixels(np.asarray(img, dtype=np.uint8), color_map, max_dist)
+
+
+#|  --- TERRAIN ---  |#
+class Terrain:
+    """
+    Classified terrain grid plus the per-class cost tables.
+
+    classes:      (h, w) uint8 class indices into class_names
+    class_heights / class_speeds: per-class lookup tables (float64), ground height in feet and speed
+    """
+    def __init__(self, classes, class_names, ground_colors: dict, clear_speed, debris_speed):
+        self.classes = classes
+        self.class_names = tuple(class_names)
+        self.height, self.width = classes.shape
+        self.class_heights = np.array([ground_colors[name] for name in self.class_names], dtype=np.float64)
+        self.class_speeds = np.array(
+            [clear_speed if i == CLEAR_CLASS else debris_speed for i in range(len(self.class_names))],
+            dtype=np.float64,
+        )
+        self.cache_base = None  # cache_dir/<image>/<key> when loaded through the cache, see load_derived
+
+    def class_index(self, name):
+        return self.class_names.index(name)
+
+
+def summed_area_tables(classes, n_classes):
+    """
+    (n_classes, h + 1, w + 1) int32 tables with sat[c, y, x] = number of class c pixels in classes[:y, :x],
+    so any rectangle's count per class is four lookups (see region_counts).
+    """
+    h, w = classes.shape
+    sat = np.zeros((n_classes, h + 1, w + 1), dtype=np.int32)
+    for c in range(n_classes):
+        np.cumsum(np.cumsum(classes == c, axis=0, dtype=np.int32), axis=1, out=sat[c, 1:, 1:])
+    return sat
+
+
+def region_counts(table, x0, y0, x1, y1):
+    """Counts in the inclusive pixel rectangles [x0, x1] x [y0, y1] (arrays) from one class's summed-area table."""
+    return table[y1 + 1, x1 + 1] - table[y0, x1 + 1] - table[y1 + 1, x0] + table[y0, x0]
+
+
+def distance_transform(mask):
+    """
+    Exact Euclidean distance (px) from every pixel centre to the nearest True pixel centre (0 on True pixels,
+    inf everywhere if there are none), as float32. Nearest distance along each row first, then the squared
+    distance is relaxed over growing row offsets dy until dy^2 exceeds every distance found.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    h, w = mask.shape
+    xs = np.arange(w, dtype=np.float64)
+    left = np.maximum.accumulate(np.where(mask, xs, -np.inf), axis=1)
+    right = np.minimum.accumulate(np.where(mask, xs, np.inf)[:, ::-1], axis=1)[:, ::-1]
+    row_sq = np.minimum(xs - left, right - xs) ** 2
+    dist_sq = row_sq.copy()
+    for dy in range(1, h):
+        if dy * dy >= dist_sq.max():
+            break
+        np.minimum(dist_sq[dy:], row_sq[:-dy] + dy * dy, out=dist_sq[dy:])
+        np.minimum(dist_sq[:-dy], row_sq[dy:] + dy * dy, out=dist_sq[:-dy])
+    return np.sqrt(dist_sq).astype(np.float32)
+
+
+def dilate_classes(classes, class_heights, radius):
+    """
+    Footprint dilation: every pixel takes the highest class within radius px (pixel centre distance),
+    i.e. the highest terrain a disc of that radius centred on it overlaps. One dilation per height class,
+    each a threshold of distance_transform.
+    """
+    classes = np.asarray(classes)
+    dilated = classes.copy()
+    for c in np.argsort(class_heights, kind="stable"):
+        present = classes == c
+        if present.any():
+            dilated[distance_transform(present) <= radius] = c  # higher classes overwrite lower ones
+    return dilated
+
+
+def footprint_terrain(terrain: Terrain, radius):
+    """
+    terrain as seen by a robot of footprint radius px (see dilate_classes), so scoring and planning on it
+    account for the robot's width at no extra cost per sample. The dilated classes are cached per radius
+    next to the terrain entry, and arrays derived from the dilated terrain next to them.
+    """
+    if radius <= 0:
+        return terrain
+    # Dilation only depends on how the classes rank by height
+    order = np.argsort(terrain.class_heights, kind="stable").tolist()
+    name = f"footprint-{float(radius):.4g}-{hashlib.sha256(json.dumps(order).encode()).hexdigest()[:8]}"
+    classes = load_derived(terrain, name, lambda: dilate_classes(terrain.classes, terrain.class_heights, radius),
+                           replaces="footprint-")  # one robot width per terrain
+    dilated = copy.copy(terrain)
+    dilated.classes = classes
+    dilated.cache_base = None if terrain.cache_base is None else f"{terrain.cache_base}.{name}"
+    return dilated
+
+
+def terrain_cache_key(image_bytes: bytes, color_map: dict, max_dist) -> str:
+    """Hash of everything the cached classes are derived from (heights and speeds are not cached)."""
+    config = {
+        "version": CACHE_VERSION,
+        "color_map": [[list(rgb), name] for rgb, name in color_map.items()],
+        "max_dist": max_dist,
+    }
+    digest = hashlib.sha256(image_bytes)
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    return digest.hexdigest()[:24]
+
+
+def _remove_stale_entries(entry_dir, key):
+    """Delete every cached entry in entry_dir that was built with a different key."""
+    for name in os.listdir(entry_dir):
+        if not name.startswith(key + "."):
+            try:
+                os.remove(os.path.join(entry_dir, name))
+            except OSError:
+                pass
+
+
+def _read_cache(base):
+    try:
+        arrays = {name: np.load(f"{base}.{name}.npy", mmap_mode="r") for name in CACHE_ARRAYS}
+    except (OSError, ValueError):
+        return None
+    shape = arrays["classes"].shape
+    if arrays["classes"].dtype != np.uint8 or any(a.shape != shape for a in arrays.values()):
+        return None
+    return arrays
+
+
+def _write_cache(base, terrain: Terrain):
+    for name in CACHE_ARRAYS:
+        tmp_file = f"{base}.{name}.tmp.npy"
+        np.save(tmp_file, np.ascontiguousarray(getattr(terrain, name)))
+        os.replace(tmp_file, f"{base}.{name}.npy")  # atomic, so a crash never leaves a half-written entry
+
+
+def load_terrain(image_file, color_map: dict, ground_colors: dict, clear_speed, debris_speed, max_dist=5,
+                 cache_dir=None, rebuild=False) -> Terrain:
+    """
+    Load the terrain for image_file, using the on-disk cache when it is valid.
+
+    The cache key covers the image bytes, color_map and max_dist, everything the classes depend on,
+    so changing any of them builds a fresh entry and removes the stale one.
+    Cached arrays are memory-mapped read-only. Pass rebuild=True to force reclassification.
+    """
+    if cache_dir is None:
+        classes, class_names = classify_image(image_file, color_map, max_dist)
+        return Terrain(classes, class_names, ground_colors, clear_speed, debris_speed)
+
+    with open(image_file, "rb") as file:
+        key = terrain_cache_key(file.read(), color_map, max_dist)
+    # One sub-directory per image, holding only the entry for the current key
+    entry_dir = os.path.join(cache_dir, os.path.splitext(os.path.basename(image_file))[0])
+    base = os.path.join(entry_dir, key)
+    class_names = build_class_table(color_map)
+
+    arrays = None if rebuild else _read_cache(base)
+    if arrays is not None:
+        terrain = Terrain(arrays["classes"], class_names, ground_colors, clear_speed, debris_speed)
+        terrain.cache_base = base
+        return terrain
+
+    classes, class_names = classify_image(image_file, color_map, max_dist)
+    terrain = Terrain(classes, class_names, ground_colors, clear_speed, debris_speed)
+    try:
+        os.makedirs(entry_dir, exist_ok=True)
+        _remove_stale_entries(entry_dir, key)
+        _write_cache(base, terrain)
+        terrain.cache_base = base
+    except OSError as e:
+        print("Failed to write terrain cache:", e)
+    return terrain
+
+
+def _remove_replaced(cache_base, name, replaces):
+    """Delete the derived entries of cache_base named replaces* other than name, and everything derived from them."""
+    entry_dir, key = os.path.split(cache_base)
+    prefix, keep = f"{key}.{replaces}", f"{key}.{name}."
+    for file_name in os.listdir(entry_dir):
+        if file_name.startswith(prefix) and not file_name.startswith(keep):
+            try:
+                os.remove(os.path.join(entry_dir, file_name))
+            except OSError:
+                pass
+
+
+def load_derived(terrain: Terrain, name, build, rebuild=False, replaces=None):
+    """
+    Array derived from terrain, cached next to the terrain entry as <key>.<name>.npy.
+    name must encode every other input of build(); entries go stale (and are removed) together with
+    the terrain entry. Without a cache (terrain not loaded through one) build() is simply called.
+    replaces: name prefix of the entries a new one supersedes (the same field built from other inputs);
+    writing it removes them, so changed inputs do not leave orphaned arrays behind.
+    """
+    if terrain.cache_base is None:
+        return build()
+    file_name = f"{terrain.cache_base}.{name}.npy"
+    if not rebuild:
+        try:
+            return np.load(file_name, mmap_mode="r")
+        except (OSError, ValueError):
+            pass
+    array = build()
+    try:
+        tmp_file = f"{terrain.cache_base}.{name}.tmp.npy"
+        np.save(tmp_file, np.ascontiguousarray(array))
+        os.replace(tmp_file, file_name)
+        if replaces is not None:
+            _remove_replaced(terrain.cache_base, name, replaces)
+    except OSError as e:
+        print(f"Failed to cache {name}:", e)
+    return array
@@ -0,0 +1,54 @@
+"""
+test_bezier_classes.py
+
+Checks that every geometry change of a Path or Location moves its version.
+"""
+
+import os
+import sys
+import copy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bezier_classes import Location, Path, geometry_version, touch_geometry
+
+def make_path():
+    return Path(Location(0, 0), Location(10, 0), [Location(5, 5)])
+
+# --- TEST SCENARIOS ---
+def test_location_moves():
+    path = make_path()
+    before = path.geometryVersion()
+    path.control_pts[0].x = 6
+    assert path.geometryVersion() > before
+
+def test_path_mutators():
+    path = make_path()
+    for mutate in (
+        lambda: path.addCtrlPt(Location(7, 7)),
+        lambda: path.removeCtrlPt(path.control_pts[0]),
+        lambda: path.setPt1(Location(1, 1)),
+        lambda: path.setPt2(Location(9, 9)),
+    ):
+        before = path.geometryVersion()
+        mutate()
+        assert path.geometryVersion() > before
+
+def test_unchanged_and_copies():
+    path = make_path()
+    version = path.geometryVersion()
+    path.score = 12.5
+    assert path.geometryVersion() == version
+    assert copy.deepcopy(path).geometryVersion() == version
+
+def test_global_counter():
+    before = geometry_version()
+    touch_geometry()
+    assert geometry_version() > before
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_location_moves()
+    test_path_mutators()
+    test_unchanged_and_copies()
+    test_global_counter()
+    print("All tests passed!")
@@ -0,0 +1,79 @@
+"""
+test_bezier_sampler.py
+
+Checks the batched Bernstein sampler against per-t de Casteljau evaluation.
+"""
+
+import os
+import sys
+import random
+from math import isclose
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bezier_sampler import arc_lengths, bernstein_basis, flatten_bezier, sample_bezier
+
+# --- REFERENCE ---
+def de_casteljau(points, t):
+    lvl = points
+    while len(lvl) > 1:
+        lvl = [(x0 + (x1 - x0) * t, y0 + (y1 - y0) * t) for (x0, y0), (x1, y1) in zip(lvl, lvl[1:])]
+    return lvl[0]
+
+# --- TEST SCENARIOS ---
+def test_matches_de_casteljau():
+    rng = random.Random(0)
+    for _ in range(50):
+        points = [(rng.uniform(0, 1024), rng.uniform(0, 800)) for _ in range(rng.randint(2, 9))]
+        xs, ys = sample_bezier(points, 100)
+        for s in range(101):
+            x, y = de_casteljau(points, s / 100)
+            assert isclose(xs[s], x, abs_tol=1e-9) and isclose(ys[s], y, abs_tol=1e-9)
+
+def test_endpoints_exact():
+    xs, ys = sample_bezier([(32, 769), (174, 484), (199, 485)], 500)
+    assert (xs[0], ys[0]) == (32, 769)
+    assert (xs[-1], ys[-1]) == (199, 485)
+
+def test_basis_cached_and_partition_of_unity():
+    basis = bernstein_basis(6, 500)
+    assert bernstein_basis(6, 500) is basis
+    assert not basis.flags.writeable
+    assert all(isclose(row_sum, 1.0, abs_tol=1e-12) for row_sum in basis.sum(axis=1))
+
+def test_flatten_within_tolerance():
+    points = [(763, 416), (874, 321), (730, 231), (842, 211), (951, 363), (783, 190), (820, 89)]
+    polyline = flatten_bezier(points, 0.1)
+    assert tuple(polyline[0]) == points[0] and tuple(polyline[-1]) == points[-1]
+    xs, ys = sample_bezier(points, 2000)
+    # Every curve point lies within tolerance of the polyline
+    a = polyline[:-1][None]
+    d = (polyline[1:] - polyline[:-1])[None]
+    p = np.stack([xs, ys], axis=1)[:, None]
+    t = np.clip(np.sum((p - a) * d, axis=2) / np.maximum(np.sum(d * d, axis=2), 1e-12), 0, 1)
+    dist = np.min(np.linalg.norm(p - (a + t[:, :, None] * d), axis=2), axis=1)
+    assert dist.max() <= 0.1 + 1e-9
+
+def test_flatten_straight_segment():
+    assert len(flatten_bezier([(0, 0), (5, 0), (10, 0)], 0.1)) == 2
+
+def test_arc_lengths():
+    rng = np.random.default_rng(1)
+    pts = rng.uniform(0, 500, size=(20, 5, 2))
+    expected = []
+    for points in pts:
+        xs, ys = sample_bezier(points.tolist(), 100000)
+        expected.append(np.hypot(np.diff(xs), np.diff(ys)).sum())
+    assert np.allclose(arc_lengths(pts), expected, rtol=1e-3)  # random curves may have near-cusps
+    assert np.isclose(arc_lengths(np.array([[(0, 0), (5, 0), (10, 0)]], dtype=float))[0], 10)
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_matches_de_casteljau()
+    test_endpoints_exact()
+    test_basis_cached_and_partition_of_unity()
+    test_flatten_within_tolerance()
+    test_flatten_straight_segment()
+    test_arc_lengths()
+    print("All tests passed!")
@@ -0,0 +1,66 @@
+"""
+test_curve_fit.py
+
+Checks least-squares Bezier fitting of dense polylines, and fitting planned routes into Path chains.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bezier_sampler import path_control_array, sample_bezier
+from curve_fit import fit_bezier, fit_polyline, fit_route
+from planner import plan_route
+from scoring import CostModel, score_curves
+from terrain import Terrain
+
+# --- CONFIG ---
+ground_colors = {"CLEAR": 0.0, "ORANGE": 1, "PURPLE": 2.5, "BLUE": 4, "GRAY": 9999}
+CLASS_NAMES = ("CLEAR", "ORANGE", "PURPLE", "BLUE", "GRAY")
+
+# --- TEST SCENARIOS ---
+def test_recovers_sampled_curve():
+    points = np.array([(10, 10), (60, 90), (140, -20), (200, 50)], dtype=np.float64)
+    xs, ys = sample_bezier(points, 200)
+    polyline = np.stack([xs, ys], axis=1)
+    # Newton reparameterization improves on chord-length parameters
+    assert fit_bezier(polyline, 3)[1].max() < fit_bezier(polyline, 3, iterations=0)[1].max() / 2
+    ctrl, err = fit_bezier(polyline, 3, iterations=100)
+    assert err.max() < 0.05
+    assert np.allclose(ctrl, points, atol=1.0)
+
+def test_chain_within_error():
+    t = np.linspace(0, 4 * np.pi, 800)
+    polyline = np.stack([t * 40, 100 + 60 * np.sin(t)], axis=1)
+    curves = fit_polyline(polyline, max_error=1.0, max_degree=4)
+    assert len(curves) > 1 and all(3 <= len(c) <= 5 for c in curves)
+    assert np.array_equal(curves[0][0], polyline[0]) and np.array_equal(curves[-1][-1], polyline[-1])
+    assert all(np.array_equal(a[-1], b[0]) for a, b in zip(curves, curves[1:]))
+    samples = np.concatenate([np.stack(sample_bezier(c, 400), axis=1) for c in curves])
+    dist = np.min(np.linalg.norm(polyline[:, None] - samples[None], axis=2), axis=1)
+    assert dist.max() <= 1.0 + 0.5  # within max_error, plus the sample spacing
+
+def test_straight_line_is_one_segment():
+    assert len(fit_polyline([(x, 2 * x) for x in range(50)])) == 1
+
+def test_fitted_route_avoids_wall():
+    classes = np.zeros((60, 100), dtype=np.uint8)
+    classes[0:45, 50:53] = CLASS_NAMES.index("GRAY")
+    model = CostModel(Terrain(classes, CLASS_NAMES, ground_colors, 0.64, 0.06), 8.27531973, 300)
+    route, route_time, _ = plan_route(model, (10, 10), (90, 10))
+    for mode in ("legacy", "dda"):
+        paths = fit_route(route, model, mode)
+        assert [p.locked for p in paths] == [True] * (len(paths) - 1) + [False]
+        assert tuple(paths[0].path_pt1) == (10, 10) and tuple(paths[-1].path_pt2) == (90, 10)
+        total = score_curves([path_control_array(p) for p in paths], model, mode=mode).sum()
+        assert total <= route_time * 1.1
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_recovers_sampled_curve()
+    test_chain_within_error()
+    test_straight_line_is_one_segment()
+    test_fitted_route_avoids_wall()
+    print("All tests passed!")
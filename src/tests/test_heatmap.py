@@ -0,0 +1,109 @@
+"""
+test_heatmap.py
+
+Checks the accumulated score heatmap against per-pixel expectations on straight routes.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import parallel_scoring
+from bezier_classes import Path, Location
+from heatmap import ScoreHeatmap, splat_log
+from scoring import CostModel, score_curves
+from snapshot_log import SnapshotLog
+from terrain import Terrain
+
+# --- CONFIG ---
+WIDTH, HEIGHT = 20, 12
+ROW_5 = np.array([[2, 5], [6, 5], [10, 5]], dtype=float)   # pixels (2..10, 5)
+ROW_8 = np.array([[6, 8], [12, 8], [18, 8]], dtype=float)  # pixels (6..18, 8)
+COL_4 = np.array([[4, 1], [4, 6], [4, 11]], dtype=float)   # pixels (4, 1..11), crosses ROW_5 at (4, 5)
+
+ground_colors = {"CLEAR": 0.0, "ORANGE": 1, "PURPLE": 2.5, "BLUE": 4, "GRAY": 9999}
+CLASS_NAMES = ("CLEAR", "ORANGE", "PURPLE", "BLUE", "GRAY")
+
+def make_model():
+    classes = np.zeros((HEIGHT, WIDTH), dtype=np.uint8)
+    classes[4:8, 8:12] = 1
+    return CostModel(Terrain(classes, CLASS_NAMES, ground_colors, 0.64, 0.06), 8.27531973, 300)
+
+# --- TEST SCENARIOS ---
+def test_best_and_average():
+    heatmap = ScoreHeatmap(WIDTH, HEIGHT, radius=0)
+    heatmap.add([[ROW_5, None], [COL_4], [ROW_8]], [10.0, 30.0, np.inf])
+    best, average = heatmap.scores("best"), heatmap.scores("average")
+    assert heatmap.count == 3 and (heatmap.lo, heatmap.hi) == (10.0, 30.0)
+
+    assert np.all(best[5, 2:11][np.arange(2, 11) != 4] == 10)
+    assert best[5, 4] == 10 and average[5, 4] == 20  # both routes pass
+    assert np.all(best[1:12, 4][np.arange(1, 12) != 5] == 30)
+    assert np.isinf(best[8, 6:19]).all()  # inf scores are only counted
+    assert np.isfinite(best).sum() == 9 + 11 - 1
+
+def test_incremental_add():
+    once = ScoreHeatmap(WIDTH, HEIGHT)
+    once.add([[ROW_5], [COL_4], [ROW_8]], [10.0, 30.0, 20.0])
+    split = ScoreHeatmap(WIDTH, HEIGHT)
+    split.add([[ROW_5]], [10.0])
+    split.add([[COL_4], [ROW_8]], [30.0, 20.0])
+    assert split.count == once.count == 3
+    for mode in ("best", "average"):
+        assert np.array_equal(split.scores(mode), once.scores(mode))
+
+def test_line_radius():
+    heatmap = ScoreHeatmap(WIDTH, HEIGHT, radius=1)
+    heatmap.add([[ROW_5]], [10.0])
+    best = heatmap.scores()
+    assert np.all(best[4:7, 3:10] == 10)
+    assert np.isinf(best[3]).all() and np.isinf(best[7]).all()
+    assert np.isinf(best[4, 1]) and best[5, 1] == 10  # disc, not square
+
+def test_rgba():
+    heatmap = ScoreHeatmap(WIDTH, HEIGHT, radius=0)
+    heatmap.add([[ROW_5], [ROW_8]], [10.0, 30.0])
+    rgba = heatmap.to_rgba()
+    assert rgba.shape == (HEIGHT, WIDTH, 4) and rgba.dtype == np.uint8
+    assert rgba[5, 3, 1] > rgba[8, 12, 1] and rgba[5, 3, 3] > rgba[8, 12, 3]  # faster is lighter
+    assert rgba[0, 0, 3] == 0
+    with tempfile.TemporaryDirectory() as tmp:
+        file_name = os.path.join(tmp, "heatmap.png")
+        heatmap.save_png(file_name)
+        assert os.path.getsize(file_name) > 0
+
+def test_splat_few_snapshots_without_pool():
+    def no_pool(*args):
+        raise AssertionError("a pool was started for one chunk of snapshots")
+    model = make_model()
+    route = [Path(Location(1, 6), Location(18, 6), [Location(10, 2)])]  # over the ORANGE block
+    pool, parallel_scoring.scoring_pool = parallel_scoring.scoring_pool, no_pool
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            log_file = os.path.join(tmp, "snapshots.log")
+            log = SnapshotLog(log_file)
+            for x in range(5):
+                route[0].control_pts[0].y = 2 + x
+                log.record(route)
+            log.close()
+            heatmap = ScoreHeatmap(WIDTH, HEIGHT)
+            best_score, best_snapshot = splat_log(heatmap, log_file, workers=4, model=model)
+            assert heatmap.count == 5
+            scores = score_curves([[(1, 6), (10, 2 + x), (18, 6)] for x in range(5)], model)
+            assert np.isclose(best_score, scores.min())
+            assert np.allclose(best_snapshot[2][1], (10, 2 + scores.argmin()))
+            assert splat_log(heatmap, log_file, workers=4, model=model) == (np.inf, None)  # nothing new
+    finally:
+        parallel_scoring.scoring_pool = pool
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_best_and_average()
+    test_incremental_add()
+    test_line_radius()
+    test_rgba()
+    test_splat_few_snapshots_without_pool()
+    print("All tests passed!")
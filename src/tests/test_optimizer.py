@@ -0,0 +1,79 @@
+"""
+test_optimizer.py
+
+Checks the CMA-ES core and the single-segment optimizer on a small synthetic terrain.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import optimizer
+from optimizer import cma_es, optimize_segment
+from scoring import CostModel, score_curves
+from terrain import Terrain
+
+# --- CONFIG ---
+ground_colors = {"CLEAR": 0.0, "ORANGE": 1, "PURPLE": 2.5, "BLUE": 4, "GRAY": 9999}
+CLASS_NAMES = ("CLEAR", "ORANGE", "PURPLE", "BLUE", "GRAY")
+
+def make_model():
+    classes = np.zeros((80, 120), dtype=np.uint8)
+    classes[30:50, 50:70] = 1  # orange block in the middle of the straight line
+    terrain = Terrain(classes, CLASS_NAMES, ground_colors, 0.64, 0.06)
+    return CostModel(terrain, 8.27531973, 300)
+
+# --- TEST SCENARIOS ---
+def test_cma_es_quadratic():
+    target = np.array([3.0, -2.0, 7.5])
+    objective = lambda x: np.sum((x - target) ** 2, axis=1)
+    best_x, best_f, evals = cma_es(objective, np.zeros(3), 1.0, 3000, np.random.default_rng(0))
+    assert evals <= 3000
+    assert np.allclose(best_x, target, atol=1e-2)
+
+def test_bound_keeps_selection():
+    target = np.array([3.0, -2.0, 7.5])
+    bounds = []
+    def objective(x, bound=None):
+        f = np.sum((x - target) ** 2, axis=1)
+        bounds.append(bound)
+        if bound is not None:
+            f[f > bound] = np.inf
+        return f
+    plain = cma_es(lambda x: objective(x), np.zeros(3), 1.0, 100000, np.random.default_rng(0))  # ends on sigma
+    bounded = cma_es(objective, np.zeros(3), 1.0, 100000, np.random.default_rng(0), bounded=True)
+    assert np.array_equal(plain[0], bounded[0]) and plain[1] == bounded[1]
+    assert any(b is not None for b in bounds)
+
+def test_segment_goes_around_block():
+    model = make_model()
+    points = [(10, 40), (60, 40), (110, 40)]
+    before = score_curves([points], model)[0]
+    best, best_f = optimize_segment(points, model, budget=1500, sigma0=10, seed=1)
+    assert tuple(best[0]) == points[0] and tuple(best[-1]) == points[-1]
+    assert best_f < before / 2
+    assert np.isclose(score_curves([best], model)[0], best_f)
+
+def test_segment_prunes_candidates():
+    model = make_model()
+    scored = []
+    def counting_score_curves(*args, **kwargs):
+        scores = score_curves(*args, **kwargs)
+        scored.append((kwargs["bound"], np.isinf(scores).sum()))
+        return scores
+    original, optimizer.score_curves = optimizer.score_curves, counting_score_curves
+    try:
+        optimize_segment([(10, 40), (60, 40), (110, 40)], model, budget=1500, sigma0=10, seed=1)
+    finally:
+        optimizer.score_curves = original
+    assert sum(pruned for bound, pruned in scored if bound is not None) > 0
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_cma_es_quadratic()
+    test_bound_keeps_selection()
+    test_segment_goes_around_block()
+    test_segment_prunes_candidates()
+    print("All tests passed!")
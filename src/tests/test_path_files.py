@@ -0,0 +1,108 @@
+"""
+test_path_files.py
+
+Checks the binary path store against the Python path files it replaces.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bezier_classes import Path, Location
+from path_files import (PATH_STORE_MAGIC, append_path_store, format_path_save, read_path_file, read_path_store,
+                        read_route, write_path_file, write_path_store)
+
+# --- CONFIG ---
+ROUTE = [
+    Path(Location(32, 769), Location(199, 485), [Location(174, 484)], True),
+    Path(Location(199, 485), Location(440, 488), [], True),
+    Path(Location(440, 488), Location(582.25, 349.5), [Location(486.13, 423), Location(550, 366.75)], False),
+]
+OTHER = [Path(Location(5, 5), Location(9, 9), [Location(7, 2)], False), Path(Location(9, 9), None)]
+
+# --- TEST SCENARIOS ---
+def test_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        store_file = os.path.join(tmp, "lib.pstore")
+        write_path_store(store_file, [ROUTE, OTHER, []])
+        store = read_path_store(store_file)
+        assert isinstance(store.coords, np.ndarray) and not store.coords.flags.writeable
+        assert len(store) == 3
+        assert store.route_paths(0) == ROUTE
+        assert store.route_paths(1) == OTHER[:1]  # incomplete paths are not stored
+        assert store.route_paths(2) == [Path(None, None)]
+
+        # The path file written from the store is the one written from the original paths
+        path_file = os.path.join(tmp, "route.py")
+        write_path_file(path_file, read_route(store_file, 0))
+        assert format_path_save(read_path_file(path_file)) == format_path_save(ROUTE)
+
+def test_route_curves():
+    with tempfile.TemporaryDirectory() as tmp:
+        store_file = os.path.join(tmp, "lib.pstore")
+        write_path_store(store_file, [ROUTE])
+        curves, counts = read_path_store(store_file).route_curves(0)
+    assert counts.tolist() == [3, 2, 4]
+    for path, curve, k in zip(ROUTE, curves, counts):
+        points = [tuple(path.path_pt1)] + [tuple(p) for p in path.control_pts] + [tuple(path.path_pt2)]
+        assert np.allclose(curve[:k], points, atol=1e-4)
+        assert np.all(curve[k:] == curve[k - 1])  # padded with the last point
+
+def test_append():
+    with tempfile.TemporaryDirectory() as tmp:
+        store_file = os.path.join(tmp, "lib.pstore")
+        append_path_store(store_file, [ROUTE])
+        append_path_store(store_file, [OTHER, ROUTE[1:]])
+        size = os.path.getsize(store_file)
+        store = read_path_store(store_file)
+        assert len(store) == 3
+        assert store.route_paths(1) == OTHER[:1] and store.route_paths(2) == ROUTE[1:]
+        assert read_route(store_file) == ROUTE[1:]
+
+        # An interrupted append leaves a short block, which is ignored
+        with open(store_file, "ab") as file:
+            file.write(np.array([5, 7, 100], dtype="<u8").tobytes())
+        assert len(read_path_store(store_file)) == 3
+        assert os.path.getsize(store_file) > size
+
+def test_append_after_interrupted_append():
+    with tempfile.TemporaryDirectory() as tmp:
+        store_file = os.path.join(tmp, "lib.pstore")
+        write_path_store(store_file, [ROUTE])
+        complete = os.path.getsize(store_file)
+        append_path_store(store_file, [OTHER])
+        with open(store_file, "r+b") as file:  # cut the second block short, mid-array
+            file.truncate(complete + (os.path.getsize(store_file) - complete) // 2)
+        append_path_store(store_file, [ROUTE[1:]])
+        store = read_path_store(store_file)
+        assert len(store) == 2
+        assert store.route_paths(0) == ROUTE and store.route_paths(1) == ROUTE[1:]
+
+        with open(store_file, "ab") as file:  # torn block header
+            file.write(bytes(5))
+        append_path_store(store_file, [OTHER])
+        assert [read_path_store(store_file).route_paths(r) for r in range(3)] == [ROUTE, ROUTE[1:], OTHER[:1]]
+
+def test_rejects_other_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        store_file = os.path.join(tmp, "lib.pstore")
+        with open(store_file, "wb") as file:
+            file.write(PATH_STORE_MAGIC + np.array([99, 0], dtype="<u4").tobytes())
+        for action in (lambda: read_path_store(store_file), lambda: append_path_store(store_file, [ROUTE])):
+            try:
+                action()
+                assert False, "expected a version error"
+            except ValueError as e:
+                assert "version" in str(e)
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_round_trip()
+    test_route_curves()
+    test_append()
+    test_append_after_interrupted_append()
+    test_rejects_other_files()
+    print("All tests passed!")
@@ -0,0 +1,118 @@
+"""
+test_path_render.py
+
+Checks that the retained path layer, redrawing only what changed, matches a layer drawn from scratch.
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pygame
+from bezier_classes import Path, Location
+from path_render import PathLayer, status_colors, CLEAR_COLOR, CLIMB_COLOR, IMPASSIBLE_COLOR
+
+# --- CONFIG ---
+SIZE = (120, 90)
+HEIGHTS = [0.0, 1, 2.5, 4, 9999]
+TERRAIN_COLORS = [(0, 0, 0), (125, 55, 25), (71, 29, 115), (21, 93, 123), (31, 31, 31)]
+GRAY = 4
+
+def make_classes():
+    classes = np.zeros(SIZE[::-1], dtype=np.uint8)
+    classes[30:60, 40:70] = 2
+    classes[70:80, 10:30] = GRAY
+    return classes
+
+def make_layer():
+    return PathLayer(SIZE, make_classes(), HEIGHTS, TERRAIN_COLORS, GRAY)
+
+def make_route():
+    a, b, c, d = Location(5, 10), Location(60, 45), Location(100, 80), Location(115, 20)
+    return [Path(a, b, [Location(30, 5)]), Path(b, c, [Location(90, 40), Location(70, 85)]), Path(c, d, [])]
+
+def pixels(layer):
+    return pygame.surfarray.array3d(layer.surface), pygame.surfarray.array_alpha(layer.surface)
+
+def assert_same(layer, route, **style):
+    fresh = make_layer()
+    fresh.update(route, **style)
+    for a, b in zip(pixels(layer), pixels(fresh)):
+        assert np.array_equal(a, b)
+
+# --- TEST SCENARIOS ---
+def test_status_colors():
+    classes = make_classes()
+    xs = np.array([5, 45, 50, 45, 20, 20, 200])
+    ys = np.array([5, 35, 40, 80, 75, 5, 5])  # clear, climb, terrain, clear, gray, clear, off the grid (clear)
+    colors = status_colors(xs, ys, classes, HEIGHTS, TERRAIN_COLORS, GRAY)
+    expected = [CLEAR_COLOR, CLIMB_COLOR, TERRAIN_COLORS[2], CLEAR_COLOR, IMPASSIBLE_COLOR, CLEAR_COLOR, CLEAR_COLOR]
+    assert [tuple(c) for c in colors.tolist()] == expected
+
+def test_incremental_matches_fresh():
+    layer = make_layer()
+    route = make_route()
+    layer.update(route, show_terrain=True)
+    assert layer.redrawn == 3
+    assert_same(layer, route, show_terrain=True)
+
+    layer.update(route, show_terrain=True)
+    assert layer.redrawn == 0
+
+    route[1].control_pts[0].x = 20  # only the middle path moves
+    layer.update(route, show_terrain=True)
+    assert layer.redrawn == 1
+    assert_same(layer, route, show_terrain=True)
+
+    route[0].path_pt2.y = 60  # shared point: both neighbours move
+    layer.update(route, show_terrain=True)
+    assert layer.redrawn == 2
+    assert_same(layer, route, show_terrain=True)
+
+    del route[2]  # removed paths are cleared
+    layer.update(route, show_terrain=True)
+    assert layer.redrawn == 0
+    assert_same(layer, route, show_terrain=True)
+
+def test_random_drags():
+    random.seed(0)
+    for adaptive in (False, True):
+        layer = make_layer()
+        route = make_route()
+        for _ in range(40):
+            point = random.choice([p for path in route for p in [path.path_pt1] + path.control_pts])
+            point.x, point.y = random.randint(-10, 130), random.randint(-10, 100)  # also off the layer
+            layer.update(route, show_terrain=True, adaptive=adaptive)
+        assert_same(layer, route, show_terrain=True, adaptive=adaptive)
+
+def test_style_change_redraws():
+    layer = make_layer()
+    route = make_route()
+    layer.update(route, show_terrain=True)
+    layer.update(route, path_color=(255, 255, 0), line_size=1, draw_controllers=False)
+    assert layer.redrawn == 3
+    assert_same(layer, route, path_color=(255, 255, 0), line_size=1, draw_controllers=False)
+
+def test_draw_blits_paths_only():
+    layer = make_layer()
+    screen = pygame.Surface(SIZE)
+    screen.fill((255, 255, 255))
+    route = make_route()[2:]
+    route[0].control_pts.append(Location(110, 85))
+    layer.draw(screen, route)
+    assert layer.screen_rects == [layer.drawings[0].rect.clip(screen.get_rect())]
+    assert screen.get_at((5, 5))[:3] == (255, 255, 255)
+    assert screen.get_at((100, 80))[:3] != (255, 255, 255)
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_status_colors()
+    test_incremental_matches_fresh()
+    test_random_drags()
+    test_style_change_redraws()
+    test_draw_blits_paths_only()
+    print("All tests passed!")
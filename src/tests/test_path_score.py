@@ -0,0 +1,219 @@
+"""
+test_path_score.py
+
+Checks the vectorized scoring engine against the original per-pixel path_score loop
+on a random terrain grid.
+"""
+
+import os
+import sys
+import random
+from math import sqrt
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bezier_sampler import sample_bezier_pixels
+from scoring import CostModel, clear_fast_path, feasible_curves, score_curves, score_sample_grid, traverse_polylines
+from terrain import Terrain
+
+# --- CONFIG ---
+CLIMB_SPEED = 300
+PX_PER_FOOT = 8.27531973
+MOVE_MULT = 0.64
+DEBRIS_SPEED = 0.06
+ground_colors = {"CLEAR": 0.0, "ORANGE": 1, "PURPLE": 2.5, "BLUE": 4, "GRAY": 9999}
+CLASS_NAMES = ("CLEAR", "ORANGE", "PURPLE", "BLUE", "GRAY")
+WIDTH, HEIGHT = 120, 90
+
+def make_model(seed=0):
+    rng = np.random.default_rng(seed)
+    # Blocky terrain so curves cross both runs and edges
+    coarse = rng.integers(0, len(CLASS_NAMES), size=(HEIGHT // 6, WIDTH // 6), dtype=np.uint8)
+    classes = np.kron(coarse, np.ones((6, 6), dtype=np.uint8))
+    terrain = Terrain(classes, CLASS_NAMES, ground_colors, MOVE_MULT, DEBRIS_SPEED)
+    return CostModel(terrain, PX_PER_FOOT, CLIMB_SPEED)
+
+# --- REFERENCE (the original path_score loop) ---
+def legacy_score(xs, ys, classes):
+    heights = [ground_colors[name] for name in CLASS_NAMES]
+    total_time = 0
+    prev_px, prev_py = None, None
+    prev_tile = 0
+    tile = 0
+    for px, py in zip(xs.tolist(), ys.tolist()):
+        if prev_px is not None:
+            dx, dy = px - prev_px, py - prev_py
+            steps = max(abs(dx), abs(dy))
+            for i in range(1, steps + 1):
+                x = int(round(prev_px + dx * i / steps))
+                y = int(round(prev_py + dy * i / steps))
+                if not (0 <= x < WIDTH and 0 <= y < HEIGHT):
+                    continue
+                tile = int(classes[y, x])
+                feet_dist = sqrt((x - prev_px) ** 2 + (y - prev_py) ** 2) / PX_PER_FOOT
+                speed = MOVE_MULT if tile == 0 else DEBRIS_SPEED
+                climb_time = max(0, CLIMB_SPEED * (heights[tile] - heights[prev_tile]))
+                total_time += feet_dist / speed + climb_time
+            prev_tile = tile
+        prev_px, prev_py = px, py
+    return total_time
+
+def random_curve(rng):
+    # Some points off the map to exercise the bounds check
+    return [(rng.randint(-10, WIDTH + 10), rng.randint(-10, HEIGHT + 10)) for _ in range(rng.randint(2, 8))]
+
+# --- TEST SCENARIOS ---
+def test_matches_legacy_loop():
+    model = make_model()
+    rng = random.Random(0)
+    for _ in range(100):
+        xs, ys = sample_bezier_pixels(random_curve(rng), 500)
+        assert score_sample_grid(xs, ys, model)[0] == legacy_score(xs, ys, model.classes)
+
+def test_batch_matches_single():
+    model = make_model(1)
+    rng = random.Random(1)
+    curves = [random_curve(rng) for _ in range(40)]
+    batch = score_curves(curves, model, 200)
+    for curve, score in zip(curves, batch):
+        xs, ys = sample_bezier_pixels(curve, 200)
+        assert score == legacy_score(xs, ys, model.classes)
+
+def test_stacked_and_padded_batches():
+    model = make_model(2)
+    rng = np.random.default_rng(2)
+    stacked = rng.integers(-10, WIDTH + 10, size=(30, 4, 2)).astype(np.float64)
+    expected = score_curves(list(stacked), model)
+    assert np.array_equal(score_curves(stacked, model, batch_size=7), expected)
+
+    counts = rng.integers(2, 5, size=30)
+    padded = stacked.copy()
+    for i, k in enumerate(counts):
+        padded[i, k:] = 1e9  # padding must be ignored
+    ragged = [stacked[i, :k] for i, k in enumerate(counts)]
+    assert np.array_equal(score_curves(padded, model, counts=counts), score_curves(ragged, model))
+
+def test_dda_visits_each_cell_once():
+    xs = np.array([[2.0, 30.3, 61.7]])
+    ys = np.array([[3.0, 17.9, 40.2]])
+    cells, curve, length = traverse_polylines(xs, ys, WIDTH, HEIGHT)
+    assert len(set(cells.tolist())) == len(cells)  # monotone line: no cell twice
+    assert np.isclose(length.sum(), np.hypot(np.diff(xs), np.diff(ys)).sum())
+
+    # Dense sampling of the same polyline lands in the same cells with the same lengths
+    t = (np.arange(200000) + 0.5) / 200000
+    seg_len = np.hypot(np.diff(xs[0]), np.diff(ys[0]))
+    dense = {}
+    for i in range(2):
+        px = np.rint(xs[0, i] + (xs[0, i + 1] - xs[0, i]) * t).astype(int)
+        py = np.rint(ys[0, i] + (ys[0, i + 1] - ys[0, i]) * t).astype(int)
+        for cell, n in zip(*np.unique(px + py * WIDTH, return_counts=True)):
+            dense[cell] = dense.get(cell, 0) + n * seg_len[i] / len(t)
+    assert set(dense) == set(cells.tolist())
+    for cell, cell_length in zip(cells.tolist(), length):
+        assert abs(dense[cell] - cell_length) < 1e-3
+
+def test_dda_clear_ground():
+    model = make_model()
+    model.classes[:] = 0
+    expected = 50.0 / PX_PER_FOOT / MOVE_MULT
+    assert np.isclose(score_curves([[(10, 20), (30, 35), (50, 50)]], model, mode="dda")[0], expected)
+
+def test_adaptive_close_to_fine_dda():
+    model = make_model(3)
+    rng = random.Random(3)
+    curves = [random_curve(rng) for _ in range(20)]
+    fine = score_curves(curves, model, 20000, mode="dda")
+    adaptive = score_curves(curves, model, mode="adaptive", flatness=0.01)
+    assert np.allclose(adaptive, fine, rtol=0.01)
+
+def test_degenerate_curve():
+    model = make_model()
+    assert score_curves([[(5, 5), (5, 5), (5, 5)]], model)[0] == 0
+
+def test_bound_prunes_and_keeps_survivors():
+    model = make_model()
+    rng = random.Random(4)
+    curves = [random_curve(rng) for _ in range(60)]
+    for mode in ("legacy", "dda", "adaptive"):
+        full = score_curves(curves, model, mode=mode)
+        crosses_gray = full > 1e6  # entering GRAY costs a 9999 ft climb
+        unbounded = score_curves(curves, model, mode=mode, bound=np.inf)
+        assert np.all(np.isinf(unbounded[crosses_gray])) or mode == "adaptive"
+        assert np.allclose(unbounded[~crosses_gray], full[~crosses_gray], rtol=1e-12)
+
+        bound = np.median(full[~crosses_gray])
+        bounded = score_curves(curves, model, mode=mode, bound=bound)
+        kept = full <= bound
+        assert np.allclose(bounded[kept], full[kept], rtol=1e-12)
+        assert np.all(np.isinf(bounded[~kept]))
+
+def test_legacy_bound_near_gray():
+    # The rounded prefilter samples touch GRAY, but the pixels the legacy scorer steps through do not
+    model = make_model(0)
+    curve = [(65, 17), (79, 15)]
+    assert not feasible_curves([curve], model, rounded=True)[0]
+    full = score_curves([curve], model)
+    assert full[0] < 1e6
+    assert np.allclose(score_curves([curve], model, bound=1e9), full, rtol=1e-12)
+
+    rng = random.Random(0)
+    curves = [random_curve(rng) for _ in range(2000)]
+    full = score_curves(curves, model)
+    bounded = score_curves(curves, model, bound=1e9)
+    assert np.allclose(bounded[full < 1e6], full[full < 1e6], rtol=1e-12)
+
+def test_per_curve_bound():
+    model = make_model()
+    rng = random.Random(5)
+    curves = [random_curve(rng) for _ in range(40)]
+    full = score_curves(curves, model)
+    curves = [c for c, f in zip(curves, full) if f < 1e6]  # GRAY always short-circuits
+    full = full[full < 1e6]
+    bounded = score_curves(curves, model, bound=full * (1 + 1e-9))
+    assert np.allclose(bounded, full, rtol=1e-12)
+    assert np.all(np.isinf(score_curves(curves, model, bound=full / 2)))
+
+def test_clear_fast_path():
+    model = make_model(6)
+    rng = random.Random(6)
+    curves = [[(x, y), (x + rng.uniform(-4, 4), y + rng.uniform(-4, 4)), (x + rng.uniform(-4, 4), y + 5)]
+              for x, y in ((rng.uniform(5, WIDTH - 10), rng.uniform(5, HEIGHT - 10)) for _ in range(300))]
+    fast, times = clear_fast_path(curves, model)
+    assert fast.any() and not fast.all()
+    fine = score_curves(curves, model, 50000, mode="dda")
+    assert np.allclose(times[fast], fine[fast], rtol=1e-4)
+    # Only the all-clear curves take the fast path; the rest score exactly as before
+    for mode in ("dda", "adaptive"):
+        scores = score_curves(curves, model, mode=mode)
+        assert np.allclose(scores[fast], times[fast], rtol=1e-12)
+    assert np.array_equal(score_curves(curves, model, mode="dda")[~fast],
+                          score_curves([c for c, f in zip(curves, fast) if not f], model, mode="dda"))
+
+def test_feasibility_check():
+    model = make_model(7)
+    rng = random.Random(7)
+    curves = [random_curve(rng) for _ in range(200)]
+    crosses_gray = score_curves(curves, model, 2000, mode="dda") > 1e6
+    feasible = feasible_curves(curves, model)
+    assert not np.any(~feasible & ~crosses_gray)  # only curves that touch GRAY are rejected
+    assert np.any(~feasible)
+    # A margin rejects a superset
+    assert np.all(feasible_curves(curves, model, margin=3) <= feasible)
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_matches_legacy_loop()
+    test_batch_matches_single()
+    test_stacked_and_padded_batches()
+    test_dda_visits_each_cell_once()
+    test_dda_clear_ground()
+    test_adaptive_close_to_fine_dda()
+    test_degenerate_curve()
+    test_bound_prunes_and_keeps_survivors()
+    test_legacy_bound_near_gray()
+    test_per_curve_bound()
+    test_clear_fast_path()
+    test_feasibility_check()
+    print("All tests passed!")
@@ -0,0 +1,81 @@
+"""
+test_planner.py
+
+Checks the grid planner on a small synthetic terrain: A* agrees with Dijkstra, GRAY is never entered,
+and an enclosed goal is reported unreachable.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from planner import PlannerGrid, cost_to_go, descend, plan_route
+from scoring import CostModel
+from terrain import Terrain
+
+# --- CONFIG ---
+ground_colors = {"CLEAR": 0.0, "ORANGE": 1, "PURPLE": 2.5, "BLUE": 4, "GRAY": 9999}
+CLASS_NAMES = ("CLEAR", "ORANGE", "PURPLE", "BLUE", "GRAY")
+GRAY = CLASS_NAMES.index("GRAY")
+
+def make_model(seed=0):
+    rng = np.random.default_rng(seed)
+    classes = rng.choice(4, size=(40, 60), p=[0.7, 0.1, 0.1, 0.1]).astype(np.uint8)
+    classes[5:35, 30] = GRAY  # wall with a gap at both ends
+    terrain = Terrain(classes, CLASS_NAMES, ground_colors, 0.64, 0.06)
+    return CostModel(terrain, 8.27531973, 300)
+
+# --- TEST SCENARIOS ---
+def test_astar_matches_dijkstra():
+    grid = PlannerGrid(make_model())
+    for goal in [(55, 20), (58, 2), (31, 38)]:
+        route, cost, expanded = plan_route(grid, (2, 20), goal)
+        _, dijkstra_cost, dijkstra_expanded = plan_route(grid, (2, 20), goal, use_heuristic=False)
+        assert np.isclose(cost, dijkstra_cost)
+        assert expanded <= dijkstra_expanded
+        assert route[0] == (2, 20) and route[-1] == goal
+
+def test_route_is_connected_and_avoids_gray():
+    model = make_model()
+    route, cost, _ = plan_route(model, (2, 20), (55, 20))
+    for (x0, y0), (x1, y1) in zip(route, route[1:]):
+        assert max(abs(x1 - x0), abs(y1 - y0)) == 1
+    assert all(model.classes[y, x] != GRAY for x, y in route)
+    assert np.isfinite(cost)
+
+def test_unreachable_goal():
+    model = make_model()
+    model.classes[9:12, 9:12] = GRAY
+    model.classes[10, 10] = 0
+    route, cost, _ = plan_route(model, (2, 20), (10, 10))
+    assert route is None and cost == float("inf")
+
+def test_no_gray_corner_cutting():
+    model = make_model()
+    model.classes[:, :] = 0
+    model.classes[10, 11] = GRAY
+    route, _, _ = plan_route(model, (10, 10), (11, 11))
+    assert route == [(10, 10), (10, 11), (11, 11)]
+
+def test_cost_to_go_matches_search():
+    grid = PlannerGrid(make_model())
+    goal = (55, 20)
+    field = cost_to_go(grid, goal)
+    assert field.dtype == np.float32 and field.shape == (40, 60) and field[20, 55] == 0
+    for start in [(2, 20), (58, 2), (31, 38), (10, 5)]:
+        route, cost, _ = plan_route(grid, start, goal)
+        assert np.isclose(field[start[1], start[0]], cost, rtol=1e-5)
+        best = descend(grid, field, start)
+        assert best[0] == start and best[-1] == goal
+    assert np.isinf(field[0, 0]) == (plan_route(grid, (0, 0), goal)[0] is None)
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_astar_matches_dijkstra()
+    test_route_is_connected_and_avoids_gray()
+    test_unreachable_goal()
+    test_no_gray_corner_cutting()
+    test_cost_to_go_matches_search()
+    print("All tests passed!")
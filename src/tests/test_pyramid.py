@@ -0,0 +1,88 @@
+"""
+test_pyramid.py
+
+Checks the terrain pyramid and the coarse-to-fine search against the full-resolution planner.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from planner import PlannerGrid, plan_route
+import pyramid as pyramid_module
+from pyramid import TerrainPyramid, dilate, downsample, plan_route_coarse_to_fine
+from scoring import CostModel
+from terrain import Terrain
+
+# --- CONFIG ---
+ground_colors = {"CLEAR": 0.0, "ORANGE": 1, "PURPLE": 2.5, "BLUE": 4, "GRAY": 9999}
+CLASS_NAMES = ("CLEAR", "ORANGE", "PURPLE", "BLUE", "GRAY")
+GRAY = CLASS_NAMES.index("GRAY")
+
+def make_model(classes):
+    return CostModel(Terrain(classes, CLASS_NAMES, ground_colors, 0.64, 0.06), 8.27531973, 300)
+
+# --- TEST SCENARIOS ---
+def test_downsample_is_optimistic():
+    passable = np.array([[True, False, False], [True, True, False], [False, False, False]])
+    px_cost = np.array([[1.0, 9.0, 9.0], [3.0, 2.0, 9.0], [5.0, 5.0, 5.0]])
+    heights = np.array([[4.0, 0.0, 0.0], [1.0, 2.5, 0.0], [0.0, 0.0, 0.0]])
+    coarse_passable, coarse_cost, coarse_heights = downsample(passable, px_cost, heights, 2)
+    assert coarse_passable.tolist() == [[True, False], [False, False]]
+    assert coarse_cost[0, 0] == 2.0 and coarse_heights[0, 0] == 1.0
+
+def test_dilate():
+    mask = np.zeros((7, 7), dtype=bool)
+    mask[3, 3] = True
+    assert dilate(mask, 2).sum() == 25 and dilate(mask, 2)[1:6, 1:6].all()
+
+def test_matches_full_search():
+    rng = np.random.default_rng(3)
+    classes = np.zeros((90, 130), dtype=np.uint8)
+    for _ in range(12):  # debris patches of every height
+        x, y = rng.integers(0, 120), rng.integers(0, 80)
+        classes[y:y + rng.integers(4, 20), x:x + rng.integers(4, 20)] = rng.integers(1, 4)
+    classes[10:80, 60:64] = GRAY
+    model = make_model(classes)
+    grid = PlannerGrid(model)
+    pyramid = TerrainPyramid(model, levels=3, base_grid=grid)
+    for start, goal in [((2, 2), (127, 88)), ((30, 45), (100, 45)), ((5, 85), (120, 5))]:
+        _, cost, expanded = plan_route(grid, start, goal)
+        route, pyramid_cost, pyramid_expanded = plan_route_coarse_to_fine(pyramid, start, goal)
+        assert route[0] == start and route[-1] == goal
+        assert cost <= pyramid_cost <= cost * 1.05
+        assert pyramid_expanded < expanded
+
+def test_tolerance_does_not_compound():
+    calls, last = [], [0.0]
+    def fake_plan_route(grid, start, goal, allowed=None):
+        # Full searches find cost 100 on every level; each corridor route is 8% dearer than the one above it
+        calls.append(allowed is not None)
+        cost = 100.0 if allowed is None else last[0] * 1.08
+        last[0] = cost
+        return [start, goal], cost, 1
+    pyramid = TerrainPyramid(make_model(np.zeros((64, 64), dtype=np.uint8)), levels=4)
+    plan, pyramid_module.plan_route = pyramid_module.plan_route, fake_plan_route
+    try:
+        _, cost, _ = plan_route_coarse_to_fine(pyramid, (2, 2), (60, 60), tolerance=0.1)
+    finally:
+        pyramid_module.plan_route = plan
+    assert cost <= 100 * 1.1  # 1.08 ** 3 if every level were only held to the one above
+    assert calls == [False, True, True, False, True]  # the second corridor drifted 16.6%: searched in full
+
+def test_unreachable_goal():
+    classes = np.zeros((40, 40), dtype=np.uint8)
+    classes[:, 20] = GRAY
+    route, cost, _ = plan_route_coarse_to_fine(TerrainPyramid(make_model(classes), levels=3), (5, 5), (35, 35))
+    assert route is None and cost == float("inf")
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_downsample_is_optimistic()
+    test_dilate()
+    test_matches_full_search()
+    test_tolerance_does_not_compound()
+    test_unreachable_goal()
+    print("All tests passed!")
@@ -0,0 +1,70 @@
+"""
+test_score_paths.py
+
+Checks the headless batch scorer against score_curves, and that it never imports pygame.
+"""
+
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bezier_classes import Path, Location
+from path_files import write_path_file
+from score_paths import score_path_file, write_csv, write_json
+from scoring import CostModel, score_curves
+from terrain import Terrain
+
+# --- CONFIG ---
+ground_colors = {"CLEAR": 0.0, "ORANGE": 1, "PURPLE": 2.5, "BLUE": 4, "GRAY": 9999}
+CLASS_NAMES = ("CLEAR", "ORANGE", "PURPLE", "BLUE", "GRAY")
+
+def make_model():
+    classes = np.zeros((60, 80), dtype=np.uint8)
+    classes[20:40, 30:50] = 2
+    terrain = Terrain(classes, CLASS_NAMES, ground_colors, 0.64, 0.06)
+    return CostModel(terrain, 8.27531973, 300)
+
+ROUTE = [
+    Path(Location(5, 30), Location(40, 10), [Location(20, 5)], True),
+    Path(Location(40, 10), Location(45, 50), [], True),  # no control points: scores 0
+    Path(Location(45, 50), Location(75, 30), [Location(60, 55), Location(70, 40)], False),
+]
+
+# --- TEST SCENARIOS ---
+def test_matches_score_curves():
+    model = make_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        file_name = os.path.join(tmp, "route.py")
+        write_path_file(file_name, ROUTE)
+        segments, total = score_path_file(file_name, model)
+    expected = score_curves([[p.path_pt1] + p.control_pts + [p.path_pt2] for p in (ROUTE[0], ROUTE[2])], model)
+    assert segments == [expected[0], 0, expected[1]]
+    assert np.isclose(total, expected.sum())
+
+def test_output_formats():
+    out = io.StringIO()
+    write_json("route.py", [1.5, 0, 2.5], 4.0, out)
+    assert json.loads(out.getvalue()) == {"file": "route.py", "segments": [1.5, 0, 2.5], "total": 4.0}
+    out = io.StringIO()
+    write_csv("route.py", [1.5, 0, 2.5], 4.0, csv.writer(out))
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[-1] == ["route.py", "total", "4.0"] and len(rows) == 4
+
+def test_no_pygame():
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    check = "import sys, score_paths; sys.exit('pygame' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", check], cwd=src).returncode == 0
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_matches_score_curves()
+    test_output_formats()
+    test_no_pygame()
+    print("All tests passed!")
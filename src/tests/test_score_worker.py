@@ -0,0 +1,85 @@
+"""
+test_score_worker.py
+
+Checks that the background scorer publishes score_curves results for the newest route only.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from score_worker import ScoreWorker
+from scoring import CostModel, score_curves
+from terrain import Terrain
+
+# --- CONFIG ---
+ground_colors = {"CLEAR": 0.0, "ORANGE": 1, "PURPLE": 2.5, "BLUE": 4, "GRAY": 9999}
+CLASS_NAMES = ("CLEAR", "ORANGE", "PURPLE", "BLUE", "GRAY")
+
+def make_model():
+    classes = np.zeros((60, 80), dtype=np.uint8)
+    classes[20:40, 30:50] = 2
+    terrain = Terrain(classes, CLASS_NAMES, ground_colors, 0.64, 0.06)
+    return CostModel(terrain, 8.27531973, 300)
+
+ROUTE = [[(5, 30), (20, 5), (40, 10)], None, [(45, 50), (60, 55), (70, 40), (75, 30)]]
+
+# --- TEST SCENARIOS ---
+def test_matches_score_curves():
+    model = make_model()
+    worker = ScoreWorker(model)
+    worker.submit("a", ROUTE)
+    assert worker.wait(10)
+    expected = score_curves([ROUTE[0], ROUTE[2]], model)
+    assert worker.result.key == "a" and not worker.pending
+    assert worker.result.scores == [expected[0], 0, expected[1]]
+    assert np.isclose(worker.result.total, expected.sum())
+    assert 0 <= worker.result.compute <= worker.result.latency
+    worker.close()
+
+def test_latest_wins():
+    model = make_model()
+    worker = ScoreWorker(model, curve_steps=20000)  # slow enough for requests to pile up
+    start = time.perf_counter()
+    for x in range(1, 21):
+        worker.submit(x, [[(5, 30), (20 + x, 5), (40, 10)]])
+    assert time.perf_counter() - start < 0.5  # submitting never waits for scoring
+    assert worker.wait(30)
+    assert worker.result.key == 20 and worker.dropped > 0
+    expected = score_curves([[(5, 30), (40, 5), (40, 10)]], model, 20000)
+    assert worker.result.scores == expected.tolist()
+    worker.close()
+
+def test_unchanged_paths_keep_scores():
+    worker = ScoreWorker(make_model())
+    worker.submit(1, ROUTE)
+    worker.wait(10)
+    worker._cached = {c: -1.0 for c in worker._cached}  # marks scores taken from the cache
+    moved = [ROUTE[0], None, [(45, 50), (61, 55), (70, 40), (75, 30)]]
+    worker.submit(2, moved)
+    worker.wait(10)
+    assert worker.result.scores[0] == -1.0
+    assert worker.result.scores[2] == score_curves([moved[2]], worker.model)[0]  # rescored
+    worker.close()
+
+def test_survives_errors():
+    worker = ScoreWorker(make_model(), mode="no such mode")
+    worker.submit(1, ROUTE)
+    assert worker.wait(10)  # a failed request still gets a result
+    assert isinstance(worker.result.error, ValueError) and worker.result.scores == []
+    worker.mode = "legacy"
+    worker.submit(2, ROUTE)
+    assert worker.wait(10)
+    assert worker.result.error is None and worker.result.key == 2 and worker.result.total > 0
+    worker.close()
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_matches_score_curves()
+    test_latest_wins()
+    test_unchanged_paths_keep_scores()
+    test_survives_errors()
+    print("All tests passed!")
@@ -0,0 +1,108 @@
+"""
+test_snapshot_log.py
+
+Checks that the snapshot log plays back exactly the recorded snapshots, delta-encoded.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bezier_classes import Path, Location
+from snapshot_log import SnapshotLog, paths_snapshot, read_snapshots, snapshot_curves, snapshot_paths
+
+# --- CONFIG ---
+def make_paths():
+    return [
+        Path(Location(32, 769), Location(199, 485), [Location(174, 484)], True),
+        Path(Location(199, 485), Location(440, 488), [], True),
+        Path(Location(440, 488), Location(582, 349), [Location(486, 423), Location(550, 366)], False),
+    ]
+
+def record_session(log_file):
+    """Records a drag, a no-op frame, a new path and another drag; returns the expected snapshots."""
+    paths = make_paths()
+    log = SnapshotLog(log_file)
+    expected = []
+    assert log.record(paths)
+    expected.append(snapshot_paths(*_arrays(paths)))
+    for step in range(50):
+        paths[2].control_pts[0].x = 486 + step + 0.25
+        assert log.record(paths)
+        expected.append(snapshot_paths(*_arrays(paths)))
+        assert not log.record(paths)  # nothing moved since
+    paths.append(Path(Location(582, 349), None))  # incomplete, not part of the snapshot
+    assert not log.record(paths)
+    paths[-1].setPt2(Location(700, 300))
+    assert log.record(paths)
+    expected.append(snapshot_paths(*_arrays(paths)))
+    paths[0].control_pts[0].y = 400
+    assert log.record(paths)
+    expected.append(snapshot_paths(*_arrays(paths)))
+    log.close()
+    assert log.count == len(expected)
+    return expected
+
+def _arrays(paths):
+    counts, locked, flat = paths_snapshot(paths)
+    return counts, locked, np.array(flat, dtype=np.float32).reshape(-1, 2)
+
+# --- TEST SCENARIOS ---
+def test_playback():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "graph.log")
+        expected = record_session(log_file)
+        snapshots = list(read_snapshots(log_file))
+        assert [snapshot_paths(*s) for s in snapshots] == expected
+        # Two keyframes (start, new path), every other record holds one moved point
+        assert os.path.getsize(log_file) < 2 * 200 + 50 * 20
+
+def test_curves():
+    counts, locked, coords = _arrays(make_paths())
+    curves = snapshot_curves(counts, coords)
+    assert curves[1] is None
+    assert np.array_equal(curves[2], [[440, 488], [486, 423], [550, 366], [582, 349]])
+
+def test_truncated_and_cleared():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "graph.log")
+        expected = record_session(log_file)
+        with open(log_file, "r+b") as file:
+            file.truncate(os.path.getsize(log_file) - 3)  # crash during the last write
+        assert [snapshot_paths(*s) for s in read_snapshots(log_file)] == expected[:-1]
+
+        log = SnapshotLog(log_file)
+        log.record(make_paths())
+        log.clear()
+        paths = make_paths()[:1]
+        log.record(paths)
+        log.flush()
+        assert [snapshot_paths(*s) for s in read_snapshots(log_file)] == [paths]
+        log.close()
+
+def test_clear_forgets_snapshots():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "graph.log")
+        paths = make_paths()
+        log = SnapshotLog(log_file)
+        for step in range(5):
+            paths[0].control_pts[0].x = 100 + step
+            assert log.record(paths)
+        log.flush()
+        assert len(list(read_snapshots(log_file))) == 5
+        log.clear()
+        assert log.count == 0 and list(read_snapshots(log_file)) == []
+        assert log.record(paths)  # recording starts a new log
+        log.close()
+        assert len(list(read_snapshots(log_file))) == 1
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_playback()
+    test_curves()
+    test_truncated_and_cleared()
+    test_clear_forgets_snapshots()
+    print("All tests passed!")
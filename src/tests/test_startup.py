@@ -0,0 +1,51 @@
+"""
+test_startup.py
+
+Startup benchmark: manual_path must reach its first frame within config.STARTUP_TARGET seconds
+(headless SDL driver). The target applies to a warm terrain cache only; a cold start is timed and
+reported, and must not wait for the cost-to-go fields. Importing manual_path must not load pygame or
+open a window.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC)
+from config import STARTUP_TARGET
+
+# --- CONFIG ---
+ROOT = os.path.dirname(SRC)  # config paths are relative to the repository root
+ENV = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+
+def time_to_first_frame(*args):
+    result = subprocess.run([sys.executable, os.path.join(SRC, "manual_path.py"), "--startup-benchmark", *args],
+                            cwd=ROOT, env=ENV, capture_output=True, text=True, timeout=600)
+    assert result.returncode == 0, result.stderr
+    before_first_frame = result.stdout.split("First frame after")[0]
+    assert "Cost-to-go" not in before_first_frame  # goal fields load after the first frame
+    return float(re.search(r"First frame after ([\d.]+)s", result.stdout).group(1))
+
+# --- TEST SCENARIOS ---
+def test_import_opens_nothing():
+    check = "import sys, manual_path; sys.exit('pygame' in sys.modules or 'path_save' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", check], cwd=SRC, env=ENV).returncode == 0
+
+def test_cold_start():
+    cold = time_to_first_frame("--rebuild-terrain")
+    print(f"Time to first frame, rebuilt terrain cache: {cold:.3f}s (not held to the target)")
+
+def test_time_to_first_frame():
+    time_to_first_frame()  # warms the terrain cache
+    best = min(time_to_first_frame() for _ in range(3))
+    print(f"Time to first frame: {best:.3f}s (target {STARTUP_TARGET}s)")
+    assert best <= STARTUP_TARGET
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_import_opens_nothing()
+    test_cold_start()
+    test_time_to_first_frame()
+    print("All tests passed!")
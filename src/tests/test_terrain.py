@@ -0,0 +1,179 @@
+"""
+test_terrain.py
+
+Checks the vectorized terrain classification against the per-pixel closest_color rule.
+"""
+
+import os
+import sys
+import random
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from terrain import (CLEAR_CLASS, build_class_table, classify_pixels, dilate_classes,
+                     distance_transform, footprint_terrain, load_derived, load_terrain, region_counts,
+                     summed_area_tables)
+
+# --- CONFIG ---
+COLOR_MAP = {
+    (250, 110, 51): "ORANGE",
+    (142, 59, 230): "PURPLE",
+    (43, 186, 247): "BLUE",
+    (63, 63, 63): "GRAY"
+}
+ground_colors = {"CLEAR": 0.0, "ORANGE": 1, "PURPLE": 2.5, "BLUE": 4, "GRAY": 9999}
+
+# --- REFERENCE (same rule as manual_path.closest_color) ---
+def closest_color(rgb, color_map, max_dist=5):
+    r, g, b = map(int, rgb)
+    best_match = "CLEAR"
+    min_dist = float("inf")
+    for k, terrain_type in color_map.items():
+        rk, gk, bk = k
+        dist = (r - rk) ** 2 + (g - gk) ** 2 + (b - bk) ** 2
+        if dist < min_dist:
+            min_dist = dist
+            best_match = terrain_type
+    return best_match if min_dist <= max_dist ** 2 else "CLEAR"
+
+def random_pixels(h, w, seed=0):
+    """Random image biased towards colors near (and exactly on) the palette edge."""
+    rng = random.Random(seed)
+    palette = list(COLOR_MAP.keys())
+    arr = np.zeros((h, w, 3), dtype=np.uint8)
+    for y in range(h):
+        for x in range(w):
+            if rng.random() < 0.5:
+                base = rng.choice(palette)
+                arr[y, x] = [min(255, max(0, c + rng.randint(-4, 4))) for c in base]
+            else:
+                arr[y, x] = [rng.randint(0, 255) for _ in range(3)]
+    return arr
+
+# --- TEST SCENARIOS ---
+def test_class_table():
+    names = build_class_table(COLOR_MAP)
+    assert names[CLEAR_CLASS] == "CLEAR"
+    assert set(names) == {"CLEAR", "ORANGE", "PURPLE", "BLUE", "GRAY"}
+
+def test_matches_closest_color():
+    pixels = random_pixels(40, 50)
+    classes, names = classify_pixels(pixels, COLOR_MAP)
+    assert classes.shape == (40, 50) and classes.dtype == np.uint8
+    for y in range(40):
+        for x in range(50):
+            assert names[classes[y, x]] == closest_color(pixels[y, x], COLOR_MAP)
+
+def test_max_dist_threshold():
+    pixels = np.array([[[63, 63, 63], [66, 67, 63], [66, 67, 64]]], dtype=np.uint8)  # dist^2 = 0, 25, 26
+    classes, names = classify_pixels(pixels, COLOR_MAP, max_dist=5)
+    assert [names[c] for c in classes[0]] == ["GRAY", "GRAY", "CLEAR"]
+
+def test_terrain_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        image_file = os.path.join(tmp, "site.png")
+        cache_dir = os.path.join(tmp, "cache")
+        Image.fromarray(random_pixels(20, 30, seed=1)).save(image_file)
+
+        cold = load_terrain(image_file, COLOR_MAP, ground_colors, 0.64, 0.06, cache_dir=cache_dir)
+        warm = load_terrain(image_file, COLOR_MAP, ground_colors, 0.64, 0.06, cache_dir=cache_dir)
+        assert isinstance(warm.classes, np.memmap)
+        assert np.array_equal(cold.classes, warm.classes)
+        assert sorted(os.listdir(os.path.join(cache_dir, "site"))) == [os.path.basename(warm.cache_base) + ".classes.npy"]
+        other = load_terrain(image_file, COLOR_MAP, ground_colors, 0.5, 0.1, cache_dir=cache_dir)  # speeds are not cached
+        assert other.cache_base == warm.cache_base and other.class_speeds.tolist() == [0.5, 0.1, 0.1, 0.1, 0.1]
+
+        # A different tolerance is a different key, and the old entry is removed
+        load_terrain(image_file, COLOR_MAP, ground_colors, 0.64, 0.06, max_dist=0, cache_dir=cache_dir)
+        assert len(os.listdir(os.path.join(cache_dir, "site"))) == 1
+
+        rebuilt = load_terrain(image_file, COLOR_MAP, ground_colors, 0.64, 0.06, cache_dir=cache_dir, rebuild=True)
+        assert not isinstance(rebuilt.classes, np.memmap)
+
+        # Derived arrays live next to the entry and are built once
+        builds = []
+        build = lambda: builds.append(1) or np.arange(6.0)
+        assert np.array_equal(load_derived(rebuilt, "extra", build), np.arange(6.0))
+        assert isinstance(load_derived(rebuilt, "extra", build), np.memmap) and len(builds) == 1
+        load_terrain(image_file, COLOR_MAP, ground_colors, 0.64, 0.06, max_dist=0, cache_dir=cache_dir)  # stale
+        assert len(os.listdir(os.path.join(cache_dir, "site"))) == 1
+
+def test_summed_area_tables():
+    rng = np.random.default_rng(2)
+    classes = rng.integers(0, 5, size=(23, 31), dtype=np.uint8)
+    tables = summed_area_tables(classes, 5)
+    x0, y0 = rng.integers(0, 31, 100), rng.integers(0, 23, 100)
+    x1, y1 = x0 + rng.integers(0, 31 - x0), y0 + rng.integers(0, 23 - y0)
+    for c in range(5):
+        counts = region_counts(tables[c], x0, y0, x1, y1)
+        expected = [np.count_nonzero(classes[b:d + 1, a:e + 1] == c) for a, b, e, d in zip(x0, y0, x1, y1)]
+        assert np.array_equal(counts, expected)
+
+def test_distance_transform():
+    rng = np.random.default_rng(3)
+    mask = rng.random((40, 55)) < 0.01
+    ys, xs = np.nonzero(mask)
+    grid_y, grid_x = np.mgrid[:40, :55]
+    expected = np.sqrt(((grid_x[..., None] - xs) ** 2 + (grid_y[..., None] - ys) ** 2).min(axis=2))
+    assert np.allclose(distance_transform(mask), expected, atol=1e-5)
+    assert np.all(np.isinf(distance_transform(np.zeros((4, 5), dtype=bool))))
+
+def test_footprint_dilation():
+    rng = np.random.default_rng(4)
+    classes = np.kron(rng.integers(0, 5, size=(6, 8)), np.ones((5, 5), dtype=np.uint8)).astype(np.uint8)
+    classes[rng.random(classes.shape) < 0.5] = 0
+    class_heights = np.array([ground_colors[name] for name in ("CLEAR", "ORANGE", "PURPLE", "BLUE", "GRAY")])
+    radius = 2.5
+    dilated = dilate_classes(classes, class_heights, radius)
+    h, w = classes.shape
+    for y in range(h):
+        for x in range(w):
+            ys, xs = np.mgrid[:h, :w]
+            under = classes[(xs - x) ** 2 + (ys - y) ** 2 <= radius ** 2]
+            assert class_heights[dilated[y, x]] == class_heights[under].max()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image_file = os.path.join(tmp, "site.png")
+        Image.fromarray(random_pixels(20, 30, seed=2)).save(image_file)
+        terrain = load_terrain(image_file, COLOR_MAP, ground_colors, 0.64, 0.06, cache_dir=tmp)
+        assert footprint_terrain(terrain, 0) is terrain
+        wide = footprint_terrain(terrain, 1.5)
+        assert isinstance(footprint_terrain(terrain, 1.5).classes, np.memmap)  # cached per radius
+        assert np.array_equal(wide.classes, dilate_classes(terrain.classes, terrain.class_heights, 1.5))
+        assert wide.cache_base != terrain.cache_base
+
+def test_replaced_derived_entries():
+    with tempfile.TemporaryDirectory() as tmp:
+        image_file = os.path.join(tmp, "site.png")
+        Image.fromarray(random_pixels(20, 30, seed=2)).save(image_file)
+        terrain = load_terrain(image_file, COLOR_MAP, ground_colors, 0.64, 0.06, cache_dir=tmp)
+        entry_dir = os.path.dirname(terrain.cache_base)
+        load_derived(terrain, "sat", lambda: np.zeros(3))
+        narrow = footprint_terrain(terrain, 1.5)
+        load_derived(narrow, "togo-1-2-aaa", lambda: np.zeros(3), replaces="togo-1-2-")
+        load_derived(narrow, "togo-1-23-aaa", lambda: np.zeros(3), replaces="togo-1-23-")
+        assert len(os.listdir(entry_dir)) == 5
+
+        load_derived(narrow, "togo-1-2-bbb", lambda: np.ones(3), replaces="togo-1-2-")  # new model parameters
+        names = sorted(name.split(".", 1)[1] for name in os.listdir(entry_dir))
+        assert [n for n in names if "togo" in n] == [narrow.cache_base.split(".", 1)[1] + f".togo-{g}.npy"
+                                                      for g in ("1-2-bbb", "1-23-aaa")]
+
+        wide = footprint_terrain(terrain, 2.5)  # a new robot width drops the old footprint and its fields
+        names = sorted(name.split(".", 1)[1] for name in os.listdir(entry_dir))
+        assert names == sorted(["classes.npy", "sat.npy", wide.cache_base.split(".", 1)[1] + ".npy"])
+
+# --- RUN ALL TESTS ---
+if __name__ == "__main__":
+    test_class_table()
+    test_matches_closest_color()
+    test_max_dist_threshold()
+    test_terrain_cache()
+    test_summed_area_tables()
+    test_distance_transform()
+    test_footprint_dilation()
+    test_replaced_derived_entries()
+    print("All tests passed!")